@@ -0,0 +1,128 @@
+# ==========================================
+# Single-Ticker CPR Analysis
+# ==========================================
+# Library side of the "Run Analysis" view: yesterday's CPR levels and the
+# first-candle / 3-candle breakout checks for one symbol. No Streamlit
+# here, so the CLI and the app share exactly the same logic.
+from datetime import timedelta
+
+import pandas as pd
+
+from bar_store import BarStore
+from cpr_engine import latest_store_levels
+from cpr_history import developing_cpr
+from resample import TIMEFRAMES, TimeframeBook
+
+VOLUME_LOOKBACK = 7
+
+
+def daily_levels(ticker, source, today, period="7d"):
+    """Returns (completed daily bars, yesterday's levels row); either may be None."""
+    daily = source.download([ticker], period=period, interval="1d").get(ticker)
+    if daily is None or len(daily) < 3:
+        return None, None
+
+    # Remove today if market not closed
+    daily = daily[daily.index.date < today]
+
+    levels = latest_store_levels(BarStore.from_frames({ticker: daily}), today)
+    if ticker not in levels.index or pd.isna(levels.loc[ticker, "CPR Trend"]):
+        return daily, None
+    return daily, levels.loc[ticker]
+
+
+def today_intraday(ticker, source, today, interval="5m"):
+    """Today's intraday candles as a BarView (Datetime in the market tz), or None."""
+    intraday = source.download(
+        [ticker],
+        start=today,
+        end=today + timedelta(days=1),
+        interval=interval
+    )
+
+    store = BarStore.from_frames(intraday)
+    if ticker not in store:
+        return None
+    return store.view(ticker)
+
+
+def today_timeframes(ticker, source, today, book=None, timeframes=TIMEFRAMES):
+    """One base-interval fetch folded into a TimeframeBook (every timeframe, no extra I/O)."""
+    book = book or TimeframeBook(ticker, timeframes)
+    book.update(today_intraday(ticker, source, today, book.base_interval))
+    return book
+
+
+def developing_levels(ticker, intraday, latest):
+    """Tomorrow's provisional CPR row from today's bars so far (a BarView), or None.
+
+    `latest` is CPRHistory.latest() appended through yesterday, so its row
+    holds the levels trading today.
+    """
+    if intraday is None or intraday.empty or ticker not in latest.index:
+        return None
+    high, low, close = (pd.Series([value], index=[ticker])
+                        for value in (intraday.high.max(), intraday.low.min(), intraday.close[-1]))
+    levels = developing_cpr(latest.loc[[ticker]], high, low, close)
+    return levels.loc[ticker] if ticker in levels.index else None
+
+
+def first_candle_by_timeframe(book, yday, daily, vol_filter=False):
+    """First-candle breakout on every timeframe of the book, one row per timeframe."""
+    rows = []
+    for interval in book.timeframes:
+        intraday = book.view(interval)
+        if intraday is None or intraday.empty:
+            continue
+        result = first_candle_breakout(intraday, yday, daily, vol_filter)
+        closed = book.view(interval, include_forming=False)
+        rows.append({
+            "Timeframe": interval,
+            "First Candle": result["candle"]["Datetime"],
+            "Close": result["candle"]["Close"],
+            "Breakout": result["breakout"],
+            "Candle Closed": closed is not None and len(closed) > 0,
+        })
+    return pd.DataFrame(rows, columns=["Timeframe", "First Candle", "Close", "Breakout", "Candle Closed"])
+
+
+def average_volume(daily, lookback=VOLUME_LOOKBACK):
+    return float(daily["Volume"].tail(lookback).mean())
+
+
+def first_candle_breakout(intraday, yday, daily, vol_filter=False):
+    """First candle closes above yesterday's high (optionally on above-average volume)."""
+    first_candle = intraday.candle(0)
+    price_ok = first_candle["Close"] > float(yday["High"])
+    volume_ok = not vol_filter or first_candle["Volume"] > average_volume(daily)
+    return {
+        "breakout": bool(price_ok and volume_ok),
+        "price_ok": bool(price_ok),
+        "volume_ok": bool(volume_ok),
+        "candle": first_candle,
+    }
+
+
+def three_candle_breakout(intraday, yday, daily, vol_filter=False):
+    """c1 green, c2 red, c3 green closing above yesterday's high and R1."""
+    if yday["CPR Trend"] != "Ascending" or len(intraday) < 3:
+        return {"breakout": False, "enough_candles": len(intraday) >= 3,
+                "volume_ok": True, "candle": None}
+
+    c1 = intraday.candle(0)
+    c2 = intraday.candle(1)
+    c3 = intraday.candle(2)
+
+    c1_green = c1["Close"] > c1["Open"]
+    c2_red = c2["Close"] < c2["Open"]
+    c3_green = c3["Close"] > c3["Open"]
+
+    breakout = c1_green and c2_red and c3_green and (c3["Close"] > float(yday["High"])) and (c3["Close"] > float(yday["R1"]))
+
+    volume_ok = not vol_filter or c3["Volume"] >= average_volume(daily)
+    return {
+        "breakout": bool(breakout and volume_ok),
+        "enough_candles": True,
+        "volume_ok": bool(volume_ok),
+        "candle": c3,
+    }
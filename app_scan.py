@@ -0,0 +1,235 @@
+# ==========================================
+# Streamlit Page - Universe Scan
+# ==========================================
+# Upload a symbol list, run the ascending-CPR + first-candle scan over it
+# and show the results with the scan diagnostics. Imported by CPR.py only
+# when this page is opened.
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import pandas as pd
+import streamlit as st
+
+from app_timing import lazy_import
+from bar_store import BarStore
+from cpr_engine import latest_store_levels
+from data_hub import shared_hub
+from data_fetch import fetch_daily, fetch_intraday, now
+from report import build_report, fetch_hit_bars, zip_report
+from scan_executor import DEFAULT_RATE, DEFAULT_RETRIES, DEFAULT_TIMEOUT, DEFAULT_WORKERS, ScanExecutor
+from scanner import SCAN_CHUNK_SIZE, iter_symbols, load_checkpoint, scan_params, stream_scan
+from telemetry import Telemetry
+
+RESULTS_FILE = "qualified_stocks.csv"
+
+LIVE_TABLE_ROWS = 200
+
+
+def render():
+    # Scan executor settings; rate and timeout belong to the shared data hub, so they start at its current values
+    rate, timeout = shared_hub().settings()
+    with st.expander("⚙️ Scan Settings"):
+        s1, s2, s3, s4 = st.columns(4)
+        with s1:
+            scan_workers = st.number_input("Workers", min_value=1, max_value=64, value=DEFAULT_WORKERS)
+        with s2:
+            scan_rate = st.number_input("Requests / second", min_value=0.5, max_value=100.0,
+                                        value=float(rate or DEFAULT_RATE),
+                                        help="Server-wide: applies to every session's upstream requests from the "
+                                             "next scan on")
+        with s3:
+            scan_timeout = st.number_input("Timeout per request (s)", min_value=1.0, max_value=300.0,
+                                           value=float(timeout or DEFAULT_TIMEOUT),
+                                           help="Server-wide, like the request rate")
+        with s4:
+            scan_retries = st.number_input("Retries", min_value=0, max_value=10, value=DEFAULT_RETRIES)
+
+    # Upload Nifty200 stock list
+    uploaded_file = st.file_uploader("Upload your stock list CSV (with 'Symbol' column)", type=["csv"])
+    if uploaded_file is None:
+        st.info("👆 Please upload a stock list CSV file (with a 'Symbol' column).")
+        return
+
+    today = now().date()
+
+    # Widget changes rerun this script; only re-scan for a new file, a new day or on request
+    scan_key = (uploaded_file.name, uploaded_file.size, today)
+    rescan = st.button("🔄 Re-run Scan")
+    scan = st.session_state.get("scan")
+
+    if rescan or scan is None or scan["key"] != scan_key:
+        progress_bar = st.progress(0)
+        table = st.empty()
+        total = sum(1 for _ in iter_symbols(uploaded_file))
+        uploaded_file.seek(0)
+        latest_rows = deque(maxlen=LIVE_TABLE_ROWS)
+        hit_bars = {}
+        # Symbols streamed from the upload, rows appended to the session's CSV as chunks finish; a
+        # scan cut short by a rerun resumes from its checkpoint, so the bar starts at the chunks it already did
+        results_file = session_results_file()
+        scan_id = f"{uploaded_file.name}:{uploaded_file.size}"
+        resumed = load_checkpoint(results_file, scan_params(today, scan_id))
+        done = min(len(resumed["done"]) * SCAN_CHUNK_SIZE, total) if resumed else 0
+        qualified = 0
+        if total:
+            progress_bar.progress(done / total)
+
+        def on_chunk(chunk, rows):
+            nonlocal done, qualified
+            done += len(chunk)
+            progress_bar.progress(min(done / total, 1.0))
+            if rows:
+                # Only the latest rows are kept on screen; the full list is in the output file
+                qualified += len(rows)
+                latest_rows.extend(rows)
+                with table.container():
+                    st.caption(f"{qualified} qualified so far (latest {len(latest_rows)} shown)")
+                    st.dataframe(pd.DataFrame(latest_rows))
+
+        # ---- Step 1 + 2: daily CPR + first-candle check, chunks run concurrently ----
+        telemetry = Telemetry()
+        executor = ScanExecutor(workers=int(scan_workers), timeout=scan_timeout, retries=int(scan_retries),
+                                telemetry=telemetry)
+        # Every session reads through the one data hub: identical in-flight fetches are shared and
+        # levels another session already computed today are reused. The rate/timeout set here apply to all.
+        hub = shared_hub(rate=scan_rate, timeout=scan_timeout)
+        source = hub.view(telemetry)
+        # Levels from `cli.py precompute` when a snapshot for today exists
+        snapshot = hub.snapshot(today)
+        stream_scan(iter_symbols(uploaded_file), source, today, results_file, executor=executor,
+                    on_chunk=on_chunk, telemetry=telemetry, key=scan_id,
+                    snapshot=snapshot, hit_bars=hit_bars, shared_levels=hub.levels)
+        result_df = pd.read_csv(results_file)
+        # Hits spooled before a resume were scanned by the earlier run; their bars are fetched again in one batch
+        missing = [symbol for symbol in result_df["Symbol"] if symbol not in hit_bars]
+        if missing:
+            hit_bars.update(fetch_hit_bars(missing, source, today))
+        progress_bar.progress(1.0)
+        table.empty()
+
+        scan = st.session_state["scan"] = {
+            "key": scan_key,
+            "result": result_df,
+            "hit_bars": hit_bars,
+            "telemetry": telemetry,
+            "failures": [
+                {"Error": name, "Count": count, "Symbols": ", ".join(executor.failures[name])}
+                for name, count in executor.failure_summary().most_common()
+            ],
+        }
+
+    if scan["failures"]:
+        with st.expander(f"⚠️ {sum(f['Count'] for f in scan['failures'])} symbols failed or had no data"):
+            st.dataframe(pd.DataFrame(scan["failures"]))
+
+    diagnostics(scan["telemetry"])
+
+    # --------------------------
+    # Step 3: Results
+    # --------------------------
+    result_df = scan["result"]
+    if not result_df.empty:
+        st.success("✅ Stocks satisfying conditions:")
+        st.dataframe(result_df)
+        st.download_button("📥 Results (CSV)", result_df.to_csv(index=False), file_name=RESULTS_FILE,
+                           mime="text/csv")
+
+        if st.toggle("📈 Chart grid of the qualified stocks"):
+            symbols = tuple(result_df["Symbol"])
+            st.plotly_chart(hits_grid(symbols, today), use_container_width=True)
+
+        if st.button("📄 Build chart report"):
+            # Rendered off the script thread from the scan's own bars; the page stays usable meanwhile
+            out_dir = tempfile.mkdtemp(prefix="cpr_report_")
+            st.session_state["report"] = {
+                "key": scan_key,
+                "dir": out_dir,
+                "job": report_executor().submit(build_report, result_df, scan["hit_bars"], out_dir),
+            }
+        report = st.session_state.get("report")
+        if report is not None and report["key"] == scan_key:
+            report_status(report)
+    else:
+        st.error("❌ No stocks satisfied the conditions today.")
+
+
+def session_results_file():
+    # Each session scans into its own directory, so concurrent scans never share a spool or checkpoint
+    if "scan_dir" not in st.session_state:
+        st.session_state["scan_dir"] = tempfile.mkdtemp(prefix="cpr_scan_")
+    return os.path.join(st.session_state["scan_dir"], RESULTS_FILE)
+
+
+@st.cache_resource(ttl=60, max_entries=16, show_spinner="Loading charts...")
+def hits_grid(symbols, trading_date):
+    # One daily + one intraday batch for all hits; the grid caps panels and candles per panel
+    charts = lazy_import("charts")
+    source = shared_hub()
+    daily = BarStore.from_frames(fetch_daily(symbols, source, start=trading_date - timedelta(days=15),
+                                             end=trading_date))
+    levels = latest_store_levels(daily, trading_date)
+    shown = [symbol for symbol in symbols if symbol in levels.index][:charts.MAX_GRID_CHARTS]
+    intraday = BarStore.from_frames(fetch_intraday(shown, source, period="1d"))
+    panels = [(intraday.view(symbol), levels.loc[symbol]) for symbol in shown if symbol in intraday]
+    return charts.small_multiples(panels)
+
+
+@st.cache_resource
+def report_executor():
+    # One report at a time per server; each report fans its charts out to a process pool
+    return ThreadPoolExecutor(max_workers=1)
+
+
+@st.fragment(run_every=2)
+def report_status(report):
+    # Polls only this fragment, not the whole page, until the report is ready
+    job = report["job"]
+    if not job.done():
+        st.info("⏳ Rendering the chart report in the background...")
+    elif job.exception() is not None:
+        st.error(f"Report failed: {job.exception()}")
+    else:
+        if "zip" not in report:
+            report["zip"] = zip_report(report["dir"])
+        st.download_button("📥 Chart report (zip)", report["zip"], file_name="cpr_scan_report.zip",
+                           mime="application/zip")
+
+
+def diagnostics(telemetry):
+    # Scan diagnostics: where the time went, cache hits, retries
+    with st.expander("🩺 Scan Diagnostics"):
+        # Hit = served from the hub or joined another session's in-flight fetch
+        requested = telemetry.counter_total("hub_requests")
+        shared = requested - telemetry.counter_total("hub_requests", result="fetched")
+        d1, d2, d3 = st.columns(3)
+        d1.metric("Scan time", f"{telemetry.seconds_total('scan_seconds'):.2f}s")
+        d2.metric("Shared data hit rate", f"{shared / requested:.0%}" if requested else "-")
+        d3.metric("Retries", int(telemetry.counter_total("retries")))
+
+        st.markdown("**Latency by stage**")
+        st.dataframe(telemetry.stage_summary(), hide_index=True)
+        st.markdown("**Counters**")
+        st.dataframe(telemetry.counter_summary(), hide_index=True)
+        st.markdown("**Slowest chunks**")
+        st.dataframe(telemetry.slowest_chunks(), hide_index=True)
+
+        e1, e2 = st.columns(2)
+        e1.download_button("📥 Metrics (JSON)", telemetry.to_json(), file_name="scan_metrics.json",
+                           mime="application/json")
+        e2.download_button("📥 Metrics (Prometheus)", telemetry.to_prometheus(), file_name="scan_metrics.prom",
+                           mime="text/plain")
+
+        # Bar cache, rate limiter and upstream latency sit below the hub, so they are counted for all sessions
+        hub = shared_hub().telemetry
+        hit_rate = hub.cache_hit_rate()
+        st.markdown("**Shared data hub (all sessions, since server start)**")
+        h1, h2, h3, h4 = st.columns(4)
+        h1.metric("Bar cache hit rate", f"{hit_rate:.0%}" if hit_rate is not None else "-")
+        h2.metric("Upstream requests", int(hub.counter_total("upstream_requests")))
+        h3.metric("Rate-limit wait", f"{hub.seconds_total('rate_limit_wait_seconds'):.2f}s")
+        h4.metric("Upstream time", f"{hub.seconds_total('upstream_seconds'):.2f}s")
+        st.dataframe(hub.stage_summary(), hide_index=True)
+        st.dataframe(hub.counter_summary(), hide_index=True)
@@ -0,0 +1,243 @@
+# ==========================================
+# Streamlit Pages - Single-Ticker Breakout Views
+# ==========================================
+# First-candle and 3-candle views of one symbol. Both pages share the
+# inputs, the session caches and yesterday's levels; the chart code
+# (plotly) is only imported the first time a chart is drawn.
+import threading
+
+import streamlit as st
+
+from analysis import daily_levels, developing_levels, first_candle_breakout, first_candle_by_timeframe, \
+    three_candle_breakout, today_intraday
+from app_timing import lazy_import
+from cpr_engine import TREND_DISPLAY
+from cpr_history import CPRHistory
+from data_fetch import market_tz, now
+from data_hub import shared_hub
+from resample import BASE_INTERVAL, TIMEFRAMES, TimeframeBook
+
+DEFAULT_TICKER = "ASIANPAINT.NS"
+
+# --------------------------
+# Session caches
+# --------------------------
+# Every widget change reruns the page; downloads, CPR levels and charts are
+# memoized per (ticker, interval, trading date) so reruns skip the network.
+DAILY_TTL = 6 * 60 * 60
+INTRADAY_TTL = 60
+
+
+@st.cache_resource
+def get_bar_source():
+    # The process-wide data hub: sessions opening the same ticker share one download, which
+    # reads through the on-disk cache (only missing tails hit Yahoo); $CPR_REPLAY replays instead
+    return shared_hub()
+
+
+@st.cache_resource(ttl=DAILY_TTL)
+def get_cpr_history():
+    # Appended pre-open by `cli.py history`; reloaded at most every DAILY_TTL
+    return CPRHistory()
+
+
+@st.cache_data(ttl=DAILY_TTL, max_entries=256, show_spinner=False)
+def cached_daily_levels(ticker, trading_date):
+    return daily_levels(ticker, get_bar_source(), trading_date)
+
+
+@st.cache_data(ttl=INTRADAY_TTL, max_entries=256, show_spinner=False)
+def cached_intraday(ticker, trading_date):
+    # Only the base interval is downloaded; 15m/30m/60m are resampled from it
+    return today_intraday(ticker, get_bar_source(), trading_date, BASE_INTERVAL)
+
+
+@st.cache_resource(max_entries=256, show_spinner=False)
+def timeframe_book(ticker, trading_date):
+    return TimeframeBook(ticker)
+
+
+def session_timeframes(ticker, trading_date):
+    # Folds in base bars from the last one seen on (a still-forming bar is refreshed)
+    book = timeframe_book(ticker, trading_date)
+    book.update(cached_intraday(ticker, trading_date))
+    return book
+
+
+@st.cache_resource(ttl=DAILY_TTL, max_entries=128, show_spinner=False)
+def chart_template(ticker, trading_date, title, zone_color, _yday):
+    # Levels are fixed for the day; the figure is shared, so updates go through its lock
+    charts = lazy_import("charts")
+    return charts.chart_template(_yday, title=title, tz=market_tz(ticker), zone_color=zone_color), threading.Lock()
+
+
+def show_chart(ticker, trading_date, intraday, yday, title, zone_color, marker=None):
+    # Reruns (new bars, another interval) only swap the data arrays of the cached figure
+    fig, lock = chart_template(ticker, trading_date, title, zone_color, yday)
+    with lock:
+        lazy_import("charts").update_chart(fig, intraday, marker)
+        st.plotly_chart(fig, use_container_width=True)
+
+
+# --------------------------
+# Shared inputs + levels
+# --------------------------
+def ticker_inputs():
+    """Symbol, interval and volume filter; kept in session state across both pages."""
+    saved = st.session_state.setdefault("ticker_inputs", {
+        "ticker": DEFAULT_TICKER, "interval": TIMEFRAMES[0], "vol_filter": "No",
+    })
+    col1, col2, col3 = st.columns([1, 1, 1])
+    with col1:
+        ticker = st.text_input("Enter Stock Symbol (e.g., ASIANPAINT.NS):", saved["ticker"])
+    with col2:
+        interval = st.selectbox("Intraday Interval:", TIMEFRAMES, index=TIMEFRAMES.index(saved["interval"]))
+    with col3:
+        vol_filter = st.selectbox("Apply Volume Breakout Filter?", ["No", "Yes"],
+                                  index=["No", "Yes"].index(saved["vol_filter"]))
+    saved.update(ticker=ticker, interval=interval, vol_filter=vol_filter)
+
+    # The analysis stays on screen after the click; later widget changes re-render it from the caches
+    if st.button("Run Analysis"):
+        st.session_state["analysis_ticker"] = ticker
+    return st.session_state.get("analysis_ticker"), interval, vol_filter == "Yes"
+
+
+def yesterday_levels(ticker, today):
+    """(daily bars, yesterday's levels row) for `ticker`; stops the page without enough data."""
+    daily, yday = cached_daily_levels(ticker, today)
+    if yday is None:
+        st.error("Not enough daily data to calculate CPR trend.")
+        st.stop()
+
+    st.write(f"**Yesterday CPR:** Pivot={yday['Pivot']:.2f}, BC={yday['BC']:.2f}, TC={yday['TC']:.2f}")
+    st.write(f"R1={yday['R1']:.2f}, R2={yday['R2']:.2f}, S1={yday['S1']:.2f}, S2={yday['S2']:.2f}")
+    st.info(f"**CPR Trend:** {TREND_DISPLAY[yday['CPR Trend']]}")
+
+    # Multi-day context, when the persistent CPR history covers yesterday
+    latest = history_through(ticker, yday)
+    if latest is not None:
+        context = latest.loc[ticker]
+        st.caption(
+            f"Ascending streak: {int(context['Ascending Streak'])} days · "
+            f"CPR width percentile (20d/60d): {context['Width Pctl 20']:.0f} / {context['Width Pctl 60']:.0f} · "
+            f"Open virgin CPRs: {int(context['Open Virgin CPRs'])}"
+        )
+    return daily, yday
+
+
+def history_through(ticker, yday):
+    """CPRHistory.latest() when it has `ticker` appended through yesterday, else None."""
+    latest = get_cpr_history().latest()
+    if ticker in latest.index and latest.loc[ticker, "Date"].date() == yday["Date"].date():
+        return latest
+    return None
+
+
+def developing_cpr_caption(ticker, book, yday):
+    # Tomorrow's provisional CPR from today's running high/low/close
+    latest = history_through(ticker, yday)
+    if latest is None:
+        return
+    tomorrow = developing_levels(ticker, book.view(book.base_interval), latest)
+    if tomorrow is not None:
+        st.caption(
+            f"Developing CPR (tomorrow): Pivot={tomorrow['Pivot']:.2f}, BC={tomorrow['BC']:.2f}, "
+            f"TC={tomorrow['TC']:.2f} · {tomorrow['CPR-Type']} · "
+            f"{TREND_DISPLAY.get(tomorrow['CPR Trend'], tomorrow['CPR Trend'])}"
+        )
+
+
+def render(view):
+    """One single-ticker page; `view` is "first_candle" or "three_candle"."""
+    ticker, interval, vol_filter = ticker_inputs()
+    if not ticker:
+        return
+    today = now().date()
+
+    # --------------------------
+    # Step 1-4: Daily data, yesterday CPR, pivots and CPR trend
+    # --------------------------
+    daily, yday = yesterday_levels(ticker, today)
+
+    # --------------------------
+    # Step 5: Today's Intraday Data
+    # --------------------------
+    book = session_timeframes(ticker, today)
+    intraday = book.view(interval)
+    if intraday is None or intraday.empty:
+        st.error("No intraday data found for today.")
+        st.stop()
+    developing_cpr_caption(ticker, book, yday)
+
+    if view == "first_candle":
+        first_candle_view(ticker, today, book, intraday, yday, daily, vol_filter)
+    else:
+        three_candle_view(ticker, today, intraday, yday, daily, vol_filter)
+
+
+# --------------------------
+# Views
+# --------------------------
+def first_candle_view(ticker, today, book, intraday, yday, daily, vol_filter):
+    yday_high = float(yday["High"])
+
+    # --------------------------
+    # Step 6: First Candle Breakout Check
+    # --------------------------
+    first = first_candle_breakout(intraday, yday, daily, vol_filter)
+    first_close = first["candle"]["Close"]
+
+    if first["price_ok"] and not first["volume_ok"]:
+        st.warning("⚠️ Volume not sufficient for breakout")
+    if first["breakout"]:
+        st.success(f"✅ First candle closed above yesterday's high ({yday_high:.2f}) - Breakout Confirmed!")
+    else:
+        st.info(f"First candle close ({first_close:.2f}) below yesterday's high ({yday_high:.2f}) - No Breakout")
+
+    # Same check on every timeframe, all resampled from the one base fetch
+    with st.expander("⏱️ First candle breakout by timeframe"):
+        st.dataframe(first_candle_by_timeframe(book, yday, daily, vol_filter), hide_index=True)
+
+    # --------------------------
+    # Step 7: Plot
+    # --------------------------
+    show_chart(
+        ticker, today, intraday, yday,
+        title=f"{ticker} - First Candle CPR Breakout + Trend",
+        zone_color="green" if first_close > yday["Pivot"] else "yellow",
+        marker=first["candle"] if first["breakout"] else None,
+    )
+
+
+def three_candle_view(ticker, today, intraday, yday, daily, vol_filter):
+    yday_high = float(yday["High"])
+    ascending_cpr = yday["CPR Trend"] == "Ascending"
+
+    # --------------------------
+    # Step 3-4: 3-Candle Breakout Check (Ascending CPR) on the same intraday bars
+    # --------------------------
+    three = three_candle_breakout(intraday, yday, daily, vol_filter)
+    if not ascending_cpr:
+        st.info("Not Ascending CPR - the 3-candle setup only applies to ascending CPR days.")
+    elif not three["enough_candles"]:
+        st.warning("Not enough intraday candles for 3-candle pattern check")
+    else:
+        if not three["volume_ok"]:
+            st.warning("⚠️ Third candle volume not sufficient for breakout")
+
+        if three["breakout"]:
+            c3 = three["candle"]
+            st.success(f"✅ 3-Candle Breakout Confirmed! Third candle closed at {c3['Close']:.2f} above Yday High {yday_high:.2f} and R1 {yday['R1']:.2f}")
+        else:
+            st.info("3-Candle breakout pattern not formed yet.")
+
+    # --------------------------
+    # Step 5: Plot Intraday Chart
+    # --------------------------
+    show_chart(
+        ticker, today, intraday, yday,
+        title=f"{ticker} - 3-Candle CPR Breakout + Trend",
+        zone_color="green" if ascending_cpr else "yellow",
+        marker=three["candle"] if three["breakout"] else None,
+    )
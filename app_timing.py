@@ -0,0 +1,81 @@
+# ==========================================
+# App Startup Timing
+# ==========================================
+# Cold-start and rerun budgets for the Streamlit app. The first run of a
+# page in a server process pays that page's imports; every later rerun
+# (a widget change, another user's session) should only redraw from the
+# caches. Script runs and first-time imports are recorded in one
+# process-wide Telemetry and reported against the budgets.
+import importlib
+import sys
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+from telemetry import Telemetry
+
+COLD_START_BUDGET = 2.0  # seconds, first run of a page in the process
+RERUN_BUDGET = 0.3  # seconds, every run after that
+
+REPORT_COLUMNS = ["Page", "Run", "Calls", "Mean ms", "Max ms", "Budget ms", "Within Budget"]
+
+telemetry = Telemetry()
+
+_seen_pages = set()
+_lock = threading.Lock()
+
+
+def run_kind(page):
+    with _lock:
+        return "rerun" if page in _seen_pages else "cold"
+
+
+@contextmanager
+def timed_run(page):
+    """Time one script run of `page`, labelled cold or rerun."""
+    kind = run_kind(page)
+    try:
+        with telemetry.timer("script_seconds", page=page, run=kind):
+            yield kind
+    finally:
+        with _lock:
+            _seen_pages.add(page)
+
+
+def lazy_import(name):
+    """Import a module on first use, timing the import when it is not loaded yet."""
+    module = sys.modules.get(name)
+    if module is None:
+        with telemetry.timer("import_seconds", module=name):
+            module = importlib.import_module(name)
+    return module
+
+
+def report():
+    """Per page and run kind: timings vs the cold-start / rerun budget."""
+    rows = []
+    with telemetry.lock:
+        for (name, labels), hist in telemetry.histograms.items():
+            if name != "script_seconds":
+                continue
+            labels = dict(labels)
+            budget = COLD_START_BUDGET if labels["run"] == "cold" else RERUN_BUDGET
+            rows.append({
+                "Page": labels["page"],
+                "Run": labels["run"],
+                "Calls": hist.count,
+                "Mean ms": round(1000 * hist.total / hist.count, 1),
+                "Max ms": round(1000 * hist.max, 1),
+                "Budget ms": round(1000 * budget),
+                "Within Budget": hist.max <= budget,
+            })
+    return pd.DataFrame(rows, columns=REPORT_COLUMNS).sort_values(["Page", "Run"], ignore_index=True)
+
+
+def import_report():
+    """First-time imports done through lazy_import, slowest first."""
+    with telemetry.lock:
+        rows = [{"Module": dict(labels)["module"], "ms": round(1000 * hist.total, 1)}
+                for (name, labels), hist in telemetry.histograms.items() if name == "import_seconds"]
+    return pd.DataFrame(rows, columns=["Module", "ms"]).sort_values("ms", ascending=False, ignore_index=True)
@@ -0,0 +1,219 @@
+# ==========================================
+# CPR Breakout Backtester
+# ==========================================
+# Replays stored daily + intraday bars session by session and applies the
+# same rules as the app (rules.RULES): ascending CPR filter, optional
+# volume filter and either the first-candle or the 3-candle
+# (green/red/green) breakout, or any other registered rule.
+# Entries are taken at the signal candle's close; exits are the first of
+# target (next R1/R2 above entry) or stop (S1) hit later in the session,
+# otherwise the session close. Each symbol is fully vectorized and symbol
+# chunks run in a process pool.
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from cpr_engine import compute_levels, to_panel
+from data_fetch import chunked, market_tz
+from rules import RULES as RULE_REGISTRY
+from rules import Rule, evaluate, volume_above
+
+VOLUME_LOOKBACK = 7
+
+RULES = ["first_candle", "three_candle"]
+
+TARGET_LEVELS = ["R1", "R2"]
+
+STOP_LEVELS = ["S1", "S2"]
+
+TRADE_COLUMNS = ["Symbol", "Session", "Rule", "Entry Time", "Entry", "Target", "Stop",
+                 "Exit Time", "Exit", "Exit Reason", "Return %"]
+
+
+def session_levels(daily, volume_lookback=VOLUME_LOOKBACK):
+    """Levels each session trades against, indexed by session date (built from the prior bar)."""
+    levels = compute_levels(to_panel({"_": daily})).droplevel("Symbol")
+    sessions = levels[["High", "Low", "Pivot", "BC", "TC", "R1", "R2", "S1", "S2", "CPR Width %", "CPR Trend",
+                       "CPR-Type"]].shift(1)
+    sessions = sessions.rename(columns={"High": "Yesterday High", "Low": "Yesterday Low"})
+    sessions["Avg Volume"] = daily["Volume"].rolling(volume_lookback, min_periods=1).mean().shift(1)
+    sessions.index = pd.DatetimeIndex(sessions.index).normalize()
+    return sessions
+
+
+def session_candles(intraday, tz):
+    """Intraday bars with a Session date and candle number within the session."""
+    bars = intraday[["Open", "High", "Low", "Close", "Volume"]].dropna(subset=["Open", "High", "Low", "Close"])
+    index = bars.index
+    if index.tz is not None:
+        index = index.tz_convert(tz)
+    bars = bars.reset_index(drop=True)
+    bars["Time"] = index
+    bars["Session"] = index.normalize().tz_localize(None) if index.tz is not None else index.normalize()
+    bars["n"] = bars.groupby("Session").cumcount()
+    return bars
+
+
+def opening_candles(bars, sessions, candles, how="inner"):
+    """Session levels joined with the first `candles` candles (c1 Open, c1 Close, c1 Volume, ...)."""
+    days = sessions
+    for k in range(candles):
+        candle = bars[bars["n"] == k].set_index("Session")
+        days = days.join(candle[["Open", "Close", "Volume"]].add_prefix(f"c{k + 1} "), how=how)
+    return days
+
+
+def signal_rule(rule, vol_filter=False):
+    """The rules.Rule for a rule name, with its volume-filtered variant when asked."""
+    if rule not in RULE_REGISTRY:
+        raise ValueError(f"Unknown rule: {rule}")
+    if not vol_filter:
+        return RULE_REGISTRY[rule]
+    if f"{rule}_volume" in RULE_REGISTRY:
+        return RULE_REGISTRY[f"{rule}_volume"]
+    spec = RULE_REGISTRY[rule]
+    return Rule(f"{rule}_volume", spec.predicates + [volume_above(spec.entry_candle)], spec.entry_candle)
+
+
+def find_signals(bars, sessions, rule, vol_filter=False):
+    """One row per session where `rule` fires: entry candle number and entry price."""
+    spec = signal_rule(rule, vol_filter)
+    days = opening_candles(bars, sessions, spec.candles)
+    fired = evaluate(days, [spec])[spec.name]
+    entry = days[f"c{spec.entry_candle} Close"]
+
+    signals = days.loc[fired, TARGET_LEVELS + STOP_LEVELS].copy()
+    signals["Entry"] = entry[fired]
+    signals["entry_n"] = spec.entry_candle - 1
+    return signals
+
+
+def simulate_exits(bars, signals, stop_level="S1"):
+    """Vectorized exit search for every signal at once."""
+    if signals.empty:
+        return pd.DataFrame(columns=["Session", "Entry", "Target", "Stop", "Entry Time", "Exit Time", "Exit", "Exit Reason"])
+
+    trades = signals.copy()
+    entry = trades["Entry"].to_numpy()
+    target = np.full(len(trades), np.nan)
+    for level in reversed(TARGET_LEVELS):
+        values = trades[level].to_numpy()
+        target = np.where(values > entry, values, target)
+    trades["Target"] = target
+    trades["Stop"] = trades[stop_level]
+    trades = trades.rename_axis("Session").reset_index()
+
+    merged = bars.merge(trades[["Session", "entry_n", "Target", "Stop"]], on="Session")
+    entry_time = merged[merged["n"] == merged["entry_n"]].set_index("Session")["Time"]
+
+    after = merged[merged["n"] > merged["entry_n"]]
+    hit_stop = after["Low"] <= after["Stop"]
+    hit_target = after["High"] >= after["Target"]
+    hits = after[hit_stop | hit_target].groupby("Session").head(1)
+    # Stop wins when one bar touches both levels
+    hits = hits.assign(
+        Exit=np.where(hits["Low"] <= hits["Stop"], hits["Stop"], hits["Target"]),
+        Reason=np.where(hits["Low"] <= hits["Stop"], "Stop", "Target"),
+    ).set_index("Session")
+
+    last = merged.groupby("Session").tail(1).set_index("Session")
+
+    trades = trades.set_index("Session")
+    trades["Entry Time"] = entry_time
+    trades["Exit Time"] = hits["Time"].combine_first(last["Time"])
+    trades["Exit"] = hits["Exit"].combine_first(last["Close"])
+    trades["Exit Reason"] = hits["Reason"].reindex(trades.index).fillna("Close")
+    return trades.reset_index()
+
+
+def backtest_symbol(symbol, daily, intraday, rules=RULES, vol_filter=False, stop_level="S1"):
+    """All trades for one symbol as a DataFrame with TRADE_COLUMNS."""
+    if daily is None or intraday is None or len(daily) < 3 or intraday.empty:
+        return pd.DataFrame(columns=TRADE_COLUMNS)
+
+    sessions = session_levels(daily)
+    bars = session_candles(intraday, market_tz(symbol))
+
+    frames = []
+    for rule in rules:
+        trades = simulate_exits(bars, find_signals(bars, sessions, rule, vol_filter), stop_level)
+        if trades.empty:
+            continue
+        trades["Symbol"] = symbol
+        trades["Rule"] = rule
+        trades["Return %"] = (trades["Exit"] - trades["Entry"]) / trades["Entry"] * 100
+        frames.append(trades[TRADE_COLUMNS])
+
+    if not frames:
+        return pd.DataFrame(columns=TRADE_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+# --------------------------
+# Universe run
+# --------------------------
+def _backtest_chunk(args):
+    symbols, source, start, end, interval, rules, vol_filter, stop_level = args
+    # Extra daily history so the first session has yesterday/day-before CPR + volume average
+    daily_start = pd.Timestamp(start) - timedelta(days=3 * VOLUME_LOOKBACK)
+    daily_bars = source.download(symbols, interval="1d", start=daily_start, end=end)
+    intraday_bars = source.download(symbols, interval=interval, start=start, end=end)
+
+    frames = [
+        backtest_symbol(symbol, daily_bars.get(symbol), intraday_bars.get(symbol), rules, vol_filter, stop_level)
+        for symbol in symbols
+    ]
+    frames = [frame for frame in frames if not frame.empty]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=TRADE_COLUMNS)
+
+
+def run_backtest(symbols, source, start, end=None, interval="5m", rules=RULES, vol_filter=False,
+                 stop_level="S1", workers=None, chunk_size=20):
+    """Trade log for the whole universe; chunks of symbols run in a process pool."""
+    tasks = [
+        (chunk, source, start, end, interval, rules, vol_filter, stop_level)
+        for chunk in chunked(symbols, chunk_size)
+    ]
+    if workers == 1:
+        frames = [_backtest_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            frames = list(pool.map(_backtest_chunk, tasks))
+
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=TRADE_COLUMNS)
+    trades = pd.concat(frames, ignore_index=True)
+    return trades.sort_values(["Entry Time", "Symbol"], ignore_index=True)
+
+
+def max_drawdown(returns):
+    equity = returns.cumsum()
+    return float((equity.cummax() - equity).max()) if len(equity) else 0.0
+
+
+def summarize(trades):
+    """Aggregate stats per rule: hit rate, expectancy, drawdown (all in %)."""
+    rows = []
+    for rule, group in trades.groupby("Rule"):
+        # Stable sort keeps run_backtest's symbol order for same-time entries
+        returns = group.sort_values("Entry Time", kind="stable")["Return %"].astype(float)
+        wins = returns[returns > 0]
+        losses = returns[returns <= 0]
+        win_rate = len(wins) / len(returns)
+        rows.append({
+            "Rule": rule,
+            "Trades": len(returns),
+            "Win Rate %": win_rate * 100,
+            "Avg Win %": wins.mean() if len(wins) else 0.0,
+            "Avg Loss %": losses.mean() if len(losses) else 0.0,
+            "Expectancy %": returns.mean(),
+            "Total Return %": returns.sum(),
+            "Max Drawdown %": max_drawdown(returns),
+            "Target Hits": int((group["Exit Reason"] == "Target").sum()),
+            "Stop Hits": int((group["Exit Reason"] == "Stop").sum()),
+        })
+    return pd.DataFrame(rows)
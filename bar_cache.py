@@ -0,0 +1,163 @@
+# ==========================================
+# Persistent OHLCV Bar Cache
+# ==========================================
+# Keeps every bar ever fetched in one Parquet file per symbol and interval
+# (<root>/<interval>/<symbol>.parquet). Completed bars never change, so a
+# read only goes upstream for the missing tail since the last cached bar;
+# the current trading day's bars are re-fetched once they are older than
+# TODAY_TTL_SECONDS.
+import os
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from data_fetch import DataSource, now, slice_bars
+from telemetry import Telemetry
+
+DEFAULT_CACHE_DIR = os.environ.get("CPR_BAR_CACHE", ".bar_cache")
+
+TODAY_TTL_SECONDS = 60
+
+# Calendar days beyond the weekends an "Nd" window allows for exchange holidays
+HOLIDAY_SLACK_DAYS = 4
+
+
+def window_start(period=None, start=None, today=None):
+    """First calendar date a period/start request needs (an "Nd" period is trimmed to N sessions later)."""
+    if start is not None:
+        return pd.Timestamp(start).date()
+    if not period or period == "max":
+        return datetime(1970, 1, 1).date()
+    if period.endswith("mo"):
+        days = 31 * int(period[:-2])
+    elif period.endswith("y"):
+        days = 366 * int(period[:-1])
+    elif period.endswith("wk"):
+        days = 7 * int(period[:-2])
+    else:
+        # N sessions span about N x 7/5 calendar days plus any holidays; the extra is trimmed to N sessions later
+        sessions = int(period[:-1])
+        days = -(-sessions * 7 // 5) + HOLIDAY_SLACK_DAYS
+    return today - timedelta(days=days)
+
+
+class BarCache:
+    def __init__(self, root=DEFAULT_CACHE_DIR, today_ttl=TODAY_TTL_SECONDS, clock=now):
+        self.root = root
+        self.today_ttl = today_ttl
+        self.clock = clock
+
+    def path(self, symbol, interval):
+        return os.path.join(self.root, interval, f"{symbol}.parquet")
+
+    def load(self, symbol, interval):
+        # Returns (bars, first date the cached history is complete from)
+        path = self.path(symbol, interval)
+        if not os.path.exists(path):
+            return None, None
+        frame = pd.read_parquet(path)
+        covered_from = frame.attrs.get("covered_from")
+        covered_from = pd.Timestamp(covered_from).date() if covered_from else frame.index[0].date()
+        return frame, covered_from
+
+    def save(self, symbol, interval, frame, covered_from):
+        path = self.path(symbol, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        frame = frame.copy()
+        frame.attrs = {"covered_from": covered_from.isoformat()}
+        # A unique temp name: hub requests for other windows of the same symbol may be saving it too
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        os.close(fd)
+        try:
+            frame.to_parquet(tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+    def touch(self, symbol, interval):
+        path = self.path(symbol, interval)
+        if os.path.exists(path):
+            os.utime(path)
+
+    def is_fresh(self, symbol, interval):
+        path = self.path(symbol, interval)
+        return os.path.exists(path) and time.time() - os.path.getmtime(path) < self.today_ttl
+
+
+class CachedSource(DataSource):
+    """Read-through cache in front of another DataSource."""
+
+    def __init__(self, upstream, cache=None, telemetry=None):
+        self.upstream = upstream
+        self.cache = cache or BarCache()
+        self.upstream_calls = 0
+        self.telemetry = telemetry or Telemetry()
+
+    def download(self, symbols, interval="1d", period=None, start=None, end=None):
+        today = self.cache.clock().date()
+        want_from = window_start(period, start, today)
+
+        bars = {}
+        stored = {}
+        plan = defaultdict(list)
+        for symbol in symbols:
+            frame, covered_from = self.cache.load(symbol, interval)
+            if frame is None or covered_from > want_from:
+                self.telemetry.count("cache_requests", interval=interval, result="miss")
+                plan[want_from].append(symbol)
+                continue
+
+            bars[symbol] = frame
+            stored[symbol] = covered_from
+            if self.cache.is_fresh(symbol, interval):
+                self.telemetry.count("cache_requests", interval=interval, result="hit")
+                continue
+            self.telemetry.count("cache_requests", interval=interval, result="topup")
+
+            # Past bars are final; only today's (partial) bars and the tail are re-fetched
+            past = frame[frame.index.date < today]
+            fetch_from = past.index[-1].date() + timedelta(days=1) if not past.empty else want_from
+            plan[fetch_from].append(symbol)
+
+        # One upstream request per distinct top-up start date
+        for fetch_from, group in plan.items():
+            self.upstream_calls += 1
+            fresh = self.upstream.download(group, interval=interval, start=fetch_from)
+            for symbol in group:
+                new = fresh.get(symbol)
+                if new is None or new.empty:
+                    self.cache.touch(symbol, interval)
+                    continue
+
+                if symbol in bars:
+                    kept = bars[symbol]
+                    kept = kept[kept.index < new.index[0]]
+                    merged = pd.concat([kept, new])
+                    merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+                    covered_from = min(stored[symbol], fetch_from)
+                else:
+                    merged = new.sort_index()
+                    covered_from = fetch_from
+                self.cache.save(symbol, interval, merged, covered_from)
+                bars[symbol] = merged
+
+        result = {}
+        for symbol, frame in bars.items():
+            frame = _window(frame, want_from, end, period)
+            if not frame.empty:
+                result[symbol] = frame
+        return result
+
+
+def _window(frame, want_from, end=None, period=None):
+    frame = frame[frame.index.date >= want_from]
+    if end is not None:
+        frame = frame[frame.index.date < pd.Timestamp(end).date()]
+    if period and period.endswith("d"):
+        # "1d" is the last session in the cache, not yesterday + today, the same as Yahoo and slice_bars
+        frame = slice_bars(frame, period=period)
+    return frame
@@ -0,0 +1,173 @@
+# ==========================================
+# Columnar In-Memory Bar Store
+# ==========================================
+# Bars for many symbols packed into one contiguous (5, n) array (Open, High,
+# Low, Close, Volume rows) plus one int64 timestamp array. Symbol i owns
+# rows offsets[i]:offsets[i + 1], so per-symbol and per-date-range access is
+# a pair of index lookups returning NumPy views; nothing is copied after the
+# store is built and no per-row Series is ever created.
+import numpy as np
+import pandas as pd
+
+from data_fetch import OHLCV, market_tz
+
+OHLCV_INDEX = pd.Index(OHLCV)
+
+
+class BarView:
+    """Zero-copy window onto one symbol's bars.
+
+    Columns are NumPy views (`view["Close"]`, `view.close`); `view["Datetime"]`
+    is the matching DatetimeIndex in the symbol's market timezone.
+    """
+
+    __slots__ = ("symbol", "times", "values")
+
+    def __init__(self, symbol, times, values):
+        self.symbol = symbol
+        self.times = times
+        self.values = values
+
+    def __len__(self):
+        return len(self.times)
+
+    def __getitem__(self, name):
+        if name == "Datetime":
+            return self.times
+        return self.values[OHLCV.index(name)]
+
+    @property
+    def open(self):
+        return self.values[0]
+
+    @property
+    def high(self):
+        return self.values[1]
+
+    @property
+    def low(self):
+        return self.values[2]
+
+    @property
+    def close(self):
+        return self.values[3]
+
+    @property
+    def volume(self):
+        return self.values[4]
+
+    @property
+    def empty(self):
+        return len(self.times) == 0
+
+    def candle(self, i):
+        """Row i as a plain dict of floats (plus its Datetime)."""
+        candle = {name: float(self.values[k, i]) for k, name in enumerate(OHLCV)}
+        candle["Datetime"] = self.times[i]
+        return candle
+
+    def to_frame(self):
+        frame = pd.DataFrame(self.values.T, columns=OHLCV, index=self.times.rename("Datetime"))
+        return frame.reset_index()
+
+
+class BarStore:
+    def __init__(self, symbols, offsets, times, values):
+        self.symbols = list(symbols)
+        self.offsets = offsets  # int64, len(symbols) + 1
+        self.times = times  # DatetimeIndex, UTC for intraday bars, naive for daily
+        self.values = values  # (5, n) float array, rows in OHLCV order
+        self.position = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    @classmethod
+    def from_frames(cls, bars, dtype=np.float64):
+        """Pack {symbol: OHLCV frame} into one store (rows with a missing price are dropped)."""
+        frames = [(symbol, frame) for symbol, frame in bars.items() if frame is not None and not frame.empty]
+        tz_aware = any(frame.index.tz is not None for _, frame in frames)
+
+        symbols = []
+        lengths = []
+        stamps = []
+        blocks = []
+        for symbol, frame in frames:
+            if not frame.index.is_monotonic_increasing:
+                frame = frame.sort_index()
+            if not frame.columns.equals(OHLCV_INDEX):
+                frame = frame.reindex(columns=OHLCV)
+            block = frame.to_numpy(dtype=dtype)
+            keep = ~np.isnan(block[:, :4]).any(axis=1)
+            if not keep.any():
+                continue
+            index = frame.index
+            if not keep.all():
+                index, block = index[keep], block[keep]
+            if tz_aware:
+                index = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+            symbols.append(symbol)
+            lengths.append(len(index))
+            stamps.append(index.as_unit("ns").asi8)
+            blocks.append(block)
+
+        offsets = np.zeros(len(symbols) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        # One transposing copy into the (field, row) layout
+        values = np.empty((len(OHLCV), int(offsets[-1])), dtype=dtype)
+        if blocks:
+            values.T[:] = np.concatenate(blocks)
+        stamps = np.concatenate(stamps) if stamps else np.empty(0, dtype=np.int64)
+        times = pd.DatetimeIndex(stamps.view("M8[ns]"), tz="UTC" if tz_aware else None)
+        return cls(symbols, offsets, times, values)
+
+    # --------------------------
+    # Lookups
+    # --------------------------
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        return symbol in self.position
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.times.asi8.nbytes + self.offsets.nbytes
+
+    def span(self, symbol, start=None, end=None):
+        """(first, stop) row positions of `symbol` with start <= time < end."""
+        i = self.position[symbol]
+        first, stop = int(self.offsets[i]), int(self.offsets[i + 1])
+        if start is None and end is None:
+            return first, stop
+        stamps = self.times.asi8[first:stop]
+        lo = 0 if start is None else int(np.searchsorted(stamps, self._stamp(start, symbol), "left"))
+        hi = len(stamps) if end is None else int(np.searchsorted(stamps, self._stamp(end, symbol), "left"))
+        return first + lo, first + max(lo, hi)
+
+    def view(self, symbol, start=None, end=None):
+        first, stop = self.span(symbol, start, end)
+        times = self.times[first:stop]
+        if times.tz is not None:
+            times = times.tz_convert(market_tz(symbol))
+        return BarView(symbol, times, self.values[:, first:stop])
+
+    def first_rows(self, symbols):
+        """Row position of each symbol's first bar (symbols must be in the store)."""
+        return self.offsets[[self.position[symbol] for symbol in symbols]]
+
+    def rows_before(self, cutoff):
+        """Per symbol, the number of bars strictly before `cutoff` (a date or timestamp)."""
+        stamp = pd.Timestamp(cutoff)
+        if self.times.tz is not None and stamp.tzinfo is None:
+            stamp = stamp.tz_localize("UTC")
+        if not len(self):
+            return np.zeros(0, dtype=np.int64)
+        before = (self.times.asi8 < stamp.value).astype(np.int64)
+        return np.add.reduceat(before, self.offsets[:-1])
+
+    def _stamp(self, value, symbol):
+        # Naive start/end on intraday bars are wall-clock times in the symbol's market
+        stamp = pd.Timestamp(value)
+        if self.times.tz is not None:
+            stamp = stamp.tz_localize(market_tz(symbol)) if stamp.tzinfo is None else stamp
+            stamp = stamp.tz_convert("UTC")
+        return stamp.value
@@ -0,0 +1,255 @@
+# ==========================================
+# Scan + Analysis Benchmark
+# ==========================================
+# Offline, reproducible timings for the upload-scan pipeline and the
+# single-ticker analysis at several universe sizes. Bars come from
+# synthetic fixtures (or a fixture directory), never from the network.
+#
+#   python benchmark.py --sizes 50 200 500 2000 --out bench_results.json
+#   python benchmark.py --compare bench_results.json     # diff against a saved run
+#   python benchmark.py --sizes --startup                # app cold-start / rerun vs budget only
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+from analysis import daily_levels, first_candle_breakout, three_candle_breakout, today_intraday
+from charts import cpr_chart
+from data_fetch import FixtureSource, MemorySource, market_tz
+from fixtures import synthetic_bars, synthetic_symbols
+from scan_executor import ScanExecutor
+from scanner import RESULT_COLUMNS, run_scan, scan_chunk
+from telemetry import Telemetry
+
+DEFAULT_SIZES = [50, 200, 500, 2000]
+
+SCAN_STAGES = ["daily_fetch", "cpr_compute", "trend_filter", "intraday_fetch", "breakout_check"]
+
+# Modules each app page loads on its first run (charts: first chart drawn)
+STARTUP_PAGES = {"scan": ["app_scan"], "ticker": ["app_ticker"], "chart": ["app_ticker", "charts"]}
+
+STARTUP_PROBE = """
+import sys, time
+start = time.perf_counter()
+import streamlit
+base = time.perf_counter()
+for name in sys.argv[1:]:
+    __import__(name)
+print(base - start, time.perf_counter() - base)
+"""
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class Stages:
+    def __init__(self):
+        self.seconds = {}
+
+    @contextmanager
+    def __call__(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - start
+
+
+def scan_stages(symbols, source, today, stage):
+    """The scan pipeline split into its stages (the universe as one scan_chunk, no thread pool)."""
+    telemetry = Telemetry()
+    rows, _ = scan_chunk(symbols, source, today, telemetry=telemetry)
+    for name in SCAN_STAGES:
+        stage.seconds[name] = telemetry.seconds_total("stage_seconds", stage=name)
+
+    with stage("dataframe"):
+        result_df = pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+    with stage("render"):
+        # Streamlit ships st.dataframe to the browser as Arrow IPC
+        import pyarrow as pa
+        pa.Table.from_pandas(result_df).to_batches()
+
+    return result_df
+
+
+def analysis_stages(ticker, source, today, stage):
+    with stage("daily_levels"):
+        daily, yday = daily_levels(ticker, source, today, period="15d")
+    with stage("intraday_fetch"):
+        intraday = today_intraday(ticker, source, today, "5m")
+    with stage("breakout_check"):
+        first = first_candle_breakout(intraday, yday, daily)
+        three_candle_breakout(intraday, yday, daily)
+    with stage("render"):
+        fig = cpr_chart(intraday, yday, title=ticker, tz=market_tz(ticker), zone_color="green",
+                        marker=first["candle"] if first["breakout"] else None)
+        fig.to_json()
+
+
+def startup_stages(repeat=3):
+    """Cold-start cost per app page: imports in a fresh interpreter, then a first run and a rerun."""
+    best = {}
+    for page, modules in STARTUP_PAGES.items():
+        for _ in range(repeat):
+            probe = subprocess.run([sys.executable, "-c", STARTUP_PROBE, *modules], cwd=APP_DIR,
+                                   capture_output=True, text=True, check=True)
+            streamlit_s, page_s = (float(value) for value in probe.stdout.split())
+            best["startup.import_streamlit"] = min(best.get("startup.import_streamlit", float("inf")), streamlit_s)
+            best[f"startup.import_{page}"] = min(best.get(f"startup.import_{page}", float("inf")), page_s)
+
+    # Script runs of the default page (the scan page before any upload: no network)
+    from streamlit.testing.v1 import AppTest
+    app = AppTest.from_file(os.path.join(APP_DIR, "CPR.py"), default_timeout=60)
+    start = time.perf_counter()
+    app.run()
+    best["startup.first_run"] = time.perf_counter() - start
+    for _ in range(repeat):
+        start = time.perf_counter()
+        app.run()
+        best["startup.rerun"] = min(best.get("startup.rerun", float("inf")), time.perf_counter() - start)
+    return best
+
+
+def run_size(size, bars=None, fixtures=None, repeat=3, workers=8, memory=True):
+    symbols = synthetic_symbols(size)
+    if fixtures:
+        source = FixtureSource(fixtures)
+        # The fixture's last daily bar is the session being scanned
+        today = source.load(symbols[0], "1d").index[-1].date()
+    else:
+        bars = bars or synthetic_bars(symbols)
+        source = MemorySource(bars)
+        today = bars["1d"][symbols[0]].index[-1].date()
+
+    # ---- Timings: best of `repeat` runs per stage ----
+    best = {}
+    hits = 0
+    for _ in range(repeat):
+        stage = Stages()
+        result_df = scan_stages(symbols, source, today, stage)
+        with stage("scan_total"):
+            run_scan(symbols, source, today, executor=ScanExecutor(workers=workers))
+        for name, seconds in stage.seconds.items():
+            best[f"scan.{name}"] = min(best.get(f"scan.{name}", float("inf")), seconds)
+
+        stage = Stages()
+        analysis_stages(symbols[0], source, today, stage)
+        for name, seconds in stage.seconds.items():
+            best[f"analysis.{name}"] = min(best.get(f"analysis.{name}", float("inf")), seconds)
+        hits = len(result_df)
+
+    result = {
+        "symbols": size,
+        "hits": hits,
+        "stages": best,
+        "symbols_per_second": size / best["scan.scan_total"] if best["scan.scan_total"] else None,
+    }
+
+    # ---- Peak Python heap for one full scan (separate pass, tracemalloc slows things down) ----
+    if memory:
+        tracemalloc.start()
+        run_scan(symbols, source, today, executor=ScanExecutor(workers=workers))
+        result["peak_memory_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    return result
+
+
+def environment():
+    try:
+        # The commit of this checkout, wherever the benchmark is run from
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit or None,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+    }
+
+
+def startup_report(stages):
+    """Cold start (fresh imports + first run) and rerun per page against the app budgets."""
+    from app_timing import COLD_START_BUDGET, RERUN_BUDGET
+
+    lines = []
+    for page in STARTUP_PAGES:
+        cold = stages["startup.import_streamlit"] + stages[f"startup.import_{page}"] + stages["startup.first_run"]
+        verdict = "ok" if cold <= COLD_START_BUDGET else "OVER"
+        lines.append(f"  cold start {page:<8} {cold:8.3f}s  (budget {COLD_START_BUDGET:.1f}s) {verdict}")
+    rerun = stages["startup.rerun"]
+    verdict = "ok" if rerun <= RERUN_BUDGET else "OVER"
+    lines.append(f"  rerun               {rerun:8.3f}s  (budget {RERUN_BUDGET:.1f}s) {verdict}")
+    return "\n".join(lines)
+
+
+def compare(current, baseline):
+    """Print per-stage ratios (current / baseline) for sizes present in both runs."""
+    if current.get("startup") and baseline.get("startup"):
+        print("\nstartup")
+        for name, seconds in current["startup"].items():
+            before = baseline["startup"].get(name)
+            if before:
+                print(f"  {name:<26} {before:9.4f}s -> {seconds:9.4f}s  x{seconds / before:5.2f}")
+    previous = {run["symbols"]: run for run in baseline["runs"]}
+    for run in current["runs"]:
+        old = previous.get(run["symbols"])
+        if old is None:
+            continue
+        print(f"\n{run['symbols']} symbols (vs {baseline['environment'].get('commit')})")
+        for name, seconds in run["stages"].items():
+            before = old["stages"].get(name)
+            if before:
+                print(f"  {name:<26} {before:9.4f}s -> {seconds:9.4f}s  x{seconds / before:5.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline scan/analysis benchmark")
+    parser.add_argument("--sizes", type=int, nargs="*", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--fixtures", help="fixture directory (synthetic SYNxxxx.NS symbols) instead of in-memory bars")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory pass")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--startup", action="store_true", help="also time the Streamlit app's cold start and rerun")
+    args = parser.parse_args(argv)
+
+    # Read before --out is written: comparing against the default results file is the usual case
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = {"environment": environment(), "runs": []}
+    if args.startup:
+        results["startup"] = startup_stages(args.repeat)
+        print("startup\n" + startup_report(results["startup"]), flush=True)
+    for size in args.sizes:
+        run = run_size(size, fixtures=args.fixtures, repeat=args.repeat, workers=args.workers,
+                       memory=not args.no_memory)
+        results["runs"].append(run)
+        memory = f"{run['peak_memory_mb']:.1f} MB" if "peak_memory_mb" in run else "-"
+        print(f"{size:>6} symbols  {run['stages']['scan.scan_total']:8.3f}s  "
+              f"{run['symbols_per_second']:9.1f} sym/s  peak {memory}", flush=True)
+
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+
+    if baseline is not None:
+        compare(results, baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
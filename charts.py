@@ -0,0 +1,152 @@
+# ==========================================
+# CPR Intraday Charts
+# ==========================================
+# A chart is split into a template (layout, level lines, CPR zone - fixed
+# for the day) and its data arrays. The template is built once and reruns
+# only swap the arrays. Candles are aggregated server-side to at most
+# screen resolution before they are sent, and scatter traces use WebGL
+# (Plotly has no WebGL candlestick), so the payload stays bounded for
+# multi-day or 1-minute views and for the small-multiples grid.
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from bar_store import BarView
+
+MAX_CANDLES = 400  # about one candle per 2-3 px on a full-width chart
+
+GRID_CANDLES = 48
+GRID_COLUMNS = 4
+MAX_GRID_CHARTS = 24
+GRID_ROW_HEIGHT = 220
+
+
+def downsample(view, max_candles=MAX_CANDLES):
+    """Merge consecutive bars so at most `max_candles` OHLC candles remain."""
+    n = len(view)
+    if n <= max_candles:
+        return view
+    step = -(-n // max_candles)
+    first = np.arange(0, n, step)
+    last = np.r_[first[1:] - 1, n - 1]
+
+    values = np.empty((5, len(first)), dtype=view.values.dtype)
+    values[0] = view.open[first]
+    values[1] = np.maximum.reduceat(view.high, first)
+    values[2] = np.minimum.reduceat(view.low, first)
+    values[3] = view.close[last]
+    values[4] = np.add.reduceat(view.volume, first)
+    return BarView(view.symbol, view.times[first], values)
+
+
+def chart_template(yday, title, tz, zone_color):
+    """Candles + yesterday's high, CPR zone and R1/R2/S1/S2 lines, with no bars yet."""
+    yday_high = float(yday["High"])
+    r1, r2, s1, s2 = (float(yday[level]) for level in ("R1", "R2", "S1", "S2"))
+
+    fig = go.Figure()
+
+    # Candlesticks (data filled in by update_chart)
+    fig.add_trace(go.Candlestick(x=[], open=[], high=[], low=[], close=[], name="Candles"))
+
+    # Breakout marker
+    fig.add_trace(go.Scattergl(
+        x=[], y=[],
+        mode="markers",
+        marker=dict(color="orange", size=14, symbol="star"),
+        name="Breakout"
+    ))
+
+    # Yesterday High
+    fig.add_hline(y=yday_high, line=dict(color="blue", dash="dash"), annotation_text=f"Yday High: {yday_high:.2f}")
+
+    # CPR Zone (full width, so it does not depend on the bars)
+    fig.add_shape(
+        type="rect",
+        xref="paper",
+        x0=0,
+        x1=1,
+        y0=float(yday["BC"]),
+        y1=float(yday["TC"]),
+        fillcolor=zone_color,
+        opacity=0.2,
+        layer="below",
+        line_width=0
+    )
+
+    # R1, R2, S1, S2 Lines
+    fig.add_hline(y=r1, line=dict(color="purple", dash="dot"), annotation_text=f"R1 {r1:.2f}")
+    fig.add_hline(y=r2, line=dict(color="purple", dash="dot"), annotation_text=f"R2 {r2:.2f}")
+    fig.add_hline(y=s1, line=dict(color="red", dash="dot"), annotation_text=f"S1 {s1:.2f}")
+    fig.add_hline(y=s2, line=dict(color="red", dash="dot"), annotation_text=f"S2 {s2:.2f}")
+
+    fig.update_layout(
+        title=title,
+        xaxis_title=f"Time ({tz})",
+        yaxis_title="Price",
+        template="plotly_dark",
+        xaxis_rangeslider_visible=False,
+        height=600,
+        xaxis=dict(type="date", tickformat="%H:%M"),
+        uirevision=title,  # keep the user's zoom when only the data changes
+    )
+    return fig
+
+
+def update_chart(fig, intraday, marker=None, max_candles=MAX_CANDLES):
+    """Swap the bars (and breakout marker) of a chart_template figure in place."""
+    candles = downsample(intraday, max_candles)
+    with fig.batch_update():
+        fig.data[0].update(x=candles.times, open=candles.open, high=candles.high, low=candles.low,
+                           close=candles.close)
+        if marker is not None:
+            fig.data[1].update(x=[marker["Datetime"]], y=[marker["Close"]], showlegend=True)
+        else:
+            fig.data[1].update(x=[], y=[], showlegend=False)
+    return fig
+
+
+def cpr_chart(intraday, yday, title, tz, zone_color, marker=None, max_candles=MAX_CANDLES):
+    """Candles + yesterday's high, CPR zone and R1/R2/S1/S2 lines.
+
+    `intraday` is a BarView; `marker` is an optional candle (Datetime/Close) to flag
+    as the breakout.
+    """
+    return update_chart(chart_template(yday, title, tz, zone_color), intraday, marker, max_candles)
+
+
+def small_multiples(panels, columns=GRID_COLUMNS, max_candles=GRID_CANDLES, max_charts=MAX_GRID_CHARTS):
+    """Grid of mini CPR charts, one per (intraday BarView, yesterday's levels row).
+
+    At most `max_charts` panels of `max_candles` candles each, and level
+    lines are two-point WebGL traces instead of shapes and annotations, so
+    the payload is bounded however many symbols qualified.
+    """
+    panels = list(panels)[:max_charts]
+    if not panels:
+        return go.Figure()
+    rows = -(-len(panels) // columns)
+    fig = make_subplots(rows=rows, cols=columns, subplot_titles=[view.symbol for view, _ in panels],
+                        horizontal_spacing=0.03, vertical_spacing=0.25 / rows)
+
+    for k, (view, yday) in enumerate(panels):
+        row, col = k // columns + 1, k % columns + 1
+        candles = downsample(view, max_candles)
+        fig.add_trace(go.Candlestick(x=candles.times, open=candles.open, high=candles.high, low=candles.low,
+                                     close=candles.close, name=view.symbol), row=row, col=col)
+
+        # Yesterday's high and the CPR band across the session
+        span = [candles.times[0], candles.times[-1]]
+        for level, color, dash in (("High", "blue", "dash"), ("TC", "green", "solid"), ("BC", "green", "solid")):
+            price = float(yday[level])
+            fig.add_trace(go.Scattergl(x=span, y=[price, price], mode="lines", name=level, hoverinfo="skip",
+                                       line=dict(color=color, width=1, dash=dash)), row=row, col=col)
+
+    fig.update_xaxes(rangeslider_visible=False, showticklabels=False)
+    fig.update_layout(
+        template="plotly_dark",
+        showlegend=False,
+        height=GRID_ROW_HEIGHT * rows,
+        margin=dict(l=20, r=20, t=40, b=20),
+    )
+    return fig
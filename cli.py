@@ -0,0 +1,457 @@
+# ==========================================
+# CPR + Breakout Strategy - Command Line Runner
+# ==========================================
+# Headless entry point over the same library the Streamlit app uses.
+#
+#   python cli.py scan nifty200.csv --out qualified_stocks.csv --timing --metrics-out scan_metrics.prom
+#   python cli.py scan nifty200.csv --rules first_candle narrow_cpr_breakout inside_cpr_breakout
+#   python cli.py scan nifty200.csv --report scan_report --report-formats html png
+#   python cli.py report qualified_stocks.csv --out scan_report
+#   python cli.py analyze ASIANPAINT.NS --interval 5m --volume-filter
+#   python cli.py backtest nifty200.csv --start 2024-01-01 --trades-out trades.csv
+#   python cli.py sweep nifty200.csv --start 2024-01-01 --search random --samples 500
+#   python cli.py stream nifty200.csv --replay candles.csv
+#   python cli.py history nifty200.csv && python cli.py screen --min-streak 3 --max-width-pctl 20
+#   python cli.py precompute nifty200.csv --next
+#   python cli.py near nifty200.csv --within 0.3 --levels R1 TC "Yesterday High"
+#   python cli.py record nifty200.csv --intraday-period 5d
+#   python cli.py scan nifty200.csv --offline .cpr_recordings --now "2026-02-24 09:45"
+#
+# Post-close / pre-open cron example (IST, Mon-Fri):
+#   45 15 * * 1-5 cd /path/to/CPR-Stratgy && python cli.py precompute nifty200.csv --next
+#   05 9 * * 1-5  cd /path/to/CPR-Stratgy && python cli.py history nifty200.csv
+#   10 9 * * 1-5  cd /path/to/CPR-Stratgy && python cli.py scan nifty200.csv --out qualified_stocks.csv
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+from data_fetch import CLOCK_ENV, now
+from level_snapshot import DEFAULT_SNAPSHOT_DIR, build_snapshot, load_snapshot, next_session, write_snapshot
+from proximity import PROXIMITY_LEVELS
+from replay import DEFAULT_RECORD_DIR
+from report import DEFAULT_REPORT_DIR, FORMATS
+from resample import TIMEFRAMES
+from rules import RULES, SCAN_RULES
+from scan_executor import DEFAULT_RATE, DEFAULT_RETRIES, DEFAULT_TIMEOUT, DEFAULT_WORKERS, ScanExecutor
+from scanner import SCAN_CHUNK_SIZE, default_source, iter_symbols, read_symbols, stream_scan
+from telemetry import Telemetry
+
+
+class StageTimer:
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def report(self, symbols=None):
+        lines = [f"{name:<12} {seconds:8.3f}s" for name, seconds in self.stages.items()]
+        total = sum(self.stages.values())
+        lines.append(f"{'total':<12} {total:8.3f}s")
+        if symbols:
+            lines.append(f"{'throughput':<12} {symbols / total if total else 0:8.1f} symbols/s")
+        return "\n".join(lines)
+
+
+def session_date(value):
+    return pd.Timestamp(value).date() if value else now().date()
+
+
+def add_source_args(parser):
+    parser.add_argument("--fixtures", help="read bars from a fixture directory instead of Yahoo")
+    parser.add_argument("--cache-dir", help="bar cache directory (default: .bar_cache or $CPR_BAR_CACHE)")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="upstream requests per second")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="seconds per request")
+    parser.add_argument("--offline", metavar="DIR", help="replay a recording (cli.py record) instead of Yahoo")
+    parser.add_argument("--record", metavar="DIR", help="also record every bar fetched into DIR")
+    parser.add_argument("--now", help="pin the clock, e.g. \"2026-02-24 09:45\" (market-local; default: $CPR_CLOCK)")
+
+
+def source_from_args(args, telemetry=None, processes=1):
+    # Each of `processes` worker processes gets its own copy of the rate limiter, so they split --rate
+    return default_source(rate=args.rate / processes, timeout=args.timeout, fixtures=args.fixtures,
+                          cache_dir=args.cache_dir, telemetry=telemetry, replay=args.offline, record=args.record)
+
+
+# --------------------------
+# Commands
+# --------------------------
+def cmd_scan(args):
+    timer = StageTimer()
+    symbols = iter_symbols(args.symbols_csv)
+    stat = os.stat(args.symbols_csv)
+    symbols_key = f"{os.path.abspath(args.symbols_csv)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    today = session_date(args.date)
+    snapshot = None
+    if not args.no_snapshot:
+        with timer.stage("snapshot"):
+            snapshot = load_snapshot(today, args.snapshot_dir)
+
+    telemetry = Telemetry()
+    executor = ScanExecutor(workers=args.workers, timeout=args.timeout, retries=args.retries, telemetry=telemetry)
+    hit_bars = {} if args.report else None
+    scanned = 0
+
+    def on_chunk(chunk, rows):
+        nonlocal scanned
+        scanned += len(chunk)
+
+    # Rows are appended to --out as chunks finish; an interrupted scan resumes from its checkpoint
+    with timer.stage("scan"):
+        stream_scan(symbols, source_from_args(args, telemetry), today, args.out, executor=executor,
+                    on_chunk=on_chunk, telemetry=telemetry, resume=not args.restart, key=symbols_key,
+                    chunk_size=args.chunk_size, snapshot=snapshot, rules=args.rules, hit_bars=hit_bars)
+    resumed = int(telemetry.counter_total("resumed_chunks"))
+    if resumed:
+        print(f"Resumed: {resumed} chunks were already scanned", file=sys.stderr)
+
+    with timer.stage("results"):
+        result_df = pd.read_parquet(args.out) if args.out.endswith(".parquet") else pd.read_csv(args.out)
+
+    if args.report and not result_df.empty:
+        from report import build_report
+
+        # Charts from the bars the scan already holds; no second download
+        with timer.stage("report"):
+            path, _ = build_report(result_df, hit_bars, args.report, args.report_formats)
+        print(f"Report: {path}", file=sys.stderr)
+
+    print(result_df.to_string(index=False) if not result_df.empty else "No stocks satisfied the conditions today.")
+    failures = executor.failure_summary()
+    if failures:
+        print("\nFailures:", ", ".join(f"{name}={count}" for name, count in failures.most_common()), file=sys.stderr)
+    if args.timing:
+        print("\n" + timer.report(scanned), file=sys.stderr)
+        print("\n" + telemetry.stage_summary().to_string(index=False), file=sys.stderr)
+    if args.metrics_out:
+        telemetry.write(args.metrics_out)
+    return 0
+
+
+def cmd_report(args):
+    from report import build_report, fetch_hit_bars
+
+    results = pd.read_parquet(args.results) if args.results.endswith(".parquet") else pd.read_csv(args.results)
+    if results.empty:
+        print("No qualified stocks to report.")
+        return 0
+    timer = StageTimer()
+    with timer.stage("fetch"):
+        hit_bars = fetch_hit_bars(results["Symbol"].tolist(), source_from_args(args), session_date(args.date))
+    with timer.stage("render"):
+        path, summary = build_report(results, hit_bars, args.out, args.formats, workers=args.workers)
+    print(summary.to_string(index=False))
+    print(f"\nReport: {path}")
+    if args.timing:
+        print("\n" + timer.report(len(results)), file=sys.stderr)
+    return 0
+
+
+def cmd_analyze(args):
+    from analysis import daily_levels, developing_levels, first_candle_breakout, first_candle_by_timeframe, \
+        three_candle_breakout, today_timeframes
+    from cpr_engine import TREND_DISPLAY
+    from cpr_history import CPRHistory
+
+    source = source_from_args(args)
+    today = session_date(args.date)
+
+    daily, yday = daily_levels(args.ticker, source, today)
+    if yday is None:
+        print("Not enough daily data to calculate CPR trend.", file=sys.stderr)
+        return 1
+
+    print(f"Yesterday CPR: Pivot={yday['Pivot']:.2f}, BC={yday['BC']:.2f}, TC={yday['TC']:.2f}")
+    print(f"R1={yday['R1']:.2f}, R2={yday['R2']:.2f}, S1={yday['S1']:.2f}, S2={yday['S2']:.2f}")
+    print(f"CPR Trend: {TREND_DISPLAY[yday['CPR Trend']]}")
+
+    book = today_timeframes(args.ticker, source, today)
+    intraday = book.view(args.interval)
+    if intraday is None or intraday.empty:
+        print("No intraday data found for today.", file=sys.stderr)
+        return 1
+
+    first = first_candle_breakout(intraday, yday, daily, args.volume_filter)
+    three = three_candle_breakout(intraday, yday, daily, args.volume_filter)
+    print(f"First candle breakout: {'yes' if first['breakout'] else 'no'}")
+    print(f"3-candle breakout: {'yes' if three['breakout'] else 'no'}")
+    if args.all_timeframes:
+        print(first_candle_by_timeframe(book, yday, daily, args.volume_filter).to_string(index=False))
+
+    # Tomorrow's provisional CPR, when the CPR history (cli.py history) covers yesterday
+    latest = (CPRHistory(args.history_dir) if args.history_dir else CPRHistory()).latest()
+    if args.ticker in latest.index and latest.loc[args.ticker, "Date"].date() == yday["Date"].date():
+        tomorrow = developing_levels(args.ticker, book.view(book.base_interval), latest)
+        if tomorrow is not None:
+            print(f"Developing CPR (tomorrow): Pivot={tomorrow['Pivot']:.2f}, BC={tomorrow['BC']:.2f}, "
+                  f"TC={tomorrow['TC']:.2f}, {tomorrow['CPR-Type']}, {tomorrow['CPR Trend']}")
+    return 0
+
+
+def cmd_backtest(args):
+    from backtest import RULES as BACKTEST_RULES
+    from backtest import run_backtest, summarize
+
+    symbols = read_symbols(args.symbols_csv)
+    source = source_from_args(args, processes=args.workers or os.cpu_count())
+    trades = run_backtest(symbols, source, args.start, args.end, interval=args.interval,
+                          rules=args.rules or BACKTEST_RULES, vol_filter=args.volume_filter, workers=args.workers)
+    trades.to_csv(args.trades_out, index=False)
+    print(summarize(trades).to_string(index=False))
+    return 0
+
+
+def cmd_sweep(args):
+    from optimizer import run_sweep
+
+    symbols = read_symbols(args.symbols_csv)
+    source = source_from_args(args, processes=args.workers or os.cpu_count())
+    ranked = run_sweep(symbols, source, args.start, args.end, interval=args.interval,
+                       search=args.search, samples=args.samples, seed=args.seed, workers=args.workers,
+                       min_trades=args.min_trades)
+    ranked.to_csv(args.out, index=False)
+    print(ranked.head(args.top).to_string(index=False) if not ranked.empty else "No parameter set met --min-trades.")
+    return 0
+
+
+def cmd_history(args):
+    from cpr_history import CPRHistory
+
+    history = CPRHistory(args.history_dir) if args.history_dir else CPRHistory()
+    appended = history.update(read_symbols(args.symbols_csv), source_from_args(args), session_date(args.date))
+    print(f"Appended {appended} symbol-days to {history.root}")
+    return 0
+
+
+def cmd_screen(args):
+    from cpr_history import FEATURE_COLUMNS, CPRHistory, screen
+
+    history = CPRHistory(args.history_dir) if args.history_dir else CPRHistory()
+    latest = history.latest()
+    if latest.empty:
+        print("CPR history is empty; run `cli.py history` first.", file=sys.stderr)
+        return 1
+    hits = screen(latest, min_streak=args.min_streak, max_width_pctl=args.max_width_pctl,
+                  width_window=args.width_window, virgin_only=args.virgin, narrow_only=args.narrow)
+    print(hits[["Date", "CPR Trend", "CPR-Type"] + FEATURE_COLUMNS].to_string() if not hits.empty
+          else "No symbols match.")
+    return 0
+
+
+def cmd_precompute(args):
+    timer = StageTimer()
+    symbols = read_symbols(args.symbols_csv)
+    session = session_date(args.date)
+    if args.next:
+        session = next_session(session)
+
+    with timer.stage("build"):
+        snapshot = build_snapshot(symbols, source_from_args(args), session)
+    with timer.stage("write"):
+        path = write_snapshot(snapshot, session, args.snapshot_dir)
+    print(f"Levels for {len(snapshot)}/{len(symbols)} symbols, session {session}: {path}")
+    if args.timing:
+        print("\n" + timer.report(len(symbols)), file=sys.stderr)
+    return 0
+
+
+def cmd_record(args):
+    from data_fetch import DAILY_CHUNK_SIZE, chunked, fetch_daily, fetch_intraday
+    from replay import RecordingSource
+
+    symbols = read_symbols(args.symbols_csv)
+    source = RecordingSource(source_from_args(args), args.out)
+    daily = fetch_daily(symbols, source, period=args.daily_period)
+    print(f"1d: {len(daily)}/{len(symbols)} symbols")
+    for interval in args.intervals:
+        intraday = {}
+        for chunk in chunked(symbols, DAILY_CHUNK_SIZE):
+            intraday.update(fetch_intraday(chunk, source, interval=interval, period=args.intraday_period))
+        print(f"{interval}: {len(intraday)}/{len(symbols)} symbols")
+    print(f"Recorded to {args.out}")
+    return 0
+
+
+def cmd_near(args):
+    from data_fetch import fetch_intraday
+    from proximity import LevelIndex
+
+    symbols = read_symbols(args.symbols_csv)
+    today = session_date(args.date)
+    snapshot = load_snapshot(today, args.snapshot_dir)
+    if snapshot is None:
+        print(f"No level snapshot for {today}; run `cli.py precompute` first.", file=sys.stderr)
+        return 1
+
+    index = LevelIndex.from_snapshot(snapshot[snapshot.index.isin(symbols)])
+    source = source_from_args(args)
+    intraday_bars = fetch_intraday(list(index.symbols), source, interval=args.interval, period="1d")
+    index.update({symbol: float(bars["Close"].iloc[-1]) for symbol, bars in intraday_bars.items()})
+    hits = index.near(args.within, levels=args.levels, side=args.side)
+    print(hits.to_string(index=False) if not hits.empty else "No symbols near the requested levels.")
+    return 0
+
+
+def cmd_stream(args):
+    from streaming import StreamingEngine, replay_feed, socket_feed
+
+    symbols = read_symbols(args.symbols_csv)
+    engine = StreamingEngine.for_session(symbols, source_from_args(args), session_date(args.date),
+                                         vol_filter=args.volume_filter)
+    feed = replay_feed(args.replay, args.speed) if args.replay else socket_feed(args.host, args.port)
+    engine.run(feed, on_event=lambda event: print(json.dumps(event, default=str), flush=True))
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="CPR + breakout strategy runner")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scan = commands.add_parser("scan", help="ascending CPR + first-candle breakout over a symbol list")
+    scan.add_argument("symbols_csv", help="CSV with a 'Symbol' column")
+    scan.add_argument("--out", default="qualified_stocks.csv", help=".csv or .parquet")
+    scan.add_argument("--date", help="session date (default: today)")
+    scan.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    scan.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
+    scan.add_argument("--timing", action="store_true", help="print per-stage wall time")
+    scan.add_argument("--metrics-out", help="write scan telemetry (.json, or .prom for Prometheus text format)")
+    scan.add_argument("--snapshot-dir", default=DEFAULT_SNAPSHOT_DIR, help="pre-market level snapshots")
+    scan.add_argument("--no-snapshot", action="store_true", help="always fetch daily bars")
+    scan.add_argument("--rules", nargs="+", choices=list(RULES), default=SCAN_RULES,
+                      help="rules to evaluate in one pass; with several, rows list the rules that fired")
+    scan.add_argument("--chunk-size", type=int, default=SCAN_CHUNK_SIZE,
+                      help="symbols per batched request; peak memory is about workers x chunk size")
+    scan.add_argument("--restart", action="store_true", help="ignore the checkpoint of an interrupted scan")
+    scan.add_argument("--report", metavar="DIR", help="also write an HTML chart report of the hits to DIR")
+    scan.add_argument("--report-formats", nargs="+", choices=FORMATS, default=["html"], help="png needs kaleido")
+    add_source_args(scan)
+    scan.set_defaults(func=cmd_scan)
+
+    report = commands.add_parser("report", help="HTML (+PNG) chart report for the symbols of a scan results file")
+    report.add_argument("results", help="scan output (.csv or .parquet)")
+    report.add_argument("--out", default=DEFAULT_REPORT_DIR)
+    report.add_argument("--formats", nargs="+", choices=FORMATS, default=["html"], help="png needs kaleido")
+    report.add_argument("--date", help="session date (default: today)")
+    report.add_argument("--workers", type=int, help="chart render processes (default: one per CPU)")
+    report.add_argument("--timing", action="store_true", help="print per-stage wall time")
+    add_source_args(report)
+    report.set_defaults(func=cmd_report)
+
+    analyze = commands.add_parser("analyze", help="single-ticker CPR levels and breakout checks")
+    analyze.add_argument("ticker")
+    analyze.add_argument("--interval", default="5m", choices=TIMEFRAMES, help="resampled from one 5m fetch")
+    analyze.add_argument("--all-timeframes", action="store_true", help="first-candle breakout on every timeframe")
+    analyze.add_argument("--volume-filter", action="store_true")
+    analyze.add_argument("--date", help="session date (default: today)")
+    analyze.add_argument("--history-dir", help="CPR history for the developing CPR (default: .cpr_history)")
+    add_source_args(analyze)
+    analyze.set_defaults(func=cmd_analyze)
+
+    backtest = commands.add_parser("backtest", help="replay stored bars through the breakout rules")
+    backtest.add_argument("symbols_csv", help="CSV with a 'Symbol' column")
+    backtest.add_argument("--start", required=True)
+    backtest.add_argument("--end")
+    backtest.add_argument("--interval", default="5m")
+    backtest.add_argument("--rules", nargs="+", choices=[rule for rule in RULES if not rule.endswith("_volume")],
+                          help="--volume-filter selects each rule's _volume variant")
+    backtest.add_argument("--volume-filter", action="store_true")
+    backtest.add_argument("--workers", type=int)
+    backtest.add_argument("--trades-out", default="backtest_trades.csv")
+    add_source_args(backtest)
+    backtest.set_defaults(func=cmd_backtest)
+
+    sweep = commands.add_parser("sweep", help="grid/random search over the strategy thresholds")
+    sweep.add_argument("symbols_csv", help="CSV with a 'Symbol' column")
+    sweep.add_argument("--start", required=True)
+    sweep.add_argument("--end")
+    sweep.add_argument("--interval", default="5m")
+    sweep.add_argument("--search", default="grid", choices=["grid", "random"])
+    sweep.add_argument("--samples", type=int, default=200, help="parameter sets to draw with --search random")
+    sweep.add_argument("--seed", type=int, default=0)
+    sweep.add_argument("--min-trades", type=int, default=10)
+    sweep.add_argument("--workers", type=int)
+    sweep.add_argument("--top", type=int, default=20)
+    sweep.add_argument("--out", default="sweep_results.csv")
+    add_source_args(sweep)
+    sweep.set_defaults(func=cmd_sweep)
+
+    history = commands.add_parser("history", help="append completed days to the persistent CPR history")
+    history.add_argument("symbols_csv", help="CSV with a 'Symbol' column")
+    history.add_argument("--date", help="session date; days before it are appended (default: today)")
+    history.add_argument("--history-dir", help="default: .cpr_history or $CPR_HISTORY_DIR")
+    add_source_args(history)
+    history.set_defaults(func=cmd_history)
+
+    screen = commands.add_parser("screen", help="multi-day CPR patterns from the stored history")
+    screen.add_argument("--min-streak", type=int, default=0, help="consecutive ascending-CPR days")
+    screen.add_argument("--max-width-pctl", type=float, help="CPR width percentile ceiling (narrowest = 0)")
+    screen.add_argument("--width-window", type=int, default=20, choices=[20, 60])
+    screen.add_argument("--virgin", action="store_true", help="only symbols with an untested virgin CPR")
+    screen.add_argument("--narrow", action="store_true", help="only narrow CPRs")
+    screen.add_argument("--history-dir", help="default: .cpr_history or $CPR_HISTORY_DIR")
+    screen.set_defaults(func=cmd_screen)
+
+    precompute = commands.add_parser("precompute", help="build the next session's level snapshot")
+    precompute.add_argument("symbols_csv", help="CSV with a 'Symbol' column")
+    precompute.add_argument("--date", help="session the levels are for (default: today)")
+    precompute.add_argument("--next", action="store_true", help="levels for the weekday after --date (post-close)")
+    precompute.add_argument("--snapshot-dir", default=DEFAULT_SNAPSHOT_DIR, help="default: .cpr_snapshots or $CPR_SNAPSHOT_DIR")
+    precompute.add_argument("--timing", action="store_true", help="print per-stage wall time")
+    add_source_args(precompute)
+    precompute.set_defaults(func=cmd_precompute)
+
+    record = commands.add_parser("record", help="record daily + intraday bars for offline replay (--offline)")
+    record.add_argument("symbols_csv", help="CSV with a 'Symbol' column")
+    record.add_argument("--out", default=DEFAULT_RECORD_DIR, help="recording directory (merged into if it exists)")
+    record.add_argument("--daily-period", default="1y")
+    record.add_argument("--intraday-period", default="5d", help="Yahoo keeps about 60 days of 5m bars")
+    record.add_argument("--intervals", nargs="+", default=["5m"])
+    add_source_args(record)
+    record.set_defaults(func=cmd_record)
+
+    near = commands.add_parser("near", help="symbols trading within a % of their CPR/pivot levels")
+    near.add_argument("symbols_csv", help="CSV with a 'Symbol' column")
+    near.add_argument("--within", type=float, default=0.3, help="distance to the level, in %%")
+    near.add_argument("--levels", nargs="+", choices=PROXIMITY_LEVELS, help="default: every level")
+    near.add_argument("--side", choices=["below", "above"], help="only prices below / above the level")
+    near.add_argument("--interval", default="5m", help="last close of this interval is the live price")
+    near.add_argument("--date", help="session date (default: today)")
+    near.add_argument("--snapshot-dir", default=DEFAULT_SNAPSHOT_DIR)
+    add_source_args(near)
+    near.set_defaults(func=cmd_near)
+
+    stream = commands.add_parser("stream", help="evaluate breakouts on a live or replayed candle feed")
+    stream.add_argument("symbols_csv", help="CSV with a 'Symbol' column")
+    stream.add_argument("--replay", help="long CSV of candles (Symbol, Datetime, Open, High, Low, Close, Volume)")
+    stream.add_argument("--speed", type=float, help="replay pace as a multiple of real time")
+    stream.add_argument("--host", default="127.0.0.1")
+    stream.add_argument("--port", type=int, default=9009)
+    stream.add_argument("--date", help="session date (default: today)")
+    stream.add_argument("--volume-filter", action="store_true")
+    add_source_args(stream)
+    stream.set_defaults(func=cmd_stream)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if getattr(args, "now", None):
+        # Read by data_fetch.now() here and in worker processes
+        os.environ[CLOCK_ENV] = args.now
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
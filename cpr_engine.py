@@ -0,0 +1,147 @@
+# ==========================================
+# Vectorized CPR / Pivot Engine
+# ==========================================
+# Computes CPR, pivot levels, CPR width/type and the CPR trend for every
+# symbol and every date of a stacked OHLC panel in one pass of NumPy
+# operations. The levels on row (symbol, date) are built from that day's
+# bar, i.e. they are the levels for the *next* session.
+import numpy as np
+import pandas as pd
+
+NARROW_CPR_PCT = 0.25
+
+TREND_LABELS = ["Ascending", "Descending", "Inside", "Outside", "Neutral"]
+
+TREND_DISPLAY = {
+    "Ascending": "📈 Ascending CPR (Bullish)",
+    "Descending": "📉 Descending CPR (Bearish)",
+    "Inside": "📊 Inside Value CPR (Consolidation)",
+    "Outside": "🔄 Outside Value CPR (Volatile)",
+    "Neutral": "⚖️ Neutral CPR",
+}
+
+LEVEL_COLUMNS = ["Pivot", "BC", "TC", "R1", "R2", "S1", "S2", "CPR Width %", "CPR-Type", "CPR Trend"]
+
+
+def to_panel(bars):
+    """Stack {symbol: daily OHLCV frame} into one (Symbol, Date) panel."""
+    frames = {symbol: frame for symbol, frame in bars.items() if frame is not None and not frame.empty}
+    if not frames:
+        index = pd.MultiIndex.from_arrays([[], pd.DatetimeIndex([])], names=["Symbol", "Date"])
+        return pd.DataFrame(columns=["Open", "High", "Low", "Close", "Volume"], index=index)
+    panel = pd.concat(frames, names=["Symbol", "Date"])
+    return panel.sort_index()
+
+
+def cpr_levels(high, low, close, narrow_pct=NARROW_CPR_PCT):
+    """Pivot/CPR levels, CPR width and CPR-Type for aligned high/low/close arrays."""
+    # ---- CPR + pivot levels ----
+    pivot = (high + low + close) / 3
+    bc = (high + low) / 2
+    tc = 2 * pivot - bc
+    day_range = high - low
+
+    levels = {
+        "Pivot": pivot,
+        "BC": bc,
+        "TC": tc,
+        "R1": 2 * pivot - low,
+        "R2": pivot + day_range,
+        "S1": 2 * pivot - high,
+        "S2": pivot - day_range,
+    }
+
+    # ---- CPR Type ----
+    with np.errstate(divide="ignore", invalid="ignore"):
+        width_pct = np.abs(tc - bc) / pivot * 100
+    levels["CPR Width %"] = width_pct
+    levels["CPR-Type"] = np.where(width_pct < narrow_pct, "Narrow", "Wide")
+    return levels
+
+
+def cpr_trend(bc, tc, prev_bc, prev_tc, has_prev):
+    """CPR Trend label per row vs the previous day's CPR (None where there is none)."""
+    conditions = [
+        (bc > prev_bc) & (tc > prev_tc),
+        (bc < prev_bc) & (tc < prev_tc),
+        (bc >= prev_bc) & (tc <= prev_tc),
+        (bc < prev_bc) & (tc > prev_tc),
+    ]
+    trend = np.select(conditions, TREND_LABELS[:4], default="Neutral").astype(object)
+    trend[~has_prev] = None
+    return trend
+
+
+def compute_levels(panel, narrow_pct=NARROW_CPR_PCT):
+    """Add pivot/CPR levels, CPR-Type and CPR Trend columns to a (Symbol, Date) panel."""
+    panel = panel.sort_index()
+
+    high = panel["High"].to_numpy(dtype="float64")
+    low = panel["Low"].to_numpy(dtype="float64")
+    close = panel["Close"].to_numpy(dtype="float64")
+    computed = cpr_levels(high, low, close, narrow_pct)
+
+    # ---- CPR Trend (vs the previous row of the same symbol) ----
+    codes = pd.factorize(panel.index.get_level_values(0))[0]
+    has_prev = np.zeros(len(panel), dtype=bool)
+    has_prev[1:] = codes[1:] == codes[:-1]
+
+    bc, tc = computed["BC"], computed["TC"]
+    computed["CPR Trend"] = cpr_trend(bc, tc, np.roll(bc, 1), np.roll(tc, 1), has_prev)
+
+    levels = panel.copy()
+    for column in LEVEL_COLUMNS:
+        levels[column] = computed[column]
+    return levels
+
+
+def latest_levels(levels, before):
+    """Last completed day before `before` (a date) for every symbol, indexed by Symbol."""
+    dates = levels.index.get_level_values("Date")
+    cutoff = pd.Timestamp(before)
+    if dates.tz is not None:
+        cutoff = cutoff.tz_localize(dates.tz)
+    completed = levels[dates < cutoff]
+    latest = completed.groupby(level="Symbol", sort=False).tail(1)
+    return latest.reset_index(level="Date")
+
+
+def latest_store_levels(store, before, narrow_pct=NARROW_CPR_PCT, volume_lookbacks=()):
+    """latest_levels(compute_levels(...)) straight from a daily BarStore.
+
+    Only each symbol's last completed bar and the one before it are touched,
+    so the cost is O(symbols) however much history the store holds.
+    `volume_lookbacks` adds an "Avg Volume N" column (mean of the last N
+    completed days) per N.
+    """
+    counts = store.rows_before(before)
+    has_row = counts > 0
+    symbols = [symbol for symbol, ok in zip(store.symbols, has_row) if ok]
+    first = store.offsets[:-1][has_row]
+    last = first + counts[has_row] - 1
+    prev = np.maximum(last - 1, first)
+
+    open_, high, low, close, volume = store.values.astype("float64", copy=False)
+    computed = cpr_levels(high[last], low[last], close[last], narrow_pct)
+    previous = cpr_levels(high[prev], low[prev], close[prev], narrow_pct)
+    computed["CPR Trend"] = cpr_trend(computed["BC"], computed["TC"], previous["BC"], previous["TC"], last > first)
+
+    # Mean volumes from one cumulative sum over the store
+    averages = {}
+    if volume_lookbacks:
+        cumulative = np.r_[0.0, np.cumsum(np.nan_to_num(volume))]
+        for lookback in volume_lookbacks:
+            start = np.maximum(last + 1 - lookback, first)
+            averages[f"Avg Volume {lookback}"] = (cumulative[last + 1] - cumulative[start]) / (last + 1 - start)
+
+    latest = pd.DataFrame({
+        "Date": store.times[last],
+        "Open": open_[last],
+        "High": high[last],
+        "Low": low[last],
+        "Close": close[last],
+        "Volume": volume[last],
+        **{column: computed[column] for column in LEVEL_COLUMNS},
+        **averages,
+    }, index=pd.Index(symbols, name="Symbol"))
+    return latest
@@ -0,0 +1,289 @@
+# ==========================================
+# Persistent Multi-Day CPR History
+# ==========================================
+# One row per symbol per completed trading day, appended once and never
+# recomputed. Rolling multi-day features are carried in a small per-symbol
+# state (previous CPR, ascending streak, last 60 CPR widths, open virgin
+# CPR zones), so appending a day for the whole universe is a handful of
+# vectorized array updates, O(1) per symbol whatever the history length.
+#
+#   <root>/days/<YYYY-MM-DD>.parquet   rows appended for that trading day
+#   <root>/latest.parquet              newest row per symbol (what screens read)
+#   <root>/state.npz                   rolling state for the next append
+import os
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from cpr_engine import LEVEL_COLUMNS, NARROW_CPR_PCT, cpr_levels, cpr_trend
+from data_fetch import fetch_daily
+
+DEFAULT_HISTORY_DIR = os.environ.get("CPR_HISTORY_DIR", ".cpr_history")
+
+WIDTH_WINDOWS = [20, 60]
+
+MAX_VIRGIN_ZONES = 16
+
+BACKFILL_DAYS = 120
+
+NAT = np.iinfo(np.int64).min
+
+FEATURE_COLUMNS = ["Ascending Streak", "Width Pctl 20", "Width Pctl 60", "Prev CPR Virgin",
+                   "Open Virgin CPRs", "Virgin Above", "Virgin Below"]
+
+
+class CPRHistory:
+    def __init__(self, root=DEFAULT_HISTORY_DIR, narrow_pct=NARROW_CPR_PCT):
+        self.root = root
+        self.narrow_pct = narrow_pct
+        self._state = None
+        self._latest = None
+
+    # --------------------------
+    # Storage
+    # --------------------------
+    def day_path(self, date):
+        return os.path.join(self.root, "days", f"{pd.Timestamp(date).date().isoformat()}.parquet")
+
+    @property
+    def state(self):
+        if self._state is None:
+            path = os.path.join(self.root, "state.npz")
+            if os.path.exists(path):
+                with np.load(path, allow_pickle=False) as saved:
+                    self._state = {key: saved[key] for key in saved.files}
+                self._state["symbols"] = self._state["symbols"].astype(object)
+            else:
+                self._state = _empty_state(0)
+            self._state["position"] = {symbol: i for i, symbol in enumerate(self._state["symbols"])}
+        return self._state
+
+    def latest(self):
+        """Newest history row (levels + rolling features) per symbol, indexed by Symbol."""
+        if self._latest is None:
+            path = os.path.join(self.root, "latest.parquet")
+            self._latest = pd.read_parquet(path) if os.path.exists(path) else pd.DataFrame()
+        return self._latest
+
+    def history(self, symbols=None, since=None):
+        """Appended rows (all days, or days >= since) for some or all symbols."""
+        folder = os.path.join(self.root, "days")
+        if not os.path.isdir(folder):
+            return pd.DataFrame()
+        since = pd.Timestamp(since).date().isoformat() if since is not None else ""
+        files = sorted(name for name in os.listdir(folder) if name.endswith(".parquet") and name >= since)
+        frames = []
+        for name in files:
+            day = pd.read_parquet(os.path.join(folder, name))
+            frames.append(day if symbols is None else day[day.index.isin(symbols)])
+        return pd.concat(frames).sort_values("Date", kind="stable") if frames else pd.DataFrame()
+
+    def last_dates(self):
+        """Last appended date per symbol (NAT is NumPy's NaT bit pattern)."""
+        state = self.state
+        return pd.Series(state["last_date"].view("M8[ns]"), index=pd.Index(state["symbols"], name="Symbol"))
+
+    def save(self):
+        state = {key: value for key, value in self.state.items() if key != "position"}
+        state["symbols"] = np.asarray(state["symbols"], dtype=str)
+        os.makedirs(self.root, exist_ok=True)
+        tmp = os.path.join(self.root, "state.tmp.npz")
+        np.savez(tmp, **state)
+        os.replace(tmp, os.path.join(self.root, "state.npz"))
+        _write_parquet(self.latest(), os.path.join(self.root, "latest.parquet"))
+
+    # --------------------------
+    # Appending
+    # --------------------------
+    def append(self, date, day, save=True):
+        """Append one completed trading day; `day` is indexed by Symbol with High/Low/Close.
+
+        Symbols that already have this date (or a later one) are skipped, so
+        re-running a day is a no-op. Returns the rows written.
+        """
+        date = pd.Timestamp(date).normalize()
+        self._add_symbols([symbol for symbol in day.index if symbol not in self.state["position"]])
+        state = self.state
+        idx = np.array([state["position"][symbol] for symbol in day.index], dtype=np.int64)
+        fresh = state["last_date"][idx] < date.value
+        day, idx = day[fresh], idx[fresh]
+        if day.empty:
+            return day
+
+        high = day["High"].to_numpy(dtype="float64")
+        low = day["Low"].to_numpy(dtype="float64")
+        close = day["Close"].to_numpy(dtype="float64")
+        levels = cpr_levels(high, low, close, self.narrow_pct)
+
+        # ---- CPR Trend + consecutive ascending days ----
+        has_prev = state["last_date"][idx] != NAT
+        prev_bc, prev_tc = state["bc"][idx], state["tc"][idx]
+        levels["CPR Trend"] = cpr_trend(levels["BC"], levels["TC"], prev_bc, prev_tc, has_prev)
+        streak = np.where(levels["CPR Trend"] == "Ascending", state["streak"][idx] + 1, 0)
+
+        # ---- Virgin CPR: today's range never touched the CPR it traded against ----
+        zone_lo, zone_hi = state["zone_lo"][idx], state["zone_hi"][idx]
+        with np.errstate(invalid="ignore"):
+            touched = (zone_lo <= high[:, None]) & (zone_hi >= low[:, None])
+        zone_lo[touched] = np.nan
+        zone_hi[touched] = np.nan
+        prev_lo, prev_hi = np.minimum(prev_bc, prev_tc), np.maximum(prev_bc, prev_tc)
+        virgin = has_prev & ((low > prev_hi) | (high < prev_lo))
+        rows = np.flatnonzero(virgin)
+        if len(rows):
+            empty = np.isnan(zone_lo[rows])
+            # First free slot, or the oldest zone when all are taken
+            slot = np.where(empty.any(axis=1), empty.argmax(axis=1), state["zone_date"][idx[rows]].argmin(axis=1))
+            zone_lo[rows, slot] = prev_lo[rows]
+            zone_hi[rows, slot] = prev_hi[rows]
+            zone_date = state["zone_date"][idx]
+            zone_date[rows, slot] = state["last_date"][idx[rows]]
+            state["zone_date"][idx] = zone_date
+        state["zone_lo"][idx] = zone_lo
+        state["zone_hi"][idx] = zone_hi
+        with np.errstate(invalid="ignore"):
+            above = np.where(zone_lo > close[:, None], zone_lo, np.inf).min(axis=1)
+            below = np.where(zone_hi < close[:, None], zone_hi, -np.inf).max(axis=1)
+
+        # ---- CPR width percentile vs the last 20 / 60 sessions (ring buffer) ----
+        width = levels["CPR Width %"]
+        count = state["width_n"][idx]
+        capacity = state["widths"].shape[1]
+        state["widths"][idx, count % capacity] = width
+        count = count + 1
+        percentiles = {}
+        for window in WIDTH_WINDOWS:
+            back = (count[:, None] - 1 - np.arange(window)[None, :]) % capacity
+            recent = state["widths"][idx[:, None], back]
+            with np.errstate(invalid="ignore"):
+                rank = (recent <= width[:, None]).sum(axis=1) / window * 100
+            percentiles[window] = np.where(count >= window, rank, np.nan)
+
+        state["width_n"][idx] = count
+        state["bc"][idx] = levels["BC"]
+        state["tc"][idx] = levels["TC"]
+        state["streak"][idx] = streak
+        state["last_date"][idx] = date.value
+
+        rows = pd.DataFrame({"Date": date}, index=day.index)
+        for column in ["Open", "High", "Low", "Close", "Volume"]:
+            if column in day.columns:
+                rows[column] = day[column].to_numpy(dtype="float64")
+        for column in LEVEL_COLUMNS:
+            rows[column] = levels[column]
+        rows["Ascending Streak"] = streak
+        for window in WIDTH_WINDOWS:
+            rows[f"Width Pctl {window}"] = percentiles[window]
+        rows["Prev CPR Virgin"] = virgin
+        rows["Open Virgin CPRs"] = (~np.isnan(zone_lo)).sum(axis=1)
+        rows["Virgin Above"] = np.where(np.isinf(above), np.nan, above)
+        rows["Virgin Below"] = np.where(np.isinf(below), np.nan, below)
+        rows.index.name = "Symbol"
+
+        self._write_day(date, rows)
+        latest = self.latest()
+        self._latest = pd.concat([latest[~latest.index.isin(rows.index)], rows]) if not latest.empty else rows
+        if save:
+            self.save()
+        return rows
+
+    def backfill(self, daily_bars, before=None):
+        """Append every completed day of {symbol: daily frame} in date order (dates < before)."""
+        panel = pd.concat({symbol: frame for symbol, frame in daily_bars.items() if frame is not None and not frame.empty},
+                          names=["Symbol", "Date"]) if daily_bars else pd.DataFrame()
+        if panel.empty:
+            return 0
+        dates = panel.index.get_level_values("Date")
+        if before is not None:
+            panel = panel[dates < pd.Timestamp(before)]
+            dates = panel.index.get_level_values("Date")
+        appended = 0
+        for date, day in panel.groupby(dates.normalize(), sort=True):
+            appended += len(self.append(date, day.droplevel("Date"), save=False))
+        self.save()
+        return appended
+
+    def update(self, symbols, source, today):
+        """Fetch and append every completed day each symbol is missing (today's bar excluded)."""
+        last = self.last_dates().reindex(symbols)
+        known = last.dropna()
+        appended = 0
+        if len(known):
+            start = known.min().date() + timedelta(days=1)
+            appended += self.backfill(fetch_daily(list(known.index), source, start=start, end=today), before=today)
+        new = list(last.index[last.isna()])
+        if new:
+            start = today - timedelta(days=BACKFILL_DAYS)
+            appended += self.backfill(fetch_daily(new, source, start=start, end=today), before=today)
+        return appended
+
+    def _add_symbols(self, symbols):
+        if not symbols:
+            return
+        state = self.state
+        extra = _empty_state(len(symbols))
+        for key, value in extra.items():
+            if key == "symbols":
+                state[key] = np.concatenate([state[key], np.asarray(symbols, dtype=object)])
+            else:
+                state[key] = np.concatenate([state[key], value])
+        state["position"] = {symbol: i for i, symbol in enumerate(state["symbols"])}
+
+    def _write_day(self, date, rows):
+        path = self.day_path(date)
+        if os.path.exists(path):
+            existing = pd.read_parquet(path)
+            rows = pd.concat([existing[~existing.index.isin(rows.index)], rows])
+        _write_parquet(rows, path)
+
+
+def _empty_state(n):
+    return {
+        "symbols": np.empty(n, dtype=object),
+        "last_date": np.full(n, NAT, dtype=np.int64),
+        "bc": np.full(n, np.nan),
+        "tc": np.full(n, np.nan),
+        "streak": np.zeros(n, dtype=np.int64),
+        "widths": np.full((n, max(WIDTH_WINDOWS)), np.nan),
+        "width_n": np.zeros(n, dtype=np.int64),
+        "zone_lo": np.full((n, MAX_VIRGIN_ZONES), np.nan),
+        "zone_hi": np.full((n, MAX_VIRGIN_ZONES), np.nan),
+        "zone_date": np.full((n, MAX_VIRGIN_ZONES), NAT, dtype=np.int64),
+    }
+
+
+def _write_parquet(frame, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    frame.to_parquet(tmp)
+    os.replace(tmp, path)
+
+
+# --------------------------
+# Screens
+# --------------------------
+def developing_cpr(latest, high, low, close, narrow_pct=NARROW_CPR_PCT):
+    """Tomorrow's provisional CPR from today's running high/low/close (Series by Symbol).
+
+    `latest` is CPRHistory.latest(): its levels are the ones trading today,
+    so the developing trend is tomorrow's CPR vs today's.
+    """
+    high, low, close = (series.reindex(latest.index).to_numpy(dtype="float64") for series in (high, low, close))
+    levels = cpr_levels(high, low, close, narrow_pct)
+    has_today = ~np.isnan(high)
+    levels["CPR Trend"] = cpr_trend(levels["BC"], levels["TC"], latest["BC"].to_numpy(), latest["TC"].to_numpy(),
+                                    has_today)
+    return pd.DataFrame({column: levels[column] for column in LEVEL_COLUMNS}, index=latest.index)[has_today]
+
+
+def screen(latest, min_streak=0, max_width_pctl=None, width_window=20, virgin_only=False, narrow_only=False):
+    """Filter CPRHistory.latest() for multi-day CPR patterns."""
+    keep = latest["Ascending Streak"] >= min_streak
+    if max_width_pctl is not None:
+        keep &= latest[f"Width Pctl {width_window}"] <= max_width_pctl
+    if virgin_only:
+        keep &= latest["Open Virgin CPRs"] > 0
+    if narrow_only:
+        keep &= latest["CPR-Type"] == "Narrow"
+    return latest[keep].sort_values(["Ascending Streak", f"Width Pctl {width_window}"], ascending=[False, True])
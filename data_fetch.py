@@ -0,0 +1,211 @@
+# ==========================================
+# Universe Data Fetch Layer
+# ==========================================
+# Pulls OHLCV bars for a whole symbol list in a few multi-ticker requests
+# instead of one yf.download per symbol. Every source returns a plain
+# {symbol: DataFrame} dict with Open/High/Low/Close/Volume columns and a
+# DatetimeIndex, so the scanner never has to deal with MultiIndex frames.
+import os
+from datetime import datetime
+from itertools import islice
+
+import pandas as pd
+
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+
+DAILY_CHUNK_SIZE = 100
+
+SESSION_OPEN = {"Asia/Kolkata": "09:15", "America/New_York": "09:30"}
+
+INTERVAL_MINUTES = {"1m": 1, "2m": 2, "5m": 5, "15m": 15, "30m": 30, "60m": 60, "90m": 90}
+
+# "YYYY-MM-DD HH:MM" (market-local) pins now(), e.g. to replay a recorded session after hours
+CLOCK_ENV = "CPR_CLOCK"
+
+
+def now():
+    """Current (naive, local) time, or the time pinned by $CPR_CLOCK."""
+    pinned = os.environ.get(CLOCK_ENV)
+    return pd.Timestamp(pinned).to_pydatetime() if pinned else datetime.now()
+
+
+def market_tz(symbol):
+    return "Asia/Kolkata" if symbol.endswith(".NS") else "America/New_York"
+
+
+def session_open(symbol):
+    """Cash-session open (HH:MM, market-local) for the symbol's exchange."""
+    return SESSION_OPEN[market_tz(symbol)]
+
+
+def chunked(items, size):
+    # Lazy, so a generator of symbols is only read as far as the chunks consumed
+    items = iter(items)
+    while chunk := list(islice(items, size)):
+        yield chunk
+
+
+def split_frame(wide, symbols):
+    """Split a yf.download frame into {symbol: OHLCV frame}."""
+    bars = {}
+    if wide is None or wide.empty:
+        return bars
+
+    if not isinstance(wide.columns, pd.MultiIndex):
+        # Single symbol downloaded without a ticker level
+        frame = wide[[c for c in OHLCV if c in wide.columns]].dropna(how="all")
+        if len(symbols) == 1 and not frame.empty:
+            bars[symbols[0]] = frame
+        return bars
+
+    # yfinance uses (Ticker, Price) with group_by="ticker", (Price, Ticker) otherwise
+    ticker_level = 0 if wide.columns.get_level_values(1).isin(OHLCV).any() else 1
+    available = set(wide.columns.get_level_values(ticker_level))
+
+    for symbol in symbols:
+        if symbol not in available:
+            continue
+        frame = wide.xs(symbol, axis=1, level=ticker_level)
+        frame = frame[[c for c in OHLCV if c in frame.columns]]
+        # Symbols from other exchanges leave NaN rows in the joined index
+        frame = frame.dropna(subset=[c for c in ["Open", "High", "Low", "Close"] if c in frame.columns], how="all")
+        if not frame.empty:
+            bars[symbol] = frame
+    return bars
+
+
+# --------------------------
+# Data Sources
+# --------------------------
+class DataSource:
+    """Base class for anything the scanner can pull bars from."""
+
+    def download(self, symbols, interval="1d", period=None, start=None, end=None):
+        raise NotImplementedError
+
+
+class YahooSource(DataSource):
+    def __init__(self, threads=True, timeout=10):
+        self.threads = threads
+        self.timeout = timeout
+
+    def download(self, symbols, interval="1d", period=None, start=None, end=None):
+        import yfinance as yf
+
+        symbols = list(symbols)
+        if not symbols:
+            return {}
+        wide = yf.download(
+            symbols,
+            period=period,
+            interval=interval,
+            start=start,
+            end=end,
+            group_by="ticker",
+            threads=self.threads,
+            timeout=self.timeout,
+            progress=False,
+        )
+        # yfinance upper-cases tickers; map the frames back to the names we were given
+        upper = split_frame(wide, [symbol.upper() for symbol in symbols])
+        return {symbol: upper[symbol.upper()] for symbol in symbols if symbol.upper() in upper}
+
+
+class FixtureSource(DataSource):
+    """Serves bars from local CSV files laid out as <root>/<interval>/<symbol>.csv.
+
+    Used for offline benchmarking; a missing file behaves like a symbol
+    Yahoo returned nothing for.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.calls = 0
+
+    def path(self, symbol, interval):
+        return os.path.join(self.root, interval, f"{symbol}.csv")
+
+    def load(self, symbol, interval):
+        path = self.path(symbol, interval)
+        if not os.path.exists(path):
+            return None
+        frame = pd.read_csv(path, index_col=0)
+        frame.index = pd.to_datetime(frame.index, utc=interval != "1d")
+        return frame[[c for c in OHLCV if c in frame.columns]]
+
+    def download(self, symbols, interval="1d", period=None, start=None, end=None):
+        self.calls += 1
+        bars = {}
+        for symbol in symbols:
+            frame = self.load(symbol, interval)
+            if frame is None or frame.empty:
+                continue
+            frame = slice_bars(frame, period=period, start=start, end=end)
+            if not frame.empty:
+                bars[symbol] = frame
+        return bars
+
+
+class MemorySource(DataSource):
+    """Serves bars from an in-memory {interval: {symbol: frame}} dict (see fixtures.py)."""
+
+    def __init__(self, bars):
+        self.bars = bars
+        self.calls = 0
+
+    def download(self, symbols, interval="1d", period=None, start=None, end=None):
+        self.calls += 1
+        frames = self.bars.get(interval, {})
+        bars = {}
+        for symbol in symbols:
+            frame = frames.get(symbol)
+            if frame is None:
+                continue
+            frame = slice_bars(frame, period=period, start=start, end=end)
+            if not frame.empty:
+                bars[symbol] = frame
+        return bars
+
+
+def slice_bars(frame, period=None, start=None, end=None):
+    # Mimic yf.download's period/start/end selection on an already stored frame
+    if start is not None:
+        frame = frame[frame.index >= _as_index_time(start, frame.index)]
+    if end is not None:
+        frame = frame[frame.index < _as_index_time(end, frame.index)]
+    if period and period.endswith("d"):
+        days = int(period[:-1])
+        dates = pd.Index(frame.index.date).unique()
+        if len(dates) > days:
+            frame = frame[frame.index.date >= dates[-days]]
+    return frame
+
+
+def _as_index_time(value, index):
+    stamp = pd.Timestamp(value)
+    if index.tz is not None and stamp.tzinfo is None:
+        stamp = stamp.tz_localize(index.tz)
+    return stamp
+
+
+# --------------------------
+# Universe fetches
+# --------------------------
+def fetch_daily(symbols, source, period="15d", chunk_size=DAILY_CHUNK_SIZE, start=None, end=None):
+    """Daily bars for the whole universe, DAILY_CHUNK_SIZE symbols per request."""
+    if start is not None:
+        period = None
+    bars = {}
+    for chunk in chunked(symbols, chunk_size):
+        bars.update(source.download(chunk, interval="1d", period=period, start=start, end=end))
+    return bars
+
+
+def fetch_intraday(symbols, source, interval="5m", period="1d", start=None, end=None):
+    """Intraday bars for the (already filtered) survivors in one batched call."""
+    symbols = list(symbols)
+    if not symbols:
+        return {}
+    if start is not None:
+        period = None
+    return source.download(symbols, interval=interval, period=period, start=start, end=end)
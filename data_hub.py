@@ -0,0 +1,217 @@
+# ==========================================
+# Shared Data Hub
+# ==========================================
+# One per server process, shared by every Streamlit session (and usable
+# from the CLI). Bar requests are split per symbol and coalesced: a symbol
+# that another session is already fetching for the same interval and
+# window waits for that in-flight request instead of issuing its own, and
+# results are kept in memory for a short TTL, least recently used dropped
+# beyond MAX_FRAME_BYTES. CPR levels computed by any scan are kept per
+# session date, so the next scan of the same list skips the daily fetch.
+# Everything upstream goes through one rate limiter (adjustable at runtime
+# with configure()) and the on-disk bar cache, so N users cost about one
+# user's upstream I/O.
+#
+# Frames handed out are shared between sessions and must not be mutated.
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import pandas as pd
+
+from bar_cache import BarCache, CachedSource
+from data_fetch import DataSource, YahooSource, now
+from level_snapshot import DEFAULT_SNAPSHOT_DIR, load_snapshot, lookup
+from replay import session_source
+from scan_executor import DEFAULT_RATE, DEFAULT_TIMEOUT, RateLimitedSource, TokenBucket
+from telemetry import Telemetry
+
+DAILY_TTL = 6 * 60 * 60
+INTRADAY_TTL = 60
+
+# Least recently used frames are dropped beyond either bound
+MAX_FRAMES = 20000
+MAX_FRAME_BYTES = 512 * 2 ** 20
+
+
+class DataHub(DataSource):
+    """Read-through, request-coalescing cache in front of `upstream`."""
+
+    def __init__(self, upstream, daily_ttl=DAILY_TTL, intraday_ttl=INTRADAY_TTL, wait_timeout=DEFAULT_TIMEOUT * 4,
+                 telemetry=None, max_frames=MAX_FRAMES, max_bytes=MAX_FRAME_BYTES, bucket=None, live=None):
+        """`bucket` / `live` are the TokenBucket and YahooSource inside `upstream`, for configure()."""
+        self.upstream = upstream
+        self.bucket = bucket
+        self.live = live
+        self.daily_ttl = daily_ttl
+        self.intraday_ttl = intraday_ttl
+        self.wait_timeout = wait_timeout
+        self.telemetry = telemetry or Telemetry()
+        self.max_frames = max_frames
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.frames = OrderedDict()  # (symbol, interval, window) -> (expires, frame or None), oldest use first
+        self.frame_bytes = 0
+        self.inflight = {}  # (symbol, interval, window) -> Future
+        self.levels = SharedLevels()
+
+    def configure(self, rate=None, timeout=None):
+        """Change the upstream request rate / per-request timeout for every session from now on."""
+        if rate is not None and self.bucket is not None:
+            self.bucket.set_rate(rate)
+        if timeout is not None:
+            if self.live is not None:
+                self.live.timeout = timeout
+            self.wait_timeout = timeout * 4
+
+    def settings(self):
+        """(requests per second, seconds per request) currently in effect, None where not known."""
+        return (None if self.bucket is None else self.bucket.rate,
+                None if self.live is None else self.live.timeout)
+
+    def ttl(self, interval):
+        return self.daily_ttl if interval in ("1d", "5d", "1wk", "1mo", "3mo") else self.intraday_ttl
+
+    def view(self, telemetry):
+        """This hub as a DataSource that also counts hits / coalesced waits into a session's telemetry."""
+        return HubView(self, telemetry)
+
+    def download(self, symbols, interval="1d", period=None, start=None, end=None, telemetry=None):
+        # A period is relative to today, so the key carries the date
+        window = (interval, period, now().date() if period else None, None if start is None else str(start),
+                  None if end is None else str(end))
+        counters = [self.telemetry] + ([telemetry] if telemetry is not None else [])
+
+        bars = {}
+        lead = []  # symbols this call fetches for everyone
+        follow = {}  # symbol -> Future of another call's fetch
+        with self.lock:
+            checked = time.monotonic()
+            for symbol in symbols:
+                key = (symbol,) + window
+                cached = self.frames.get(key)
+                if cached is not None and cached[0] > checked:
+                    self.frames.move_to_end(key)
+                    if cached[1] is not None:
+                        bars[symbol] = cached[1]
+                elif key in self.inflight:
+                    follow[symbol] = self.inflight[key]
+                else:
+                    self.inflight[key] = Future()
+                    lead.append(symbol)
+        for counter in counters:
+            counter.count("hub_requests", len(symbols) - len(lead) - len(follow), interval=interval, result="hit")
+            counter.count("hub_requests", len(follow), interval=interval, result="coalesced")
+            counter.count("hub_requests", len(lead), interval=interval, result="fetched")
+
+        if lead:
+            try:
+                fetched = self.upstream.download(lead, interval=interval, period=period, start=start, end=end)
+            except BaseException as error:
+                # Sessions waiting on these symbols see the same failure (and retry on their own)
+                with self.lock:
+                    for symbol in lead:
+                        self.inflight.pop((symbol,) + window).set_exception(error)
+                raise
+            expires = time.monotonic() + self.ttl(interval)
+            retry_missing = time.monotonic() + self.intraday_ttl  # a symbol a batch omitted may be back soon
+            with self.lock:
+                for symbol in lead:
+                    key = (symbol,) + window
+                    frame = fetched.get(symbol)
+                    self._store(key, (expires if frame is not None else retry_missing, frame))
+                    self.inflight.pop(key).set_result(frame)
+            bars.update({symbol: frame for symbol, frame in fetched.items() if symbol in lead})
+
+        for symbol, future in follow.items():
+            frame = future.result(timeout=self.wait_timeout)
+            if frame is not None:
+                bars[symbol] = frame
+        return {symbol: bars[symbol] for symbol in symbols if symbol in bars}
+
+    def _store(self, key, entry):
+        # Called with the lock held
+        old = self.frames.pop(key, None)
+        if old is not None:
+            self.frame_bytes -= _nbytes(old[1])
+        self.frames[key] = entry
+        self.frame_bytes += _nbytes(entry[1])
+        while len(self.frames) > 1 and (len(self.frames) > self.max_frames or self.frame_bytes > self.max_bytes):
+            _, (_, frame) = self.frames.popitem(last=False)
+            self.frame_bytes -= _nbytes(frame)
+
+    def snapshot(self, session, root=DEFAULT_SNAPSHOT_DIR):
+        """level_snapshot.load_snapshot, read once per process (a missing one is looked for again each call)."""
+        return self.levels.snapshot(session, root)
+
+
+def _nbytes(frame):
+    return 0 if frame is None else int(frame.memory_usage(index=True).sum())
+
+
+class HubView(DataSource):
+    def __init__(self, hub, telemetry):
+        self.hub = hub
+        self.telemetry = telemetry
+
+    def download(self, symbols, interval="1d", period=None, start=None, end=None):
+        return self.hub.download(symbols, interval=interval, period=period, start=start, end=end,
+                                 telemetry=self.telemetry)
+
+
+class SharedLevels:
+    """store_levels rows computed by any scan, per session date."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tables = {}  # session -> levels indexed by Symbol
+        self.snapshots = {}  # (session, root) -> snapshot
+
+    def snapshot(self, session, root=DEFAULT_SNAPSHOT_DIR):
+        key = (session, root)
+        if key not in self.snapshots:
+            snapshot = load_snapshot(session, root)
+            if snapshot is None:
+                return None
+            with self.lock:
+                self.snapshots[key] = snapshot
+        return self.snapshots[key]
+
+    def lookup(self, symbols, session):
+        """(rows for the symbols already computed for `session`, symbols still to compute)."""
+        return lookup(self.tables.get(session), symbols)
+
+    def add(self, levels, session):
+        if levels is None or levels.empty:
+            return
+        with self.lock:
+            table = self.tables.get(session)
+            table = levels if table is None else pd.concat([table, levels])
+            # Keep only today's table (and the one being built for tomorrow by a late session)
+            self.tables = {day: rows for day, rows in self.tables.items() if day >= session}
+            self.tables[session] = table[~table.index.duplicated(keep="last")]
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def shared_hub(rate=None, timeout=None, cache_dir=None):
+    """The process-wide hub over Yahoo (rate limiter + bar cache) or $CPR_REPLAY.
+
+    `rate` / `timeout` reconfigure it for every session when given;
+    `cache_dir` only applies on first use.
+    """
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            telemetry = Telemetry()
+            cache = BarCache(cache_dir) if cache_dir else None
+            bucket = TokenBucket(DEFAULT_RATE)
+            live = YahooSource(timeout=DEFAULT_TIMEOUT)
+            upstream = RateLimitedSource(live, bucket, telemetry)
+            _hub = DataHub(session_source(CachedSource(upstream, cache, telemetry)), telemetry=telemetry,
+                           bucket=bucket, live=live)
+        _hub.configure(rate, timeout)
+        return _hub
@@ -0,0 +1,66 @@
+# ==========================================
+# Synthetic OHLCV Fixtures
+# ==========================================
+# Deterministic random-walk daily and intraday bars for offline runs and
+# benchmarks. The last daily bar is "today" (still forming) and the
+# intraday bars cover today's session only, matching what the scanner
+# expects from Yahoo during market hours.
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_fetch import INTERVAL_MINUTES, SESSION_OPEN
+
+
+def synthetic_symbols(count):
+    return [f"SYN{i:04d}.NS" for i in range(count)]
+
+
+def synthetic_bars(symbols, days=30, session_date=None, interval="5m", bars_per_session=75,
+                   tz="Asia/Kolkata", seed=0):
+    """Returns {"1d": {symbol: frame}, interval: {symbol: frame}}."""
+    rng = np.random.default_rng(seed)
+    session_date = pd.Timestamp(session_date or pd.Timestamp.today().normalize())
+    dates = pd.bdate_range(end=session_date, periods=days, name="Date")
+    # Intraday bars belong to the last business day (today's forming daily bar)
+    open_time = pd.Timestamp(f"{dates[-1].date()} {SESSION_OPEN.get(tz, '09:30')}").tz_localize(tz)
+    times = pd.date_range(open_time, periods=bars_per_session, freq=f"{INTERVAL_MINUTES[interval]}min",
+                          name="Datetime")
+
+    daily_bars = {}
+    intraday_bars = {}
+    for symbol in symbols:
+        start = rng.uniform(50, 3000)
+        drift = rng.normal(0, 0.004)
+
+        # ---- Daily random walk ----
+        closes = start * np.exp(np.cumsum(rng.normal(drift, 0.015, days)))
+        opens = np.r_[start, closes[:-1]] * (1 + rng.normal(0, 0.003, days))
+        highs = np.maximum(opens, closes) * (1 + rng.uniform(0, 0.01, days))
+        lows = np.minimum(opens, closes) * (1 - rng.uniform(0, 0.01, days))
+        volumes = rng.integers(100_000, 5_000_000, days).astype(float)
+        daily_bars[symbol] = pd.DataFrame(
+            {"Open": opens, "High": highs, "Low": lows, "Close": closes, "Volume": volumes}, index=dates
+        )
+
+        # ---- Today's intraday session, opening around yesterday's high ----
+        open_price = highs[-2] * (1 + rng.normal(0, 0.004))
+        i_close = open_price * np.exp(np.cumsum(rng.normal(0, 0.002, bars_per_session)))
+        i_open = np.r_[open_price, i_close[:-1]]
+        i_high = np.maximum(i_open, i_close) * (1 + rng.uniform(0, 0.001, bars_per_session))
+        i_low = np.minimum(i_open, i_close) * (1 - rng.uniform(0, 0.001, bars_per_session))
+        i_volume = rng.integers(1_000, 200_000, bars_per_session).astype(float)
+        intraday_bars[symbol] = pd.DataFrame(
+            {"Open": i_open, "High": i_high, "Low": i_low, "Close": i_close, "Volume": i_volume}, index=times
+        )
+
+    return {"1d": daily_bars, interval: intraday_bars}
+
+
+def write_fixtures(bars, root):
+    """Write synthetic_bars() output in the FixtureSource layout (<root>/<interval>/<symbol>.csv)."""
+    for interval, frames in bars.items():
+        os.makedirs(os.path.join(root, interval), exist_ok=True)
+        for symbol, frame in frames.items():
+            frame.to_csv(os.path.join(root, interval, f"{symbol}.csv"))
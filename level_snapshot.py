@@ -0,0 +1,88 @@
+# ==========================================
+# Pre-Market Level Snapshot
+# ==========================================
+# Every CPR / pivot / R-S level of a session depends only on the previous
+# completed daily bar, so the whole universe's levels are built ahead of
+# time (post-close or pre-open) and saved as one Parquet file per session,
+# sorted and keyed by symbol. At the open the scanner only looks its
+# symbols up here and spends the 9:15-9:20 window on a single batched
+# intraday fetch.
+#
+#   <root>/<YYYY-MM-DD>.parquet   levels for the session on that date
+import os
+from datetime import timedelta
+
+import pandas as pd
+
+from bar_store import BarStore
+from cpr_engine import NARROW_CPR_PCT, latest_store_levels
+from data_fetch import chunked, fetch_daily
+
+DEFAULT_SNAPSHOT_DIR = os.environ.get("CPR_SNAPSHOT_DIR", ".cpr_snapshots")
+
+VOLUME_LOOKBACKS = [7, 10]
+
+# Calendar days fetched per build: the longest volume average plus weekends/holidays
+DAILY_LOOKBACK_DAYS = 25
+
+BUILD_CHUNK_SIZE = 200
+
+
+def next_session(day):
+    """Next weekday after `day` (exchange holidays are not known here)."""
+    return (pd.Timestamp(day) + pd.offsets.BDay(1)).date()
+
+
+def snapshot_path(session, root=DEFAULT_SNAPSHOT_DIR):
+    return os.path.join(root, f"{pd.Timestamp(session).date().isoformat()}.parquet")
+
+
+def store_levels(store, session, narrow_pct=NARROW_CPR_PCT, lookbacks=VOLUME_LOOKBACKS):
+    """Levels for `session` plus average daily volumes, from a daily BarStore."""
+    levels = latest_store_levels(store, session, narrow_pct, volume_lookbacks=lookbacks)
+    if levels.empty:
+        return levels
+    levels.insert(0, "Session", pd.Timestamp(session))
+    return levels
+
+
+def build_snapshot(symbols, source, session, narrow_pct=NARROW_CPR_PCT, chunk_size=BUILD_CHUNK_SIZE):
+    """Next-session levels for every symbol with a completed day before `session`."""
+    start = session - timedelta(days=DAILY_LOOKBACK_DAYS)
+    frames = []
+    for chunk in chunked(symbols, chunk_size):
+        daily_bars = fetch_daily(chunk, source, start=start, end=session)
+        levels = store_levels(BarStore.from_frames(daily_bars), session, narrow_pct)
+        if not levels.empty:
+            frames.append(levels)
+    if not frames:
+        return pd.DataFrame()
+    snapshot = pd.concat(frames) if len(frames) > 1 else frames[0]
+    snapshot = snapshot[snapshot["CPR Trend"].notna()]
+    return snapshot[~snapshot.index.duplicated()].sort_index()
+
+
+def write_snapshot(snapshot, session, root=DEFAULT_SNAPSHOT_DIR):
+    path = snapshot_path(session, root)
+    os.makedirs(root, exist_ok=True)
+    tmp = f"{path}.tmp"
+    snapshot.to_parquet(tmp)
+    os.replace(tmp, path)
+    return path
+
+
+def load_snapshot(session, root=DEFAULT_SNAPSHOT_DIR):
+    """Snapshot built for `session`, indexed by Symbol, or None if there is none."""
+    path = snapshot_path(session, root)
+    if not os.path.exists(path):
+        return None
+    return pd.read_parquet(path)
+
+
+def lookup(snapshot, symbols):
+    """(rows for the symbols the snapshot has, in `symbols` order; symbols it lacks)."""
+    if snapshot is None or snapshot.empty:
+        return None, list(symbols)
+    position = snapshot.index.get_indexer(symbols)
+    missing = [symbol for symbol, row in zip(symbols, position) if row < 0]
+    return snapshot.iloc[position[position >= 0]], missing
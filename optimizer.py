@@ -0,0 +1,292 @@
+# ==========================================
+# CPR Breakout Parameter Sweep
+# ==========================================
+# Grid or random search over the strategy's hardcoded thresholds (narrow-CPR
+# cutoff, volume-average lookback, volume filter, R1 confirmation on the
+# 3-candle rule, entry rule, stop level).
+#
+# Everything that does not depend on the parameters is computed once per
+# symbol in a process pool: CPR levels, the opening candles, the volume
+# averages for every lookback in the search space and, per rule and stop
+# level, the return a trade *would* make in every session. A parameter set
+# then only decides which sessions trade, so evaluating it is a few boolean
+# masks over one feature matrix: the backtest's rule with the swept
+# conditions added, run through the same rules engine as the scan. That
+# matrix lives in shared memory and the evaluation workers attach to it
+# instead of receiving a pickled copy.
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backtest import RULES, STOP_LEVELS, TARGET_LEVELS, opening_candles, session_candles, session_levels, \
+    signal_rule, simulate_exits
+from cpr_engine import NARROW_CPR_PCT
+from data_fetch import chunked, market_tz
+from rules import Rule, close_above, cpr_width_below
+from rules import evaluate as evaluate_rules
+
+SEARCH_SPACE = {
+    "rule": RULES,
+    "narrow_pct": [None, 0.1, 0.15, 0.2, NARROW_CPR_PCT, 0.35, 0.5],  # None = any CPR width
+    "vol_filter": [False, True],
+    "volume_lookback": [5, 7, 10, 14, 20],
+    "confirm_r1": [True, False],  # 3-candle close must also clear R1
+    "stop_level": STOP_LEVELS,
+}
+
+PARAM_COLUMNS = list(SEARCH_SPACE)
+
+METRIC_COLUMNS = ["Trades", "Win Rate %", "Expectancy %", "Total Return %", "Max Drawdown %"]
+
+MIN_TRADES = 10
+
+# --------------------------
+# Search spaces
+# --------------------------
+def normalize(params):
+    # Parameters a rule ignores are blanked so equivalent combinations collapse
+    params = dict(params)
+    if params["rule"] != "three_candle":
+        params["confirm_r1"] = None
+    if not params["vol_filter"]:
+        params["volume_lookback"] = None
+    return params
+
+
+def grid_search(space=SEARCH_SPACE):
+    """Every distinct combination of the listed values."""
+    names = list(space)
+    seen = set()
+    combos = []
+    for values in itertools.product(*(space[name] for name in names)):
+        params = normalize(dict(zip(names, values)))
+        key = tuple(params.values())
+        if key not in seen:
+            seen.add(key)
+            combos.append(params)
+    return combos
+
+
+def random_search(space=SEARCH_SPACE, samples=200, seed=0):
+    """`samples` random combinations; a (low, high) tuple draws narrow_pct uniformly."""
+    rng = random.Random(seed)
+    seen = set()
+    combos = []
+    for _ in range(samples * 20):
+        if len(combos) >= samples:
+            break
+        params = {}
+        for name, values in space.items():
+            if isinstance(values, tuple):
+                params[name] = round(rng.uniform(*values), 4)
+            else:
+                params[name] = rng.choice(list(values))
+        params = normalize(params)
+        key = tuple(params.values())
+        if key not in seen:
+            seen.add(key)
+            combos.append(params)
+    return combos
+
+
+# --------------------------
+# Stage 1: parameter-independent features per symbol
+# --------------------------
+def symbol_features(symbol, daily, intraday, lookbacks, stop_levels):
+    """One row per session: levels, opening candles, volume averages and would-be returns."""
+    if daily is None or intraday is None or len(daily) < 3 or intraday.empty:
+        return None
+
+    sessions = session_levels(daily, lookbacks[0])
+    for lookback in lookbacks:
+        average = daily["Volume"].rolling(lookback, min_periods=1).mean().shift(1)
+        sessions[f"Avg Volume {lookback}"] = average.to_numpy()
+
+    bars = session_candles(intraday, market_tz(symbol))
+    days = opening_candles(bars, sessions, 3, how="left")
+    days = days[days["c1 Close"].notna() & days["R1"].notna()]
+    if days.empty:
+        return None
+
+    features = pd.DataFrame({
+        "Session": days.index,
+        "Ascending": (days["CPR Trend"] == "Ascending").to_numpy(dtype=float),
+        "CPR Width %": (days["TC"] - days["BC"]).abs().to_numpy() / days["Pivot"].to_numpy() * 100,
+    })
+    for column in ["Yesterday High", "R1"] + [c for c in days.columns if c[:2] in ("c1", "c2", "c3")] \
+            + [f"Avg Volume {lookback}" for lookback in lookbacks]:
+        features[column] = days[column].to_numpy(dtype=float)
+
+    for rule in RULES:
+        entry_candle = signal_rule(rule).entry_candle
+        entry = days[f"c{entry_candle} Close"]
+        signals = days.loc[entry.notna(), TARGET_LEVELS + STOP_LEVELS].copy()
+        signals["Entry"] = entry[entry.notna()]
+        signals["entry_n"] = entry_candle - 1
+        for stop_level in stop_levels:
+            trades = simulate_exits(bars, signals, stop_level).set_index("Session")
+            returns = (trades["Exit"] - trades["Entry"]) / trades["Entry"] * 100
+            features[f"{rule} {stop_level} Return %"] = returns.reindex(days.index).to_numpy(dtype=float)
+
+    features.insert(0, "Symbol", symbol)
+    return features
+
+
+def _features_chunk(args):
+    symbols, source, start, end, interval, lookbacks, stop_levels = args
+    # Extra daily history so the first session has its CPR trend and longest volume average
+    daily_start = pd.Timestamp(start) - timedelta(days=3 * max(lookbacks))
+    daily_bars = source.download(symbols, interval="1d", start=daily_start, end=end)
+    intraday_bars = source.download(symbols, interval=interval, start=start, end=end)
+
+    frames = [
+        symbol_features(symbol, daily_bars.get(symbol), intraday_bars.get(symbol), lookbacks, stop_levels)
+        for symbol in symbols
+    ]
+    frames = [frame for frame in frames if frame is not None]
+    return pd.concat(frames, ignore_index=True) if frames else None
+
+
+def build_features(symbols, source, start, end=None, interval="5m", lookbacks=(7,), stop_levels=("S1",),
+                   workers=None, chunk_size=20):
+    """Feature table for the whole universe, ordered by session (the trade order for drawdown)."""
+    tasks = [
+        (chunk, source, start, end, interval, sorted(set(lookbacks)), list(stop_levels))
+        for chunk in chunked(symbols, chunk_size)
+    ]
+    if workers == 1:
+        frames = [_features_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            frames = list(pool.map(_features_chunk, tasks))
+
+    frames = [frame for frame in frames if frame is not None]
+    if not frames:
+        return pd.DataFrame()
+    features = pd.concat(frames, ignore_index=True)
+    return features.sort_values(["Session", "Symbol"], ignore_index=True)
+
+
+# --------------------------
+# Stage 2: evaluate parameter sets
+# --------------------------
+def params_rule(params):
+    """The rules.Rule a parameter set trades: the backtest's rule, plus or minus the swept conditions."""
+    base = signal_rule(params["rule"], params["vol_filter"])
+    predicates = list(base.predicates)
+    if params["confirm_r1"] is False:
+        r1 = close_above(base.entry_candle, "R1").name
+        predicates = [predicate for predicate in predicates if predicate.name != r1]
+    if params["narrow_pct"] is not None:
+        predicates.append(cpr_width_below(params["narrow_pct"]))
+    return Rule(base.name, predicates, base.entry_candle)
+
+
+def rule_frame(features):
+    """`features` (column name -> 1-D array) with the columns the rule predicates read."""
+    frame = dict(features)
+    frame["CPR Trend"] = np.where(features["Ascending"] > 0, "Ascending", "")
+    return frame
+
+
+def evaluate(frame, params, caches=None):
+    """Metrics for one parameter set; `frame` is rule_frame(features).
+
+    `caches` (volume lookback -> predicate masks) shares masks between
+    parameter sets evaluated against the same frame.
+    """
+    lookback = params["volume_lookback"]
+    if lookback is not None:
+        frame = {**frame, "Avg Volume": frame[f"Avg Volume {lookback}"]}
+    cache = None if caches is None else caches.setdefault(lookback, {})
+    rule = params_rule(params)
+    trade = evaluate_rules(frame, [rule], cache)[rule.name]
+
+    returns = frame[f"{params['rule']} {params['stop_level']} Return %"][trade]
+    returns = returns[~np.isnan(returns)]
+    return {**params, **metrics(returns)}
+
+
+def metrics(returns):
+    """Same definitions as backtest.summarize (all in %)."""
+    if not len(returns):
+        return {"Trades": 0, "Win Rate %": 0.0, "Expectancy %": 0.0, "Total Return %": 0.0, "Max Drawdown %": 0.0}
+    equity = np.cumsum(returns)
+    return {
+        "Trades": len(returns),
+        "Win Rate %": float((returns > 0).mean() * 100),
+        "Expectancy %": float(returns.mean()),
+        "Total Return %": float(equity[-1]),
+        "Max Drawdown %": float((np.maximum.accumulate(equity) - equity).max()),
+    }
+
+
+_shared = {}
+
+
+def _attach(name, shape, columns):
+    # Pool initializer: map the parent's feature matrix, no copy
+    shm = shared_memory.SharedMemory(name=name)
+    matrix = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    _shared["shm"] = shm
+    _shared["frame"] = rule_frame(dict(zip(columns, matrix)))
+    _shared["caches"] = {}
+
+
+def _evaluate_chunk(combos):
+    return [evaluate(_shared["frame"], params, _shared["caches"]) for params in combos]
+
+
+def evaluate_all(features, combos, workers=None, chunk_size=64):
+    """Evaluate every combination against the feature table (process pool over shared memory)."""
+    columns = [c for c in features.columns if c not in ("Symbol", "Session")]
+    if workers == 1 or len(combos) <= chunk_size:
+        frame = rule_frame({column: features[column].to_numpy(dtype=np.float64) for column in columns})
+        caches = {}
+        return [evaluate(frame, params, caches) for params in combos]
+
+    shape = (len(columns), len(features))
+    shm = shared_memory.SharedMemory(create=True, size=max(1, 8 * shape[0] * shape[1]))
+    try:
+        matrix = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        for row, column in enumerate(columns):
+            matrix[row] = features[column].to_numpy(dtype=np.float64)
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_attach,
+                                 initargs=(shm.name, shape, columns)) as pool:
+            results = []
+            for chunk in pool.map(_evaluate_chunk, list(chunked(combos, chunk_size))):
+                results.extend(chunk)
+        del matrix
+        return results
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def rank_results(results, min_trades=MIN_TRADES):
+    """Best expectancy first, then hit rate, then the shallowest drawdown."""
+    ranked = pd.DataFrame(results, columns=PARAM_COLUMNS + METRIC_COLUMNS)
+    ranked = ranked[ranked["Trades"] >= min_trades]
+    ranked = ranked.sort_values(["Expectancy %", "Win Rate %", "Max Drawdown %"],
+                                ascending=[False, False, True], ignore_index=True)
+    ranked.insert(0, "Rank", range(1, len(ranked) + 1))
+    return ranked
+
+
+def run_sweep(symbols, source, start, end=None, interval="5m", space=SEARCH_SPACE, search="grid", samples=200,
+              seed=0, workers=None, min_trades=MIN_TRADES):
+    """Ranked parameter sets for the universe over [start, end)."""
+    combos = grid_search(space) if search == "grid" else random_search(space, samples, seed)
+    lookbacks = sorted({params["volume_lookback"] for params in combos if params["volume_lookback"]} or {7})
+    stop_levels = sorted({params["stop_level"] for params in combos})
+
+    features = build_features(symbols, source, start, end, interval, lookbacks, stop_levels, workers)
+    if features.empty:
+        return rank_results([], min_trades)
+    return rank_results(evaluate_all(features, combos, workers), min_trades)
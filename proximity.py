@@ -0,0 +1,110 @@
+# ==========================================
+# Price-Level Proximity Index
+# ==========================================
+# "Which symbols are within 0.3% of R1 / yesterday's high / TC right now?"
+# Every symbol's levels are held in one (symbols, levels) matrix built once
+# from the pre-market snapshot. Each symbol's row keeps its levels sorted
+# by price, so the support/resistance pair around a price is a position in
+# that row. Distances to every level are kept as percentages of the level
+# and a tick only rewrites the rows of the symbols that moved, so a query
+# is one vectorized mask over the distance matrix, not a per-symbol loop.
+import numpy as np
+import pandas as pd
+
+PROXIMITY_LEVELS = ["S2", "S1", "BC", "Pivot", "TC", "Yesterday High", "R1", "R2"]
+
+RESULT_COLUMNS = ["Symbol", "Level", "Level Price", "Price", "Distance %"]
+
+
+class LevelIndex:
+    def __init__(self, levels, names=PROXIMITY_LEVELS):
+        """`levels` is indexed by Symbol with one column per level name."""
+        levels = levels[~levels.index.duplicated()]
+        self.symbols = levels.index.to_numpy()
+        self.position = pd.Index(self.symbols)
+        self.names = np.asarray(names, dtype=object)
+
+        matrix = levels[list(names)].to_numpy(dtype=np.float64)
+        # Each row sorted by price, with the level name at the same position
+        self.order = np.argsort(matrix, axis=1, kind="stable")
+        self.levels = np.take_along_axis(matrix, self.order, axis=1)
+        self.labels = self.names[self.order]
+
+        self.prices = np.full(len(self.symbols), np.nan)
+        self.distance = np.full(self.levels.shape, np.nan)  # (price - level) / level * 100
+
+    @classmethod
+    def from_snapshot(cls, snapshot, names=PROXIMITY_LEVELS):
+        """Index over a level_snapshot frame (its High is yesterday's high)."""
+        return cls(snapshot.rename(columns={"High": "Yesterday High"}), names)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    # --------------------------
+    # Ticks
+    # --------------------------
+    def update(self, prices):
+        """Merge live prices ({symbol: price} or a Series); unknown symbols are ignored."""
+        prices = pd.Series(prices, dtype="float64")
+        rows = self.position.get_indexer(prices.index)
+        known = rows >= 0
+        rows, values = rows[known], prices.to_numpy()[known]
+        self.prices[rows] = values
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.distance[rows] = (values[:, None] - self.levels[rows]) / self.levels[rows] * 100
+        return len(rows)
+
+    # --------------------------
+    # Queries
+    # --------------------------
+    def near(self, within_pct, levels=None, side=None):
+        """Every (symbol, level) pair within `within_pct` %, closest first.
+
+        `levels` restricts the level names; side="below" / "above" keeps only
+        prices under / over the level (e.g. approaching R1 from below).
+        """
+        distance = self.distance
+        with np.errstate(invalid="ignore"):
+            mask = np.abs(distance) <= within_pct
+            if side == "below":
+                mask &= distance <= 0
+            elif side == "above":
+                mask &= distance >= 0
+        if levels is not None:
+            mask &= np.isin(self.labels, list(levels))
+
+        rows, cols = np.nonzero(mask)
+        hits = pd.DataFrame({
+            "Symbol": self.symbols[rows],
+            "Level": self.labels[rows, cols],
+            "Level Price": self.levels[rows, cols],
+            "Price": self.prices[rows],
+            "Distance %": distance[rows, cols],
+        }, columns=RESULT_COLUMNS)
+        order = np.argsort(np.abs(hits["Distance %"].to_numpy()), kind="stable")
+        return hits.iloc[order].reset_index(drop=True)
+
+    def nearest(self):
+        """Per symbol with a price and any level: the closest level, the levels either side of the price."""
+        # A symbol whose levels are all missing has no nearest level (nanargmin raises on it)
+        known = ~np.isnan(self.prices) & ~np.isnan(self.distance).all(axis=1)
+        rows = np.flatnonzero(known)
+        levels = self.levels[rows]
+        prices = self.prices[rows]
+
+        # Position of each price within its own sorted row
+        above = (levels <= prices[:, None]).sum(axis=1)
+        below = above - 1
+        k = levels.shape[1]
+        lower = np.where(below >= 0, levels[np.arange(len(rows)), np.clip(below, 0, k - 1)], np.nan)
+        upper = np.where(above < k, levels[np.arange(len(rows)), np.clip(above, 0, k - 1)], np.nan)
+
+        closest = np.nanargmin(np.abs(self.distance[rows]), axis=1) if len(rows) else np.empty(0, dtype=int)
+        return pd.DataFrame({
+            "Price": prices,
+            "Nearest Level": self.labels[rows, closest],
+            "Distance %": self.distance[rows, closest],
+            "Support": lower,
+            "Resistance": upper,
+        }, index=pd.Index(self.symbols[rows], name="Symbol"))
@@ -0,0 +1,138 @@
+# ==========================================
+# Record / Replay Data Source
+# ==========================================
+# RecordingSource sits in front of a live source and keeps every bar it
+# hands out in one compressed Parquet file per interval and symbol
+# (<root>/<interval>/<symbol>.parquet). ReplaySource serves a recording
+# back with no network: period/start/end are sliced the way Yahoo does,
+# relative to the injectable clock (data_fetch.now, pinned by $CPR_CLOCK),
+# and intraday bars that had not closed by then are hidden. A recorded
+# session therefore replays identically at any hour, at disk speed.
+#
+#   python cli.py record nifty200.csv --intraday-period 5d
+#   CPR_REPLAY=.cpr_recordings CPR_CLOCK="2026-02-24 09:45" streamlit run CPR.py
+#   python cli.py scan nifty200.csv --offline .cpr_recordings --now "2026-02-24 09:45"
+import os
+import tempfile
+import threading
+
+import pandas as pd
+
+from data_fetch import INTERVAL_MINUTES, OHLCV, DataSource, market_tz, now, slice_bars
+
+DEFAULT_RECORD_DIR = ".cpr_recordings"
+
+REPLAY_ENV = "CPR_REPLAY"
+RECORD_ENV = "CPR_RECORD"
+
+COMPRESSION = "zstd"
+
+# One lock per recording file, kept at module level so sources stay picklable
+_path_locks = {}
+_path_locks_lock = threading.Lock()
+
+
+def recording_path(root, symbol, interval):
+    return os.path.join(root, interval, f"{symbol}.parquet")
+
+
+def _path_lock(path):
+    with _path_locks_lock:
+        return _path_locks.setdefault(path, threading.Lock())
+
+
+def load_recording(root, symbol, interval):
+    path = recording_path(root, symbol, interval)
+    if not os.path.exists(path):
+        return None
+    return pd.read_parquet(path)
+
+
+class RecordingSource(DataSource):
+    """Passes requests through to `upstream` and merges every returned bar into a recording."""
+
+    def __init__(self, upstream, root=DEFAULT_RECORD_DIR):
+        self.upstream = upstream
+        self.root = root
+
+    def download(self, symbols, interval="1d", period=None, start=None, end=None):
+        bars = self.upstream.download(symbols, interval=interval, period=period, start=start, end=end)
+        for symbol, frame in bars.items():
+            self.save(symbol, interval, frame)
+        return bars
+
+    def save(self, symbol, interval, frame):
+        frame = frame[[c for c in OHLCV if c in frame.columns]]
+        path = recording_path(self.root, symbol, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Under the data hub, requests for other windows of the same symbol can save it concurrently
+        with _path_lock(path):
+            kept = load_recording(self.root, symbol, interval)
+            if kept is not None:
+                # Later responses win: today's partial bars are replaced by their final values
+                frame = pd.concat([kept, frame])
+                frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            os.close(fd)
+            try:
+                frame.to_parquet(tmp, compression=COMPRESSION)
+                os.replace(tmp, path)
+            except BaseException:
+                os.remove(tmp)
+                raise
+
+
+class ReplaySource(DataSource):
+    """Serves a RecordingSource directory as it stood at `clock()`.
+
+    A symbol missing from the recording behaves like a symbol Yahoo
+    returned nothing for. Files are read once and kept in memory.
+    """
+
+    def __init__(self, root=DEFAULT_RECORD_DIR, clock=now):
+        self.root = root
+        self.clock = clock
+        self.calls = 0
+        self.frames = {}
+
+    def load(self, symbol, interval):
+        key = (symbol, interval)
+        if key not in self.frames:
+            self.frames[key] = load_recording(self.root, symbol, interval)
+        return self.frames[key]
+
+    def visible(self, frame, symbol, interval):
+        # Only what existed at clock(): completed intraday bars, daily bars up to today
+        moment = pd.Timestamp(self.clock())
+        if frame.index.tz is not None:
+            moment = moment.tz_localize(market_tz(symbol))
+        if interval in INTERVAL_MINUTES:
+            moment -= pd.Timedelta(minutes=INTERVAL_MINUTES[interval])
+        return frame[frame.index <= moment]
+
+    def download(self, symbols, interval="1d", period=None, start=None, end=None):
+        self.calls += 1
+        bars = {}
+        for symbol in symbols:
+            frame = self.load(symbol, interval)
+            if frame is None or frame.empty:
+                continue
+            frame = slice_bars(self.visible(frame, symbol, interval), period=period, start=start, end=end)
+            if not frame.empty:
+                bars[symbol] = frame
+        return bars
+
+
+def session_source(live, replay=None, record=None):
+    """`live`, or a recording replayed instead of it; `record` captures what `live` returns.
+
+    Both default to $CPR_REPLAY / $CPR_RECORD, so the Streamlit app can be
+    pointed at a recording without code changes.
+    """
+    replay = replay or os.environ.get(REPLAY_ENV)
+    record = record or os.environ.get(RECORD_ENV)
+    if replay:
+        return ReplaySource(replay)
+    if record:
+        return RecordingSource(live, record)
+    return live
@@ -0,0 +1,151 @@
+# ==========================================
+# Scan Report Export
+# ==========================================
+# One self-contained HTML report for a scan's hits: a summary table and a
+# CPR/R1/R2/S1/S2 chart per qualified symbol, optionally with a PNG per
+# chart. The bars are the ones the scan already fetched (run_scan(...,
+# hit_bars=...)), or one batched fetch for all hits when only a results CSV
+# is at hand. Charts are rendered in a process pool, and build_report is
+# safe to run from a background thread so the Streamlit session keeps
+# responding while a 50-hit morning renders.
+import html
+import importlib.util
+import io
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+import pandas as pd
+
+from bar_store import BarStore
+from cpr_engine import latest_store_levels
+from data_fetch import fetch_daily, fetch_intraday, market_tz
+from rules import RULES
+
+FORMATS = ["html", "png"]
+
+DEFAULT_REPORT_DIR = "scan_report"
+
+CHART_HEIGHT = 500
+
+SUMMARY_COLUMNS = ["Last", "Day High", "Day Low", "Move %", "vs R1 %"]
+
+
+def fetch_hit_bars(symbols, source, trading_date, intraday_interval="5m"):
+    """{symbol: (intraday BarView, yesterday's levels row)} in one daily + one intraday batch."""
+    daily = BarStore.from_frames(fetch_daily(symbols, source, start=trading_date - timedelta(days=15),
+                                             end=trading_date))
+    levels = latest_store_levels(daily, trading_date)
+    symbols = [symbol for symbol in symbols if symbol in levels.index]
+    intraday = BarStore.from_frames(fetch_intraday(symbols, source, interval=intraday_interval, period="1d"))
+    return {symbol: (intraday.view(symbol), levels.loc[symbol]) for symbol in symbols if symbol in intraday}
+
+
+def entry_candle(row):
+    # First rule that fired decides which candle gets the breakout marker
+    names = str(row.get("Rules", "first_candle")).split(", ")
+    return RULES[names[0]].entry_candle if names[0] in RULES else 1
+
+
+def summary_row(row, view, yday):
+    """The scan row plus where price went after the breakout."""
+    last = float(view.close[-1])
+    first_close = float(view.close[0])
+    summary = dict(row)
+    summary.update({
+        "Last": last,
+        "Day High": float(view.high.max()),
+        "Day Low": float(view.low.min()),
+        "Move %": (last - first_close) / first_close * 100,
+        "vs R1 %": (last - float(yday["R1"])) / float(yday["R1"]) * 100,
+    })
+    return summary
+
+
+def render_chart(task):
+    """Chart <div> for one symbol, writing its PNG too when asked (runs in a worker process)."""
+    import charts
+
+    symbol, view, yday, candle, out_dir, formats = task
+    marker = None
+    if len(view) >= candle:
+        marker = {"Datetime": view.times[candle - 1], "Close": float(view.close[candle - 1])}
+    zone_color = "green" if float(view.close[0]) > float(yday["Pivot"]) else "yellow"
+    fig = charts.cpr_chart(view, yday, title=f"{symbol} - CPR Breakout", tz=market_tz(symbol),
+                           zone_color=zone_color, marker=marker)
+    fig.update_layout(height=CHART_HEIGHT)
+
+    if "png" in formats:
+        fig.write_image(os.path.join(out_dir, "charts", f"{symbol}.png"))
+    return fig.to_html(full_html=False, include_plotlyjs=False, div_id=f"chart-{symbol}")
+
+
+def build_report(results, hit_bars, out_dir=DEFAULT_REPORT_DIR, formats=("html",), workers=None,
+                 title="CPR Breakout Scan"):
+    """Write <out_dir>/index.html (and charts/<symbol>.png); returns (index path, summary DataFrame).
+
+    `results` is the scan DataFrame, `hit_bars` maps its symbols to
+    (intraday BarView, yesterday's levels row). Symbols without bars are
+    listed in the summary without a chart.
+    """
+    import plotly.offline
+
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown report format(s): {', '.join(sorted(unknown))}")
+    if "png" in formats and importlib.util.find_spec("kaleido") is None:
+        raise RuntimeError("PNG export needs kaleido (pip install kaleido)")
+    os.makedirs(os.path.join(out_dir, "charts") if "png" in formats else out_dir, exist_ok=True)
+
+    rows = results.to_dict("records")
+    charted = [row for row in rows if row["Symbol"] in hit_bars]
+    tasks = [
+        (row["Symbol"], *hit_bars[row["Symbol"]], entry_candle(row), out_dir, tuple(formats))
+        for row in charted
+    ]
+    if workers == 1 or len(tasks) <= 1:
+        divs = [render_chart(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count(), len(tasks))) as pool:
+            divs = list(pool.map(render_chart, tasks))
+
+    summary = pd.DataFrame(
+        [summary_row(row, *hit_bars[row["Symbol"]]) if row["Symbol"] in hit_bars else row for row in rows],
+        columns=list(results.columns) + SUMMARY_COLUMNS,
+    )
+    table = summary.copy()
+    table["Symbol"] = [
+        f'<a href="#chart-{html.escape(symbol)}">{html.escape(symbol)}</a>' if symbol in hit_bars
+        else html.escape(symbol)
+        for symbol in summary["Symbol"]
+    ]
+
+    # plotly.js is inlined once, so the report opens offline
+    page = "\n".join([
+        "<!DOCTYPE html>",
+        f"<html><head><meta charset='utf-8'><title>{html.escape(title)}</title>",
+        "<style>body{font-family:sans-serif;background:#111;color:#ddd}"
+        "table{border-collapse:collapse}td,th{padding:4px 8px;border:1px solid #444}a{color:#6af}</style>",
+        f"<script>{plotly.offline.get_plotlyjs()}</script></head><body>",
+        f"<h1>{html.escape(title)}</h1>",
+        f"<p>{len(rows)} qualified, {len(divs)} charted</p>",
+        table.to_html(index=False, escape=False, float_format="{:.2f}".format, na_rep="-"),
+        *divs,
+        "</body></html>",
+    ])
+    path = os.path.join(out_dir, "index.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(page)
+    return path, summary
+
+
+def zip_report(out_dir):
+    """The report directory as zip bytes (for a download button)."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for folder, _, files in os.walk(out_dir):
+            for name in files:
+                path = os.path.join(folder, name)
+                archive.write(path, os.path.relpath(path, out_dir))
+    return buffer.getvalue()
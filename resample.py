@@ -0,0 +1,142 @@
+# ==========================================
+# Session-Aware Intraday Resampling
+# ==========================================
+# Coarser timeframes (15m/30m/60m) are derived from one base-interval fetch
+# instead of a separate download per interval. Buckets are anchored to the
+# exchange's session open (09:15 IST for .NS, 09:30 ET otherwise) so they
+# line up with the bars Yahoo itself returns: the first 15m NSE candle is
+# 09:15-09:30, the first 60m candle 09:15-10:15.
+import threading
+
+import numpy as np
+import pandas as pd
+
+from bar_store import BarView
+from data_fetch import INTERVAL_MINUTES, session_open
+
+BASE_INTERVAL = "5m"
+
+TIMEFRAMES = ["5m", "15m", "30m", "60m"]
+
+MINUTE_NS = 60 * 10 ** 9
+DAY_NS = 24 * 60 * MINUTE_NS
+
+
+def bucket_starts(view, interval):
+    """Wall-clock (market-local, ns) start of the `interval` bucket each bar falls in."""
+    width = INTERVAL_MINUTES[interval] * MINUTE_NS
+    hours, minutes = (int(part) for part in session_open(view.symbol).split(":"))
+    stamps = view.times.tz_localize(None).as_unit("ns").asi8
+    opens = stamps - stamps % DAY_NS + (hours * 60 + minutes) * MINUTE_NS
+    return opens + (stamps - opens) // width * width
+
+
+def resample_view(view, interval):
+    """OHLCV bars of `view` (a BarView) aggregated to `interval`, as a new BarView."""
+    if view.empty:
+        return view
+    starts = bucket_starts(view, interval)
+    first = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+    last = np.r_[first[1:] - 1, len(starts) - 1]
+
+    values = np.empty((5, len(first)), dtype=view.values.dtype)
+    values[0] = view.open[first]
+    values[1] = np.maximum.reduceat(view.high, first)
+    values[2] = np.minimum.reduceat(view.low, first)
+    values[3] = view.close[last]
+    values[4] = np.add.reduceat(view.volume, first)
+
+    times = pd.DatetimeIndex(starts[first].view("M8[ns]")).tz_localize(view.times.tz)
+    return BarView(view.symbol, times, values)
+
+
+class TimeframeBook:
+    """One symbol's session in several timeframes, maintained incrementally.
+
+    `update()` takes the base-interval bars seen so far; only bars from the
+    last stored one on are processed (that one may have been revised), and
+    per timeframe only the still-forming bucket is re-aggregated. A completed
+    bucket is only aggregated again when one of its bars is revised.
+    """
+
+    def __init__(self, symbol, timeframes=TIMEFRAMES, base_interval=BASE_INTERVAL):
+        self.symbol = symbol
+        self.timeframes = list(timeframes)
+        self.base_interval = base_interval
+        self.base = None  # BarView of every base bar seen
+        self.closed = {interval: [] for interval in self.timeframes}  # completed bucket BarViews
+        self.pending_from = {interval: 0 for interval in self.timeframes}  # base row of the forming bucket
+        self.lock = threading.Lock()
+
+    def update(self, base):
+        """Merge base bars (a BarView) from the last stored one on; returns how many were added or revised."""
+        with self.lock:
+            if base is None or base.empty:
+                return 0
+            revised_from = 0
+            if self.base is not None:
+                # The last stored bar may have been forming: a newer fetch of it replaces it
+                base = _rows(base, base.times.searchsorted(self.base.times[-1], "left"))
+                if base.empty:
+                    return 0
+                revised_from = int(self.base.times.searchsorted(base.times[0], "left"))
+                times = self.base.times[:revised_from].append(base.times)
+                values = np.concatenate([self.base.values[:, :revised_from], base.values], axis=1)
+                base = BarView(self.symbol, times, values)
+            changed = len(base) - revised_from
+            self.base = base
+
+            # Base bars cover [t, t + width); a bucket is complete once the data reaches its end
+            data_end = base.times[-1].value + INTERVAL_MINUTES[self.base_interval] * MINUTE_NS
+            for interval in self.timeframes:
+                if interval == self.base_interval:
+                    continue
+                if self.pending_from[interval] > revised_from:
+                    self._reopen(interval, revised_from)
+                start = self.pending_from[interval]
+                tail = _rows(base, start)
+                buckets = resample_view(tail, interval)
+                bucket_end = buckets.times.as_unit("ns").asi8 + INTERVAL_MINUTES[interval] * MINUTE_NS
+                complete = int((bucket_end <= data_end).sum())
+                if complete:
+                    self.closed[interval].append(_rows(buckets, 0, complete))
+                    # Base rows folded into the completed buckets
+                    if complete < len(buckets):
+                        consumed = int(tail.times.searchsorted(buckets.times[complete], "left"))
+                    else:
+                        consumed = len(tail)
+                    self.pending_from[interval] = start + consumed
+            return changed
+
+    def _reopen(self, interval, row):
+        # A revised base row sits in a completed bucket: that bucket (and any after it) is aggregated again
+        starts = bucket_starts(self.base, interval)
+        first = int(np.searchsorted(starts, starts[row], "left"))
+        cutoff = pd.Timestamp(int(starts[row])).tz_localize(self.base.times.tz)
+        self.closed[interval] = [
+            _rows(part, 0, int(part.times.searchsorted(cutoff, "left"))) for part in self.closed[interval]
+        ]
+        self.pending_from[interval] = first
+
+    def view(self, interval, include_forming=True):
+        """All bars of `interval` so far (the last one may still be forming)."""
+        with self.lock:
+            if self.base is None:
+                return None
+            if interval == self.base_interval:
+                return self.base
+            parts = list(self.closed[interval])
+            if include_forming:
+                parts.append(resample_view(_rows(self.base, self.pending_from[interval]), interval))
+            parts = [part for part in parts if not part.empty]
+            if not parts:
+                return _rows(self.base, 0, 0)
+            if len(parts) == 1:
+                return parts[0]
+            times = parts[0].times.append([part.times for part in parts[1:]])
+            return BarView(self.symbol, times, np.concatenate([part.values for part in parts], axis=1))
+
+
+def _rows(view, start, stop=None):
+    # Positional slice: a view, not a copy
+    return BarView(view.symbol, view.times[start:stop], view.values[:, start:stop])
@@ -0,0 +1,212 @@
+# ==========================================
+# Declarative Breakout Rules
+# ==========================================
+# A strategy is a named conjunction of predicates over an "opening frame":
+# one row per symbol (scan) or per session (backtest) holding yesterday's
+# levels, the CPR trend/type/width, the average daily volume and the first
+# candles as "c1 Open" ... "c3 Volume" (the layout of
+# backtest.opening_candles). Every registered rule is evaluated in one pass:
+# each distinct predicate is computed once per frame and shared by all the
+# rules that use it, and the predicates that need no candles double as a
+# pre-filter deciding which symbols need an intraday fetch at all.
+# Rules are long setups: the backtester's exits assume a long entry.
+import numpy as np
+import pandas as pd
+
+OHLC = ["Open", "High", "Low", "Close", "Volume"]
+
+# Daily level columns as they are named in an opening frame
+LEVEL_RENAMES = {"High": "Yesterday High", "Low": "Yesterday Low", "Close": "Yesterday Close"}
+
+
+class Predicate:
+    """A named boolean test on an opening frame; `candles` is how many opening candles it reads."""
+
+    __slots__ = ("name", "func", "candles")
+
+    def __init__(self, name, func, candles=0):
+        self.name = name
+        self.func = func
+        self.candles = candles
+
+    def mask(self, frame, cache):
+        # Shared across rules: the name identifies the subexpression
+        if self.name not in cache:
+            with np.errstate(invalid="ignore"):
+                cache[self.name] = np.asarray(self.func(frame), dtype=bool)
+        return cache[self.name]
+
+    def __repr__(self):
+        return self.name
+
+
+class Rule:
+    def __init__(self, name, predicates, entry_candle, description=""):
+        self.name = name
+        self.predicates = list(predicates)
+        self.entry_candle = entry_candle  # 1-based candle whose close is the entry
+        self.description = description
+
+    @property
+    def candles(self):
+        return max([self.entry_candle] + [predicate.candles for predicate in self.predicates])
+
+    @property
+    def level_predicates(self):
+        return [predicate for predicate in self.predicates if predicate.candles == 0]
+
+    def __repr__(self):
+        return f"{self.name}: " + " & ".join(map(repr, self.predicates))
+
+
+# --------------------------
+# Predicates
+# --------------------------
+def _column(frame, name):
+    if name in frame:
+        return np.asarray(frame[name])
+    return np.full(frame_length(frame), np.nan)
+
+
+def cpr_trend(label):
+    return Predicate(f"trend=={label}", lambda f: _column(f, "CPR Trend") == label)
+
+
+def cpr_type(label):
+    return Predicate(f"type=={label}", lambda f: _column(f, "CPR-Type") == label)
+
+
+def cpr_width_below(pct):
+    return Predicate(f"width<{pct}", lambda f: _column(f, "CPR Width %").astype(float) < pct)
+
+
+def green(n):
+    return Predicate(f"c{n} green", lambda f: _column(f, f"c{n} Close") > _column(f, f"c{n} Open"), n)
+
+
+def red(n):
+    return Predicate(f"c{n} red", lambda f: _column(f, f"c{n} Close") < _column(f, f"c{n} Open"), n)
+
+
+def close_above(n, level):
+    return Predicate(f"c{n} close>{level}", lambda f: _column(f, f"c{n} Close") > _column(f, level), n)
+
+
+def close_below(n, level):
+    return Predicate(f"c{n} close<{level}", lambda f: _column(f, f"c{n} Close") < _column(f, level), n)
+
+
+def volume_above(n, ratio=1.0, inclusive=False):
+    """c{n} volume above `ratio` x the average daily volume (>= with inclusive)."""
+    def test(f):
+        volume, average = _column(f, f"c{n} Volume"), ratio * _column(f, "Avg Volume")
+        return volume >= average if inclusive else volume > average
+    return Predicate(f"c{n} volume{'>=' if inclusive else '>'}{ratio}x", test, n)
+
+
+# --------------------------
+# Registry
+# --------------------------
+RULES = {}
+
+
+def register(rule):
+    RULES[rule.name] = rule
+    return rule
+
+
+ASCENDING = cpr_trend("Ascending")
+
+register(Rule("first_candle", [ASCENDING, close_above(1, "Yesterday High")], 1,
+              "Ascending CPR, first candle closes above yesterday's high"))
+register(Rule("first_candle_volume", [ASCENDING, close_above(1, "Yesterday High"), volume_above(1)], 1,
+              "first_candle on above-average volume"))
+register(Rule("three_candle", [ASCENDING, green(1), red(2), green(3), close_above(3, "Yesterday High"),
+                               close_above(3, "R1")], 3,
+              "Ascending CPR, green/red/green, third candle closes above yesterday's high and R1"))
+register(Rule("three_candle_volume", RULES["three_candle"].predicates + [volume_above(3, inclusive=True)], 3,
+              "three_candle with third-candle volume at least the average"))
+register(Rule("narrow_cpr_breakout", [cpr_type("Narrow"), green(1), close_above(1, "TC"),
+                                      close_above(1, "Yesterday High")], 1,
+              "Narrow CPR, green first candle closing above TC and yesterday's high"))
+register(Rule("inside_cpr_breakout", [cpr_trend("Inside"), green(1), close_above(1, "TC"),
+                                      close_above(1, "Yesterday High")], 1,
+              "Inside-value CPR (consolidation), green first candle closing above TC and yesterday's high"))
+
+SCAN_RULES = ["first_candle"]
+
+
+def resolve(rules=None):
+    """Rule objects for names (or rules) in `rules`; None means every registered rule."""
+    if rules is None:
+        return list(RULES.values())
+    return [RULES[rule] if isinstance(rule, str) else rule for rule in rules]
+
+
+# --------------------------
+# Evaluation
+# --------------------------
+# A frame is a DataFrame (backtest sessions) or a plain {column: array} dict
+# (the scanner builds one per chunk without any DataFrame round-trips).
+def level_columns(levels):
+    """Daily levels (latest_store_levels / a snapshot) as opening-frame columns, indexed like `levels`."""
+    columns = {LEVEL_RENAMES.get(name, name): levels[name].to_numpy() for name in levels.columns}
+    if "Avg Volume" not in columns and "Avg Volume 7" in columns:
+        columns["Avg Volume"] = columns["Avg Volume 7"]
+    columns["Symbol"] = levels.index.to_numpy()
+    return columns
+
+
+def select(columns, mask):
+    return {name: values[mask] for name, values in columns.items()}
+
+
+def add_opening_candles(columns, intraday, candles):
+    """c1 Open ... c{candles} Volume for every columns["Symbol"] from a BarStore (NaN where missing)."""
+    symbols = columns["Symbol"]
+    present = np.array([symbol in intraday for symbol in symbols], dtype=bool)
+    first = np.zeros(len(symbols), dtype=np.int64)
+    count = np.zeros(len(symbols), dtype=np.int64)
+    if present.any():
+        first[present] = intraday.first_rows(symbols[present])
+        lengths = np.diff(intraday.offsets)
+        count[present] = lengths[[intraday.position[symbol] for symbol in symbols[present]]]
+
+    for k in range(candles):
+        has = present & (count > k)
+        rows = first[has] + k
+        for field, name in enumerate(OHLC):
+            column = np.full(len(symbols), np.nan)
+            column[has] = intraday.values[field, rows]
+            columns[f"c{k + 1} {name}"] = column
+    return columns
+
+
+def frame_length(frame):
+    # Every column of a dict frame has the same length
+    return len(frame) if isinstance(frame, pd.DataFrame) else len(next(iter(frame.values())))
+
+
+def prefilter(frame, rules=None, cache=None):
+    """Rows that could fire any rule, from the predicates that need no candles."""
+    cache = {} if cache is None else cache
+    keep = np.zeros(frame_length(frame), dtype=bool)
+    for rule in resolve(rules):
+        mask = np.ones(len(keep), dtype=bool)
+        for predicate in rule.level_predicates:
+            mask &= predicate.mask(frame, cache)
+        keep |= mask
+    return keep
+
+
+def evaluate(frame, rules=None, cache=None):
+    """{rule name: boolean array over the frame's rows}, every rule in one pass."""
+    cache = {} if cache is None else cache
+    n = frame_length(frame)
+    fired = {}
+    for rule in resolve(rules):
+        mask = np.ones(n, dtype=bool)
+        for predicate in rule.predicates:
+            mask &= predicate.mask(frame, cache)
+        fired[rule.name] = mask
+    return fired
@@ -0,0 +1,176 @@
+# ==========================================
+# Concurrent Scan Executor
+# ==========================================
+# Runs scan tasks on a bounded thread pool with a token-bucket rate limit,
+# per-attempt timeouts and retry with exponential backoff. Results are
+# yielded as soon as each task finishes so the UI can stream them.
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from data_fetch import DataSource
+from telemetry import Telemetry
+
+DEFAULT_WORKERS = 8
+DEFAULT_RATE = 5.0  # upstream requests per second
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.5
+
+_END = object()
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`.
+
+    Picklable for process pools; a copy in another process is a separate
+    bucket with the same rate.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.fixed_capacity = capacity
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def set_rate(self, rate):
+        """Change the rate of a bucket already in use (tokens earned so far are kept)."""
+        with self.lock:
+            self.rate = rate
+            self.capacity = self.fixed_capacity or max(1.0, rate)
+            self.tokens = min(self.tokens, self.capacity)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_for = (1 - self.tokens) / self.rate
+            time.sleep(wait_for)
+
+
+class RateLimitedSource(DataSource):
+    """Takes one token from the bucket before every upstream download."""
+
+    def __init__(self, upstream, bucket, telemetry=None):
+        self.upstream = upstream
+        self.bucket = bucket
+        self.telemetry = telemetry or Telemetry()
+
+    def download(self, symbols, interval="1d", period=None, start=None, end=None):
+        with self.telemetry.timer("rate_limit_wait_seconds"):
+            self.bucket.acquire()
+        self.telemetry.count("upstream_requests", interval=interval)
+        with self.telemetry.timer("upstream_seconds", interval=interval):
+            return self.upstream.download(symbols, interval=interval, period=period, start=start, end=end)
+
+
+class ScanExecutor:
+    def __init__(self, workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT,
+                 retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, telemetry=None):
+        self.workers = workers
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.failures = defaultdict(list)  # error class -> items
+        self.retry_count = 0
+        self.telemetry = telemetry or Telemetry()
+
+    def record_failure(self, item, error):
+        # A tuple item is a batch (e.g. a chunk of symbols) and counts per element
+        name = error if isinstance(error, str) else type(error).__name__
+        items = item if isinstance(item, tuple) else [item]
+        self.failures[name].extend(items)
+        self.telemetry.count("failures", len(items), error=name)
+
+    def failure_summary(self):
+        return Counter({name: len(items) for name, items in self.failures.items()})
+
+    def run(self, items, fn):
+        """Yield (item, result) for every item as soon as fn(item) succeeds.
+
+        Items that still fail after all retries (or time out) are recorded in
+        self.failures instead of being yielded. `items` is consumed lazily,
+        one item per free worker slot, so a generator is never read ahead.
+
+        A timed-out attempt cannot be interrupted: its thread keeps running
+        and holds its worker slot until the fetch returns (the source's own
+        request timeout, e.g. YahooSource(timeout=...), bounds that), while
+        the retry goes to the next free slot.
+        """
+        pending = iter(items)
+        exhausted = False
+        queue = []  # retries: (item, attempt, not_before)
+        running = {}  # future -> (item, attempt, started)
+        abandoned = set()  # timed-out futures whose threads are still busy
+
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            while queue or running or not exhausted:
+                now = time.monotonic()
+                abandoned = {future for future in abandoned if not future.done()}
+
+                # Fill free worker slots: retries whose backoff has elapsed first, then new items
+                free = self.workers - len(running) - len(abandoned)
+                ready = [entry for entry in queue if entry[2] <= now]
+                for entry in ready[:max(0, free)]:
+                    queue.remove(entry)
+                    item, attempt, _ = entry
+                    running[pool.submit(fn, item)] = (item, attempt, time.monotonic())
+                while not exhausted and len(running) + len(abandoned) < self.workers:
+                    item = next(pending, _END)
+                    if item is _END:
+                        exhausted = True
+                    else:
+                        running[pool.submit(fn, item)] = (item, 0, time.monotonic())
+
+                if not running:
+                    time.sleep(0.05)
+                    continue
+                done, _ = wait(list(running), timeout=0.05, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    item, attempt, _ = running.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        yield item, future.result()
+                    else:
+                        self._retry_or_fail(queue, item, attempt, error)
+
+                # Give up on attempts that ran past their deadline; the retry is queued right away
+                if self.timeout:
+                    now = time.monotonic()
+                    for future, (item, attempt, started) in list(running.items()):
+                        if now - started > self.timeout:
+                            running.pop(future)
+                            if not future.cancel():
+                                abandoned.add(future)
+                            self._retry_or_fail(queue, item, attempt, TimeoutError())
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _retry_or_fail(self, queue, item, attempt, error):
+        if attempt < self.retries:
+            self.retry_count += 1
+            self.telemetry.count("retries", error=type(error).__name__)
+            delay = self.backoff * (2 ** attempt) * (1 + random.random() * 0.25)
+            queue.append((item, attempt + 1, time.monotonic() + delay))
+        else:
+            self.record_failure(item, error)
@@ -0,0 +1,324 @@
+# ==========================================
+# Universe Scan Pipeline
+# ==========================================
+# Ascending-CPR + first 5-min candle breakout over a symbol list. A chunk
+# of symbols is one unit of work: one daily fetch, one vectorized CPR pass
+# and one batched intraday fetch for the ascending-CPR survivors. Bars are
+# packed into BarStores, so the checks run on arrays, not per-row Series.
+# With a pre-market level snapshot the daily step is a lookup and only the
+# symbols the snapshot lacks are fetched.
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from bar_cache import BarCache, CachedSource
+from bar_store import BarStore
+from data_fetch import FixtureSource, YahooSource, chunked, fetch_intraday
+from level_snapshot import lookup, store_levels
+from replay import session_source
+from rules import SCAN_RULES, add_opening_candles, evaluate, level_columns, prefilter, resolve, select
+from scan_executor import DEFAULT_RATE, DEFAULT_TIMEOUT, RateLimitedSource, ScanExecutor, TokenBucket
+from telemetry import Telemetry
+
+SCAN_CHUNK_SIZE = 25
+
+RESULT_COLUMNS = ["Symbol", "First Open", "First Close", "Yesterday High", "CPR Trend", "CPR-Type"]
+
+RULE_RESULT_COLUMNS = RESULT_COLUMNS + ["Rules"]
+
+# Symbols read from the CSV per block when streaming
+SYMBOL_BLOCK_ROWS = 1000
+
+NO_DAILY_DATA = "NoDailyData"
+NO_INTRADAY_DATA = "NoIntradayData"
+
+
+def default_source(rate=DEFAULT_RATE, timeout=DEFAULT_TIMEOUT, fixtures=None, cache_dir=None, telemetry=None,
+                   replay=None, record=None):
+    """Yahoo behind the rate limiter and the bar cache, a local fixture directory or a recording.
+
+    `replay` / `record` are recording directories (see replay.session_source).
+    """
+    if fixtures:
+        return FixtureSource(fixtures)
+    cache = BarCache(cache_dir) if cache_dir else None
+    upstream = RateLimitedSource(YahooSource(timeout=timeout), TokenBucket(rate), telemetry)
+    return session_source(CachedSource(upstream, cache, telemetry), replay, record)
+
+
+def scan_chunk(symbols, source, today, daily_period="15d", intraday_interval="5m", telemetry=None, snapshot=None,
+               rules=SCAN_RULES, hit_bars=None, shared_levels=None):
+    """Returns (qualified rows, {symbol: reason} for symbols that had no data).
+
+    `snapshot` is level_snapshot.load_snapshot(today); symbols found there
+    skip the daily fetch and CPR computation. `rules` are rules.RULES names;
+    with more than one, each row lists the rules that fired. A `hit_bars`
+    dict receives {symbol: (intraday BarView, levels row)} for every hit,
+    for report.build_report. `shared_levels` (data_hub.SharedLevels) serves
+    levels other scans already computed and keeps the ones computed here.
+    """
+    telemetry = telemetry or Telemetry()
+    missing = {}
+
+    # ---- Step 1: CPR levels, from the snapshot or daily data for the rest of the chunk ----
+    known, to_fetch = None, symbols
+    if snapshot is not None:
+        with telemetry.stage("snapshot_lookup"):
+            known, to_fetch = lookup(snapshot, symbols)
+        telemetry.count("snapshot_lookups", len(symbols) - len(to_fetch), result="hit")
+        telemetry.count("snapshot_lookups", len(to_fetch), result="miss")
+    if shared_levels is not None and to_fetch:
+        with telemetry.stage("shared_levels_lookup"):
+            shared, fetch_rest = shared_levels.lookup(to_fetch, today)
+        telemetry.count("shared_level_lookups", len(to_fetch) - len(fetch_rest), result="hit")
+        telemetry.count("shared_level_lookups", len(fetch_rest), result="miss")
+        if shared is not None and not shared.empty:
+            known = shared if known is None or known.empty else pd.concat([known, shared])
+        to_fetch = fetch_rest
+
+    daily_bars = {}
+    if to_fetch:
+        with telemetry.stage("daily_fetch"):
+            daily_bars = source.download(to_fetch, interval="1d", period=daily_period)
+        for symbol in to_fetch:
+            if symbol not in daily_bars:
+                missing[symbol] = NO_DAILY_DATA
+
+    with telemetry.stage("cpr_compute"):
+        levels = store_levels(BarStore.from_frames(daily_bars), today)
+        if shared_levels is not None:
+            shared_levels.add(levels, today)
+        if known is not None and not known.empty:
+            levels = pd.concat([known, levels]) if not levels.empty else known
+
+    # Level-only part of the rules (ascending CPR for the default scan)
+    with telemetry.stage("trend_filter"):
+        columns = level_columns(levels)
+        candidates = select(columns, prefilter(columns, rules))
+
+    # ---- Step 2: Intraday 5-min, one batched call for the survivors only ----
+    with telemetry.stage("intraday_fetch"):
+        intraday_bars = fetch_intraday(list(candidates["Symbol"]), source, interval=intraday_interval, period="1d")
+
+    rows = []
+    with telemetry.stage("breakout_check"):
+        intraday = BarStore.from_frames(intraday_bars)
+        has_bars = np.array([ticker in intraday for ticker in candidates["Symbol"]], dtype=bool)
+        for ticker in candidates["Symbol"][~has_bars]:
+            missing[ticker] = NO_INTRADAY_DATA
+        survivors = select(candidates, has_bars)
+
+        # Opening candles of every survivor straight from the store arrays, then every rule in one pass
+        rule_list = resolve(rules)
+        add_opening_candles(survivors, intraday, max(rule.candles for rule in rule_list))
+        fired = evaluate(survivors, rule_list)
+        matrix = np.column_stack(list(fired.values()))
+        names = np.array(list(fired), dtype=object)
+        for k in matrix.any(axis=1).nonzero()[0]:
+            row = {
+                "Symbol": survivors["Symbol"][k],
+                "First Open": float(survivors["c1 Open"][k]),
+                "First Close": float(survivors["c1 Close"][k]),
+                "Yesterday High": float(survivors["Yesterday High"][k]),
+                "CPR Trend": survivors["CPR Trend"][k],
+                "CPR-Type": survivors["CPR-Type"][k]
+            }
+            if len(names) > 1:
+                row["Rules"] = ", ".join(names[matrix[k]])
+            rows.append(row)
+
+        if hit_bars is not None:
+            for row in rows:
+                hit_bars[row["Symbol"]] = (intraday.view(row["Symbol"]), levels.loc[row["Symbol"]])
+
+    # Where the chunk's symbols dropped out of the funnel
+    no_intraday = sum(reason == NO_INTRADAY_DATA for reason in missing.values())
+    with_daily = len(symbols) - len(to_fetch) + len(daily_bars)
+    setups = len(candidates["Symbol"])
+    telemetry.count("symbols", len(symbols) - with_daily, outcome="no_daily_data")
+    telemetry.count("symbols", with_daily - setups, outcome="no_setup")
+    telemetry.count("symbols", no_intraday, outcome="no_intraday_data")
+    telemetry.count("symbols", setups - no_intraday - len(rows), outcome="no_breakout")
+    telemetry.count("symbols", len(rows), outcome="qualified")
+    return rows, missing
+
+
+class SymbolChunk(tuple):
+    """A chunk of symbols that remembers its position in the symbol stream."""
+
+    def __new__(cls, symbols, number):
+        chunk = super().__new__(cls, symbols)
+        chunk.number = number
+        return chunk
+
+
+def scan_universe(symbols, source, today, executor=None, chunk_size=SCAN_CHUNK_SIZE, telemetry=None, skip=(),
+                  **scan_args):
+    """Yield (SymbolChunk, qualified rows) as each chunk finishes.
+
+    `symbols` may be a generator; chunks are cut from it only as workers
+    free up. Chunk numbers in `skip` (already scanned) are not run.
+    """
+    executor = executor or ScanExecutor(telemetry=telemetry)
+    telemetry = telemetry or executor.telemetry
+    chunks = (
+        SymbolChunk(chunk, number) for number, chunk in enumerate(chunked(symbols, chunk_size))
+        if number not in skip
+    )
+
+    def run_chunk(chunk):
+        start = time.perf_counter()
+        try:
+            return scan_chunk(list(chunk), source, today, telemetry=telemetry, **scan_args)
+        finally:
+            telemetry.record_chunk(chunk, time.perf_counter() - start)
+
+    for chunk, (rows, missing) in executor.run(chunks, run_chunk):
+        for symbol, reason in missing.items():
+            executor.record_failure(symbol, reason)
+        yield chunk, rows
+
+
+def run_scan(symbols, source, today, executor=None, on_chunk=None, telemetry=None, **scan_args):
+    """Whole scan as one DataFrame; on_chunk(chunk, rows) is called as chunks finish."""
+    qualified = []
+    start = time.perf_counter()
+    for chunk, rows in scan_universe(symbols, source, today, executor=executor, telemetry=telemetry, **scan_args):
+        qualified.extend(rows)
+        if on_chunk:
+            on_chunk(chunk, rows)
+    if telemetry is not None:
+        telemetry.observe("scan_seconds", time.perf_counter() - start)
+    single_rule = len(resolve(scan_args.get("rules", SCAN_RULES))) == 1
+    return pd.DataFrame(qualified, columns=RESULT_COLUMNS if single_rule else RULE_RESULT_COLUMNS)
+
+
+def read_symbols(path_or_buffer):
+    return pd.read_csv(path_or_buffer)["Symbol"].dropna().astype(str).tolist()
+
+
+def iter_symbols(path_or_buffer, block_rows=SYMBOL_BLOCK_ROWS):
+    """Symbols of a CSV with a 'Symbol' column, read `block_rows` lines at a time."""
+    for block in pd.read_csv(path_or_buffer, usecols=["Symbol"], chunksize=block_rows):
+        yield from block["Symbol"].dropna().astype(str)
+
+
+def write_results(result_df, path):
+    if path.endswith(".parquet"):
+        result_df.to_parquet(path, index=False)
+    else:
+        result_df.to_csv(path, index=False)
+
+
+# --------------------------
+# Streaming scan
+# --------------------------
+# For full-exchange lists: symbols are read from the CSV block by block,
+# each chunk's bars are dropped as soon as it is scanned and qualifying
+# rows are appended to <out>.partial.csv as chunks finish. Peak memory is
+# about workers x chunk_size symbols' bars whatever the universe size. A
+# checkpoint (<out>.checkpoint.json) records the finished chunks and the
+# spool length they account for, so an interrupted scan resumes where it
+# stopped instead of starting over.
+def checkpoint_path(out):
+    return f"{out}.checkpoint.json"
+
+
+def spool_path(out):
+    return f"{out}.partial.csv"
+
+
+def scan_params(today, key=None, rules=SCAN_RULES, chunk_size=SCAN_CHUNK_SIZE):
+    # What a checkpoint must match to be resumed
+    return {"key": key, "date": str(today), "rules": [getattr(rule, "name", rule) for rule in resolve(rules)],
+            "chunk_size": chunk_size}
+
+
+def load_checkpoint(out, params):
+    """{"done": [...], "offset": bytes} of an unfinished scan with the same params, else None."""
+    path = checkpoint_path(out)
+    if not os.path.exists(path) or not os.path.exists(spool_path(out)):
+        return None
+    with open(path) as f:
+        state = json.load(f)
+    return state if state.get("params") == params else None
+
+
+def save_checkpoint(out, params, done, offset):
+    path = checkpoint_path(out)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"params": params, "done": sorted(done), "offset": offset}, f)
+    os.replace(tmp, path)
+
+
+def finish_spool(spool, out, block_rows=SYMBOL_BLOCK_ROWS * 50):
+    """Move the spooled CSV to `out`, converting to Parquet block by block for .parquet."""
+    if not out.endswith(".parquet"):
+        os.replace(spool, out)
+        return
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for block in pd.read_csv(spool, chunksize=block_rows):
+            table = pa.Table.from_pandas(block, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(out, table.schema)
+            writer.write_table(table.cast(writer.schema))
+        if writer is None:
+            pd.read_csv(spool).to_parquet(out, index=False)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.remove(spool)
+
+
+def stream_scan(symbols, source, today, out, executor=None, on_chunk=None, telemetry=None, resume=True, key=None,
+                chunk_size=SCAN_CHUNK_SIZE, **scan_args):
+    """run_scan that appends rows to `out` (.csv or .parquet) as chunks finish.
+
+    Returns the number of rows this run appended. `symbols` may be a generator (iter_symbols). With `resume`, a checkpoint
+    left by an interrupted scan with the same `key` (identifies the symbol
+    list), date, rules and chunk size is picked up and its finished chunks
+    are skipped.
+    """
+    rules = scan_args.get("rules", SCAN_RULES)
+    columns = RESULT_COLUMNS if len(resolve(rules)) == 1 else RULE_RESULT_COLUMNS
+    params = scan_params(today, key, rules, chunk_size)
+    state = load_checkpoint(out, params) if resume else None
+    done = set(state["done"]) if state else set()
+
+    spool = spool_path(out)
+    if state:
+        # Rows of chunks that finished after the last checkpoint are dropped and re-scanned
+        with open(spool, "r+b") as f:
+            f.truncate(state["offset"])
+    else:
+        pd.DataFrame(columns=columns).to_csv(spool, index=False)
+    if telemetry is not None:
+        telemetry.count("resumed_chunks", len(done))
+
+    written = 0
+    start = time.perf_counter()
+    with open(spool, "a", newline="") as f:
+        for chunk, rows in scan_universe(symbols, source, today, executor=executor, telemetry=telemetry,
+                                         chunk_size=chunk_size, skip=done, **scan_args):
+            if rows:
+                pd.DataFrame(rows, columns=columns).to_csv(f, header=False, index=False)
+                f.flush()
+            written += len(rows)
+            done.add(chunk.number)
+            save_checkpoint(out, params, done, f.tell())
+            if on_chunk:
+                on_chunk(chunk, rows)
+    if telemetry is not None:
+        telemetry.observe("scan_seconds", time.perf_counter() - start)
+
+    finish_spool(spool, out)
+    os.remove(checkpoint_path(out))
+    return written
@@ -0,0 +1,150 @@
+# ==========================================
+# Live Streaming Breakout Engine
+# ==========================================
+# Yesterday's CPR levels are computed once per session; after that every
+# incoming candle only touches its own symbol's small state object, so a
+# breakout event is emitted the moment a rule's entry candle closes without
+# re-downloading or re-scanning anything. The conditions are the registered
+# rules.Rule objects, evaluated over each symbol's one-row opening frame.
+import json
+import socket
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from backtest import signal_rule
+from cpr_engine import compute_levels, latest_levels, to_panel
+from data_fetch import fetch_daily
+from rules import ASCENDING, OHLC, Rule, evaluate, level_columns, prefilter
+
+VOLUME_LOOKBACK = 7
+
+DAILY_LOOKBACK_DAYS = 15
+
+RULES = ["first_candle", "three_candle"]
+
+
+class SymbolState:
+    """One symbol's opening frame, built up a candle at a time, and the rules it can still fire."""
+
+    __slots__ = ("columns", "rules", "count")
+
+    def __init__(self, columns, rules):
+        self.columns = columns  # one-row opening frame: {column: 1-element array}
+        self.rules = rules
+        self.count = 0
+
+
+class StreamingEngine:
+    def __init__(self, levels, rules=RULES, vol_filter=False, require_ascending=True):
+        # Each rule is evaluated under its own name; the volume filter swaps in its volume variant
+        self.rules = {name: self._rule(name, vol_filter, require_ascending) for name in rules}
+        self.vol_filter = vol_filter
+        self.require_ascending = require_ascending
+
+        # The candle-free predicates are decided once per session for every symbol
+        frame = level_columns(levels)
+        cache = {}
+        candidates = {name: prefilter(frame, [rule], cache) for name, rule in self.rules.items()}
+        self.states = {}
+        for i, symbol in enumerate(frame["Symbol"]):
+            rules = [name for name in self.rules if candidates[name][i]]
+            if rules:
+                columns = {name: values[i:i + 1] for name, values in frame.items()}
+                self.states[symbol] = SymbolState(columns, rules)
+
+    @staticmethod
+    def _rule(name, vol_filter, require_ascending):
+        spec = signal_rule(name, vol_filter)
+        predicates = spec.predicates if require_ascending else [p for p in spec.predicates if p is not ASCENDING]
+        return Rule(name, predicates, spec.entry_candle)
+
+    @classmethod
+    def for_session(cls, symbols, source, today, **kwargs):
+        """Precompute yesterday's CPR levels + average volume for every symbol once."""
+        daily_bars = fetch_daily(symbols, source, start=today - timedelta(days=DAILY_LOOKBACK_DAYS), end=today)
+        levels = latest_levels(compute_levels(to_panel(daily_bars)), today)
+        avg_volume = {}
+        for symbol, daily in daily_bars.items():
+            past = daily[daily.index.date < today]
+            avg_volume[symbol] = float(past["Volume"].tail(VOLUME_LOOKBACK).mean())
+        levels["Avg Volume"] = pd.Series(avg_volume)
+        return cls(levels.dropna(subset=["CPR Trend"]), **kwargs)
+
+    def on_bar(self, symbol, when, open_, high, low, close, volume):
+        """Feed one completed candle; returns the breakout events it triggers."""
+        state = self.states.get(symbol)
+        if state is None:
+            return []
+
+        state.count += 1
+        n = state.count
+        if n > max(self.rules[name].candles for name in state.rules):
+            return []
+        for name, value in zip(OHLC, (open_, high, low, close, volume)):
+            state.columns[f"c{n} {name}"] = np.array([value], dtype=float)
+        due = [self.rules[name] for name in state.rules if self.rules[name].entry_candle == n]
+        if not due:
+            return []
+
+        fired = evaluate(state.columns, due)
+        return [self._event(symbol, rule.name, when, close, state) for rule in due if fired[rule.name][0]]
+
+    def _event(self, symbol, rule, when, close, state):
+        return {
+            "Symbol": symbol,
+            "Rule": rule,
+            "Time": when,
+            "Close": close,
+            "Yesterday High": float(state.columns["Yesterday High"][0]),
+            "R1": float(state.columns["R1"][0]),
+        }
+
+    def run(self, feed, on_event=None):
+        """Consume a feed of (symbol, time, open, high, low, close, volume) tuples."""
+        events = []
+        for bar in feed:
+            for event in self.on_bar(*bar):
+                events.append(event)
+                if on_event:
+                    on_event(event)
+        return events
+
+
+# --------------------------
+# Feeds
+# --------------------------
+def replay_feed(bars, speed=None):
+    """Replay {symbol: intraday frame} (or a long CSV path) in time order.
+
+    `speed` > 0 sleeps between timestamps to imitate a live feed at that
+    multiple of real time; None replays as fast as possible.
+    """
+    if isinstance(bars, str):
+        frame = pd.read_csv(bars, parse_dates=["Datetime"])
+    else:
+        frame = pd.concat(
+            {symbol: f.rename_axis("Datetime") for symbol, f in bars.items()}, names=["Symbol"]
+        ).reset_index()
+    frame = frame.sort_values(["Datetime", "Symbol"], kind="stable")
+
+    previous = None
+    for row in frame.itertuples(index=False):
+        if speed and previous is not None and row.Datetime > previous:
+            time.sleep((row.Datetime - previous).total_seconds() / speed)
+        previous = row.Datetime
+        yield row.Symbol, row.Datetime, row.Open, row.High, row.Low, row.Close, row.Volume
+
+
+def socket_feed(host="127.0.0.1", port=9009):
+    """Newline-delimited JSON candles from a local socket (stand-in for a broker feed)."""
+    with socket.create_connection((host, port)) as conn, conn.makefile("r") as lines:
+        for line in lines:
+            if not line.strip():
+                continue
+            bar = json.loads(line)
+            yield (bar["Symbol"], pd.Timestamp(bar["Datetime"]), bar["Open"], bar["High"],
+                   bar["Low"], bar["Close"], bar["Volume"])
+
@@ -0,0 +1,219 @@
+# ==========================================
+# Scan Telemetry
+# ==========================================
+# Thread-safe counters and latency histograms for the scan hot path
+# (per-stage timings, cache hits, retries, failures, symbol outcomes).
+# One Telemetry object is shared by the source, the executor and the scan
+# pipeline for a run; it exports as JSON or Prometheus text format.
+import heapq
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import pandas as pd
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+SLOWEST_CHUNKS = 10
+
+PROMETHEUS_PREFIX = "cpr_"
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count", "max")
+
+    def __init__(self, buckets):
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def quantile(self, q, buckets):
+        # Upper bound of the bucket holding the q-th observation
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class Telemetry:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counters = defaultdict(float)  # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> Histogram
+        self.slow_chunks = []  # min-heap of (seconds, symbols)
+        self.started = time.time()
+        self.lock = threading.Lock()
+
+    # A copy sent to a worker process counts on its own; the parent's totals don't see it
+    def __getstate__(self):
+        with self.lock:
+            state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    # --------------------------
+    # Recording
+    # --------------------------
+    def count(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] += value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = Histogram(self.buckets)
+            slot = next((i for i, bound in enumerate(self.buckets) if seconds <= bound), len(self.buckets))
+            hist.counts[slot] += 1
+            hist.total += seconds
+            hist.count += 1
+            hist.max = max(hist.max, seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def stage(self, name):
+        """Time one pipeline stage (daily_fetch, cpr_compute, ...)."""
+        return self.timer("stage_seconds", stage=name)
+
+    def record_chunk(self, symbols, seconds):
+        # Keep only the slowest chunks so a 2,000-symbol scan stays small
+        with self.lock:
+            entry = (seconds, tuple(symbols))
+            if len(self.slow_chunks) < SLOWEST_CHUNKS:
+                heapq.heappush(self.slow_chunks, entry)
+            elif seconds > self.slow_chunks[0][0]:
+                heapq.heapreplace(self.slow_chunks, entry)
+
+    # --------------------------
+    # Summaries
+    # --------------------------
+    def counter_total(self, name, **labels):
+        wanted = set(labels.items())
+        with self.lock:
+            return sum(value for (counter, keys), value in self.counters.items()
+                       if counter == name and wanted <= set(keys))
+
+    def seconds_total(self, name, **labels):
+        wanted = set(labels.items())
+        with self.lock:
+            return sum(hist.total for (histogram, keys), hist in self.histograms.items()
+                       if histogram == name and wanted <= set(keys))
+
+    def cache_hit_rate(self):
+        hits = self.counter_total("cache_requests", result="hit")
+        total = self.counter_total("cache_requests")
+        return hits / total if total else None
+
+    def stage_summary(self):
+        rows = []
+        with self.lock:
+            for (name, labels), hist in self.histograms.items():
+                label = ", ".join(f"{key}={value}" for key, value in labels)
+                rows.append({
+                    "Metric": name,
+                    "Labels": label,
+                    "Calls": hist.count,
+                    "Total s": round(hist.total, 3),
+                    "Mean ms": round(1000 * hist.total / hist.count, 1),
+                    "p50 ms": round(1000 * hist.quantile(0.5, self.buckets), 1),
+                    "p95 ms": round(1000 * hist.quantile(0.95, self.buckets), 1),
+                    "Max ms": round(1000 * hist.max, 1),
+                })
+        columns = ["Metric", "Labels", "Calls", "Total s", "Mean ms", "p50 ms", "p95 ms", "Max ms"]
+        return pd.DataFrame(rows, columns=columns).sort_values("Total s", ascending=False, ignore_index=True)
+
+    def counter_summary(self):
+        with self.lock:
+            rows = [{"Counter": name, "Labels": ", ".join(f"{key}={value}" for key, value in labels), "Value": value}
+                    for (name, labels), value in sorted(self.counters.items())]
+        return pd.DataFrame(rows, columns=["Counter", "Labels", "Value"])
+
+    def slowest_chunks(self):
+        with self.lock:
+            chunks = sorted(self.slow_chunks, reverse=True)
+        return pd.DataFrame([{"Seconds": round(seconds, 3), "Symbols": ", ".join(symbols)}
+                             for seconds, symbols in chunks], columns=["Seconds", "Symbols"])
+
+    # --------------------------
+    # Export
+    # --------------------------
+    def to_dict(self):
+        with self.lock:
+            return {
+                "started": self.started,
+                "counters": [{"name": name, "labels": dict(labels), "value": value}
+                             for (name, labels), value in sorted(self.counters.items())],
+                "histograms": [{"name": name, "labels": dict(labels), "buckets": list(self.buckets),
+                                "counts": list(hist.counts), "sum": hist.total, "count": hist.count,
+                                "max": hist.max}
+                               for (name, labels), hist in sorted(self.histograms.items())],
+                "slowest_chunks": [{"seconds": seconds, "symbols": list(symbols)}
+                                   for seconds, symbols in sorted(self.slow_chunks, reverse=True)],
+            }
+
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def to_prometheus(self):
+        lines = []
+        with self.lock:
+            counters = defaultdict(list)
+            for (name, labels), value in sorted(self.counters.items()):
+                counters[name].append((labels, value))
+            for name, series in counters.items():
+                metric = f"{PROMETHEUS_PREFIX}{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.extend(f"{metric}{_labels(labels)} {_number(value)}" for labels, value in series)
+
+            histograms = defaultdict(list)
+            for (name, labels), hist in sorted(self.histograms.items()):
+                histograms[name].append((labels, hist))
+            for name, series in histograms.items():
+                metric = f"{PROMETHEUS_PREFIX}{name}"
+                lines.append(f"# TYPE {metric} histogram")
+                for labels, hist in series:
+                    cumulative = 0
+                    for bound, count in zip(list(self.buckets) + ["+Inf"], hist.counts):
+                        cumulative += count
+                        lines.append(f"{metric}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+                    lines.append(f"{metric}_sum{_labels(labels)} {_number(hist.total)}")
+                    lines.append(f"{metric}_count{_labels(labels)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        with open(path, "w") as f:
+            f.write(self.to_prometheus() if path.endswith(".prom") else self.to_json())
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _number(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+
+from analysis import developing_levels
+from bar_store import BarView
+from cpr_engine import cpr_levels
+
+
+def test_developing_levels_from_todays_bars():
+    times = pd.date_range("2026-02-24 09:15", periods=3, freq="5min", tz="Asia/Kolkata")
+    values = np.array([[100.0, 101.0, 102.0], [101.5, 103.0, 102.5], [99.0, 100.5, 101.0],
+                       [101.0, 102.0, 102.2], [1.0, 1.0, 1.0]])
+    latest = pd.DataFrame({"BC": [95.0], "TC": [96.0]}, index=pd.Index(["A.NS"], name="Symbol"))
+
+    tomorrow = developing_levels("A.NS", BarView("A.NS", times, values), latest)
+
+    expected = cpr_levels(np.array([103.0]), np.array([99.0]), np.array([102.2]))
+    assert tomorrow["Pivot"] == expected["Pivot"][0]
+    assert tomorrow["CPR Trend"] == "Ascending"
+    assert developing_levels("B.NS", BarView("B.NS", times, values), latest) is None
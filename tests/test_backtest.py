@@ -0,0 +1,30 @@
+import pickle
+
+import pandas as pd
+
+from backtest import run_backtest
+from data_fetch import MemorySource
+from fixtures import synthetic_bars, synthetic_symbols
+from scan_executor import RateLimitedSource, TokenBucket
+from scanner import default_source
+from telemetry import Telemetry
+
+
+def test_default_source_pickles(tmp_path):
+    source = pickle.loads(pickle.dumps(default_source(cache_dir=str(tmp_path), telemetry=Telemetry())))
+    limiter = source.upstream
+    limiter.bucket.acquire()
+    limiter.telemetry.count("upstream_requests")
+    assert limiter.telemetry.counter_total("upstream_requests") == 1
+
+
+def test_backtest_process_pool_with_rate_limited_source():
+    symbols = synthetic_symbols(20)
+    bars = synthetic_bars(symbols, session_date="2026-02-24")
+    source = RateLimitedSource(MemorySource(bars), TokenBucket(100.0), Telemetry())
+    start = pd.Timestamp("2026-02-01")
+
+    pooled = run_backtest(symbols, source, start, workers=2, chunk_size=5)
+    inline = run_backtest(symbols, MemorySource(bars), start, workers=1, chunk_size=5)
+    assert len(inline)
+    pd.testing.assert_frame_equal(pooled, inline)
@@ -0,0 +1,54 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from bar_cache import BarCache, CachedSource
+from data_fetch import MemorySource
+
+YESTERDAY = pd.date_range("2026-02-23 09:15", periods=3, freq="5min", tz="Asia/Kolkata")
+TODAY = pd.date_range("2026-02-24 09:15", periods=3, freq="5min", tz="Asia/Kolkata")
+
+
+def bars(times, opens):
+    return pd.DataFrame({"Open": opens, "High": opens, "Low": opens, "Close": opens, "Volume": 1.0}, index=times)
+
+
+def test_period_1d_is_todays_session_when_cache_holds_yesterday(tmp_path):
+    cache = BarCache(str(tmp_path), clock=lambda: pd.Timestamp("2026-02-24 09:45").to_pydatetime())
+    cache.save("A.NS", "5m", bars(YESTERDAY, [1.0, 2.0, 3.0]), YESTERDAY[0].date())
+    # Written at yesterday's close, so it is past its TTL and gets topped up
+    stale = time.time() - 3600
+    os.utime(cache.path("A.NS", "5m"), (stale, stale))
+    upstream = MemorySource({"5m": {"A.NS": bars(YESTERDAY.append(TODAY), [1.0, 2.0, 3.0, 4.0, 5.0, 6.0])}})
+
+    got = CachedSource(upstream, cache).download(["A.NS"], interval="5m", period="1d")["A.NS"]
+
+    assert list(got.index) == list(TODAY)
+    assert got["Open"].iloc[0] == 4.0
+    assert got.equals(upstream.download(["A.NS"], interval="5m", period="1d")["A.NS"])
+
+
+def sessions(days):
+    # Three 5m bars per session
+    times = [pd.date_range(f"{day} 09:15", periods=3, freq="5min", tz="Asia/Kolkata") for day in days]
+    index = times[0].append(times[1:])
+    return bars(index, [float(i) for i in range(len(index))])
+
+
+@pytest.mark.parametrize("clock, last_session, period", [
+    ("2026-02-23 08:00", "2026-02-20", "1d"),  # Monday before the open: Friday's session
+    ("2026-02-24 09:45", "2026-02-24", "5d"),  # back across the weekend
+    ("2026-02-24 09:45", "2026-02-24", "10d"),  # two weekends and a holiday (Feb 16)
+])
+def test_period_nd_returns_n_sessions_across_weekends_and_holidays(tmp_path, clock, last_session, period):
+    days = [day for day in pd.bdate_range("2026-01-26", last_session).date.astype(str) if day != "2026-02-16"]
+    upstream = MemorySource({"5m": {"A.NS": sessions(days)}})
+    cache = BarCache(str(tmp_path), clock=lambda: pd.Timestamp(clock).to_pydatetime())
+    expected = upstream.download(["A.NS"], interval="5m", period=period)["A.NS"]
+    assert len(set(expected.index.date)) == int(period[:-1])
+
+    got = CachedSource(upstream, cache).download(["A.NS"], interval="5m", period=period)["A.NS"]
+
+    assert got.equals(expected)
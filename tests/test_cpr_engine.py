@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bar_store import BarStore
+from cpr_engine import LEVEL_COLUMNS, compute_levels, cpr_levels, cpr_trend, latest_levels, latest_store_levels, \
+    to_panel
+from fixtures import synthetic_bars, synthetic_symbols
+
+LEVELS = ["Pivot", "BC", "TC", "R1", "R2", "S1", "S2", "CPR Width %"]
+
+# (high, low, close) -> pivot, BC, TC, R1, R2, S1, S2, width %, type
+LEVEL_CASES = [
+    ((110.0, 90.0, 100.0), (100.0, 100.0, 100.0, 110.0, 120.0, 90.0, 80.0, 0.0), "Narrow"),
+    ((110.0, 90.0, 106.0), (102.0, 100.0, 104.0, 114.0, 122.0, 94.0, 82.0, 4 / 102 * 100), "Wide"),
+    # Close below the midpoint puts TC under BC; the width is still |TC - BC|
+    ((110.0, 90.0, 94.0), (98.0, 100.0, 96.0, 106.0, 118.0, 86.0, 78.0, 4 / 98 * 100), "Wide"),
+    ((100.6, 99.4, 100.3), (100.1, 100.0, 100.2, 100.8, 101.3, 99.6, 98.9, 0.2 / 100.1 * 100), "Narrow"),
+    ((100.6, 99.4, 99.7), (99.9, 100.0, 99.8, 100.4, 101.1, 99.2, 98.7, 0.2 / 99.9 * 100), "Narrow"),
+    ((100.6, 99.4, 100.5), (100.1667, 100.0, 100.3333, 100.9333, 101.3667, 99.7333, 98.9667, 100 / 300.5),
+     "Wide"),
+]
+
+# (BC, TC, previous BC, previous TC) -> trend
+TREND_CASES = [
+    ((11.0, 13.0, 10.0, 12.0), "Ascending"),
+    ((9.0, 11.0, 10.0, 12.0), "Descending"),
+    ((10.5, 11.5, 10.0, 12.0), "Inside"),
+    ((10.0, 12.0, 10.0, 12.0), "Inside"),  # unchanged CPR counts as inside
+    ((9.0, 13.0, 10.0, 12.0), "Outside"),
+    ((10.0, 13.0, 10.0, 12.0), "Neutral"),  # BC flat, TC up
+    ((9.0, 12.0, 10.0, 12.0), "Neutral"),  # BC down, TC flat
+]
+
+
+@pytest.mark.parametrize("hlc, expected, cpr_type", LEVEL_CASES)
+def test_cpr_levels(hlc, expected, cpr_type):
+    high, low, close = (np.array([value]) for value in hlc)
+    levels = cpr_levels(high, low, close)
+    np.testing.assert_allclose([levels[name][0] for name in LEVELS], expected, rtol=1e-4)
+    assert levels["CPR Width %"][0] == pytest.approx(abs(levels["TC"][0] - levels["BC"][0]) / levels["Pivot"][0] * 100)
+    assert levels["CPR-Type"][0] == cpr_type
+
+
+def test_cpr_levels_vectorized_matches_row_by_row():
+    high, low, close = (np.array(column) for column in zip(*(hlc for hlc, _, _ in LEVEL_CASES)))
+    levels = cpr_levels(high, low, close, narrow_pct=0.1)
+    for i, (hlc, expected, _) in enumerate(LEVEL_CASES):
+        np.testing.assert_allclose([levels[name][i] for name in LEVELS], expected, rtol=1e-4)
+    assert list(levels["CPR-Type"]) == ["Narrow" if row[1][-1] < 0.1 else "Wide" for row in LEVEL_CASES]
+
+
+@pytest.mark.parametrize("values, expected", TREND_CASES)
+def test_cpr_trend(values, expected):
+    bc, tc, prev_bc, prev_tc = (np.array([value]) for value in values)
+    assert list(cpr_trend(bc, tc, prev_bc, prev_tc, np.array([True]))) == [expected]
+    assert list(cpr_trend(bc, tc, prev_bc, prev_tc, np.array([False]))) == [None]
+
+
+def daily(rows, start="2026-02-18"):
+    dates = pd.bdate_range(start, periods=len(rows))
+    high, low, close = zip(*rows)
+    return pd.DataFrame({"Open": close, "High": high, "Low": low, "Close": close, "Volume": 1000.0}, index=dates)
+
+
+def test_compute_levels_trend_is_per_symbol():
+    # A's CPR steps up then down; B's first day must not be compared with A's last
+    panel = to_panel({
+        "A.NS": daily([(110.0, 90.0, 100.0), (115.0, 95.0, 105.0), (105.0, 85.0, 95.0)]),
+        "B.NS": daily([(200.0, 180.0, 190.0), (200.0, 180.0, 190.0)]),
+    })
+    levels = compute_levels(panel)
+    assert list(levels["CPR Trend"].fillna("-")) == ["-", "Ascending", "Descending", "-", "Inside"]
+    np.testing.assert_allclose(levels["Pivot"], [100.0, 105.0, 95.0, 190.0, 190.0])
+
+
+def test_latest_store_levels_matches_the_panel_engine():
+    today = pd.Timestamp("2026-02-24").date()
+    bars = synthetic_bars(synthetic_symbols(30), session_date=today)["1d"]
+    # One symbol with a single completed day (no trend) and one with none before today
+    bars["ONE.NS"] = daily([(110.0, 90.0, 100.0), (111.0, 91.0, 101.0)], start="2026-02-23")
+    bars["NEW.NS"] = daily([(110.0, 90.0, 100.0)], start="2026-02-24")
+
+    expected = latest_levels(compute_levels(to_panel(bars)), today)
+    got = latest_store_levels(BarStore.from_frames(bars), today, volume_lookbacks=(1, 5))
+
+    assert "NEW.NS" not in got.index
+    assert pd.isna(got.loc["ONE.NS", "CPR Trend"])
+    expected = expected.loc[got.index]
+    assert list(got.index) == list(expected.index)
+    for column in ["Open", "High", "Low", "Close"] + LEVEL_COLUMNS:
+        np.testing.assert_array_equal(got[column].fillna("-"), expected[column].fillna("-"), err_msg=column)
+    for symbol in ["SYN0000.NS", "ONE.NS"]:
+        volume = bars[symbol]["Volume"][bars[symbol].index.date < today]
+        assert got.loc[symbol, "Avg Volume 1"] == volume.iloc[-1]
+        assert got.loc[symbol, "Avg Volume 5"] == pytest.approx(volume.tail(5).mean())
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cpr_engine import compute_levels, to_panel
+import cpr_history
+from cpr_history import MAX_VIRGIN_ZONES, WIDTH_WINDOWS, CPRHistory
+from fixtures import synthetic_bars, synthetic_symbols
+
+def daily_bars():
+    # 90 sessions wrap the 60-day width ring buffer; one symbol lists a month later
+    symbols = synthetic_symbols(12)
+    bars = synthetic_bars(symbols, days=90, session_date="2026-02-24", seed=3)["1d"]
+    late = symbols[-1]
+    bars[late] = bars[late].iloc[20:]
+    return bars
+
+
+def recompute(bars, max_zones=MAX_VIRGIN_ZONES):
+    """Every history row from scratch, one symbol at a time, without any carried state."""
+    levels = compute_levels(to_panel(bars))
+    rows = []
+    for symbol, frame in levels.groupby(level="Symbol", sort=False):
+        streak = 0
+        widths = []
+        zones = []  # (low, high, date) of CPRs price has not traded back into
+        prev = prev_date = None
+        for (_, date), row in frame.iterrows():
+            streak = streak + 1 if row["CPR Trend"] == "Ascending" else 0
+            widths.append(row["CPR Width %"])
+            pctl = {window: np.mean(np.array(widths[-window:]) <= row["CPR Width %"]) * 100
+                    if len(widths) >= window else np.nan for window in WIDTH_WINDOWS}
+
+            zones = [zone for zone in zones if not (zone[0] <= row["High"] and zone[1] >= row["Low"])]
+            virgin = False
+            if prev is not None:
+                low, high = min(prev["BC"], prev["TC"]), max(prev["BC"], prev["TC"])
+                virgin = row["Low"] > high or row["High"] < low
+                if virgin:
+                    if len(zones) == max_zones:
+                        zones.remove(min(zones, key=lambda zone: zone[2]))
+                    zones.append((low, high, prev_date))
+            above = [zone[0] for zone in zones if zone[0] > row["Close"]]
+            below = [zone[1] for zone in zones if zone[1] < row["Close"]]
+
+            rows.append({"Symbol": symbol, "Date": date, "Ascending Streak": streak,
+                         "Width Pctl 20": pctl[20], "Width Pctl 60": pctl[60], "Prev CPR Virgin": virgin,
+                         "Open Virgin CPRs": len(zones), "Virgin Above": min(above, default=np.nan),
+                         "Virgin Below": max(below, default=np.nan),
+                         **{column: row[column] for column in ["Pivot", "BC", "TC", "R1", "CPR Trend"]}})
+            prev, prev_date = row, date
+    return pd.DataFrame(rows).set_index(["Symbol", "Date"]).sort_index()
+
+
+def appended(history):
+    return history.history().reset_index().set_index(["Symbol", "Date"]).sort_index()
+
+
+# A small zone cap makes the oldest virgin zone get evicted
+@pytest.mark.parametrize("max_zones", [MAX_VIRGIN_ZONES, 4])
+def test_appending_one_session_at_a_time_matches_a_full_recompute(tmp_path, monkeypatch, max_zones):
+    monkeypatch.setattr(cpr_history, "MAX_VIRGIN_ZONES", max_zones)
+    bars = daily_bars()
+    panel = to_panel(bars)
+    dates = panel.index.get_level_values("Date")
+    for date, day in panel.groupby(dates, sort=True):
+        # A fresh object each day, so the rolling state round-trips through state.npz
+        CPRHistory(str(tmp_path)).append(date, day.droplevel("Date"))
+
+    expected = recompute(bars, max_zones)
+    got = appended(CPRHistory(str(tmp_path)))
+    assert got.index.equals(expected.index)
+    for column in expected.columns:
+        if column == "CPR Trend":
+            assert list(got[column].fillna("-")) == list(expected[column].fillna("-"))
+        else:
+            np.testing.assert_allclose(got[column].astype(float), expected[column].astype(float), err_msg=column)
+    # The fixture exercises every feature
+    assert got["Ascending Streak"].max() >= 2
+    assert got["Open Virgin CPRs"].max() == min(max_zones, 8)  # the fixture leaves at most 8 open
+    assert got["Virgin Above"].notna().any()
+    assert got["Width Pctl 60"].notna().sum() > len(bars) * 20
+
+    latest = CPRHistory(str(tmp_path)).latest()
+    last = expected.groupby(level="Symbol").tail(1).droplevel("Date")
+    assert (latest.loc[last.index, "Ascending Streak"] == last["Ascending Streak"]).all()
+
+
+def test_appending_a_session_twice_does_not_double_count(tmp_path):
+    bars = daily_bars()
+    panel = to_panel(bars)
+    dates = panel.index.get_level_values("Date")
+    once, twice = CPRHistory(str(tmp_path / "once")), CPRHistory(str(tmp_path / "twice"))
+    for date, day in panel.groupby(dates, sort=True):
+        day = day.droplevel("Date")
+        once.append(date, day)
+        twice.append(date, day)
+        # Re-running the day, in memory and from disk, is a no-op
+        assert twice.append(date, day).empty
+        assert CPRHistory(str(tmp_path / "twice")).append(date, day).empty
+
+    twice = CPRHistory(str(tmp_path / "twice"))
+    pd.testing.assert_frame_equal(appended(twice), appended(once))
+    for key in ["streak", "width_n", "widths", "zone_lo", "zone_hi", "last_date"]:
+        np.testing.assert_array_equal(twice.state[key], once.state[key], err_msg=key)
+    assert twice.state["width_n"].max() == len(set(dates))
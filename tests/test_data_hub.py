@@ -0,0 +1,57 @@
+import threading
+
+import pandas as pd
+
+from bar_cache import BarCache
+from data_fetch import MemorySource
+from data_hub import DataHub, _nbytes
+from fixtures import synthetic_bars, synthetic_symbols
+
+
+def test_frames_are_bounded_by_bytes_least_recently_used_first():
+    symbols = synthetic_symbols(4)
+    bars = synthetic_bars(symbols, session_date="2026-02-24")
+    size = _nbytes(bars["1d"][symbols[0]])
+    hub = DataHub(MemorySource(bars), max_bytes=size * 2)
+
+    hub.download(symbols[:2])
+    hub.download(symbols[:1])  # symbols[1] is now the least recently used
+    hub.download(symbols[2:3])
+
+    cached = {key[0] for key in hub.frames}
+    assert cached == {symbols[0], symbols[2]}
+    assert hub.frame_bytes <= size * 2
+
+
+def test_concurrent_saves_of_one_symbol(tmp_path):
+    cache = BarCache(str(tmp_path))
+    frame = synthetic_bars(["A.NS"], session_date="2026-02-24")["1d"]["A.NS"]
+    errors = []
+
+    def save():
+        try:
+            for _ in range(20):
+                cache.save("A.NS", "1d", frame, frame.index[0].date())
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=save) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    pd.testing.assert_frame_equal(cache.load("A.NS", "1d")[0], frame, check_freq=False)
+    assert not list(tmp_path.glob("1d/*.tmp"))
+
+
+def test_shared_hub_settings_follow_the_latest_scan(monkeypatch):
+    import data_hub
+
+    monkeypatch.setattr(data_hub, "_hub", None)
+    hub = data_hub.shared_hub()
+    assert hub.settings() == (data_hub.DEFAULT_RATE, data_hub.DEFAULT_TIMEOUT)
+    assert data_hub.shared_hub(rate=2.0, timeout=12.0) is hub
+    assert hub.settings() == (2.0, 12.0)
+    assert hub.bucket.capacity == 2.0
+    assert data_hub.shared_hub().settings() == (2.0, 12.0)  # a page without settings keeps them
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from cpr_engine import LEVEL_COLUMNS, compute_levels, latest_levels, to_panel
+from data_fetch import MemorySource
+from fixtures import synthetic_bars, synthetic_symbols
+from level_snapshot import build_snapshot, load_snapshot, lookup, write_snapshot
+
+SESSION = pd.Timestamp("2026-02-24").date()
+
+
+def test_snapshot_levels_match_compute_levels(tmp_path):
+    symbols = synthetic_symbols(45)
+    bars = synthetic_bars(symbols, session_date=SESSION)
+    # Small chunks so the snapshot is stitched from several builds
+    snapshot = build_snapshot(symbols + ["MISSING.NS"], MemorySource(bars), SESSION, chunk_size=10)
+
+    expected = latest_levels(compute_levels(to_panel(bars["1d"])), SESSION).sort_index()
+    assert list(snapshot.index) == sorted(symbols)
+    assert (snapshot["Session"] == pd.Timestamp(SESSION)).all()
+    for column in ["High", "Low", "Close"] + LEVEL_COLUMNS:
+        np.testing.assert_array_equal(snapshot[column], expected[column], err_msg=column)
+    for symbol in symbols[:3]:
+        volume = bars["1d"][symbol]["Volume"]
+        assert snapshot.loc[symbol, "Avg Volume 10"] == volume[volume.index.date < SESSION].tail(10).mean()
+
+    write_snapshot(snapshot, SESSION, str(tmp_path))
+    loaded = load_snapshot(SESSION, str(tmp_path))
+    # Parquet may store the Session stamp at a finer resolution
+    pd.testing.assert_frame_equal(loaded, snapshot, check_dtype=False)
+    rows, missing = lookup(loaded, [symbols[5], "MISSING.NS", symbols[0]])
+    assert list(rows.index) == [symbols[5], symbols[0]] and missing == ["MISSING.NS"]
@@ -0,0 +1,29 @@
+import pandas as pd
+
+from data_fetch import MemorySource
+from fixtures import synthetic_bars, synthetic_symbols
+from optimizer import params_rule, run_sweep
+from rules import RULES
+from scan_executor import RateLimitedSource, TokenBucket
+from telemetry import Telemetry
+
+
+def test_sweep_process_pool_with_rate_limited_source():
+    symbols = synthetic_symbols(20)
+    bars = synthetic_bars(symbols, session_date="2026-02-24")
+    source = RateLimitedSource(MemorySource(bars), TokenBucket(100.0), Telemetry())
+    start = pd.Timestamp("2026-02-01")
+
+    pooled = run_sweep(symbols, source, start, search="random", samples=100, workers=2, min_trades=1)
+    inline = run_sweep(symbols, MemorySource(bars), start, search="random", samples=100, workers=1, min_trades=1)
+    assert len(inline)
+    pd.testing.assert_frame_equal(pooled, inline)
+
+
+def test_params_rule_builds_on_the_backtest_rule():
+    rule = params_rule({"rule": "three_candle", "narrow_pct": 0.2, "vol_filter": True, "volume_lookback": 10,
+                        "confirm_r1": False, "stop_level": "S1"})
+    names = [predicate.name for predicate in rule.predicates]
+    assert "c3 close>R1" not in names
+    assert "width<0.2" in names
+    assert set(names) - {"width<0.2"} | {"c3 close>R1"} == {p.name for p in RULES["three_candle_volume"].predicates}
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from proximity import LevelIndex
+
+NAMES = ["S1", "Pivot", "R1"]
+
+
+def index():
+    levels = pd.DataFrame({
+        "S1": [90.0, 190.0, np.nan, 45.0],
+        "Pivot": [100.0, 200.0, np.nan, np.nan],
+        "R1": [110.0, 210.0, np.nan, 55.0],
+    }, index=pd.Index(["A.NS", "B.NS", "EMPTY.NS", "GAPPY.NS"], name="Symbol"))
+    return LevelIndex(levels, NAMES)
+
+
+def test_update_merges_partial_ticks():
+    levels = index()
+    assert levels.update({"A.NS": 109.8, "UNKNOWN.NS": 1.0}) == 1
+    assert levels.update(pd.Series({"B.NS": 199.0})) == 1
+    # A later tick for B leaves A's row alone
+    assert levels.update({"B.NS": 201.0}) == 1
+
+    np.testing.assert_array_equal(levels.prices[:2], [109.8, 201.0])
+    assert np.isnan(levels.prices[2:]).all()
+    np.testing.assert_allclose(levels.distance[0], [(109.8 - level) / level * 100 for level in (90.0, 100.0, 110.0)])
+    np.testing.assert_allclose(levels.distance[1], [(201.0 - level) / level * 100 for level in (190.0, 200.0, 210.0)])
+
+
+@pytest.mark.parametrize("within, levels, side, expected", [
+    (0.6, None, None, [("A.NS", "R1"), ("B.NS", "Pivot")]),
+    (0.6, None, "below", [("A.NS", "R1")]),
+    (0.6, None, "above", [("B.NS", "Pivot")]),
+    (0.6, ["Pivot"], None, [("B.NS", "Pivot")]),
+    (0.1, None, None, []),
+    (15.0, ["S1"], "above", [("B.NS", "S1"), ("GAPPY.NS", "S1")]),
+])
+def test_near(within, levels, side, expected):
+    index_ = index()
+    index_.update({"A.NS": 109.8, "B.NS": 201.0, "EMPTY.NS": 50.0, "GAPPY.NS": 48.0})
+
+    hits = index_.near(within, levels=levels, side=side)
+
+    assert list(zip(hits["Symbol"], hits["Level"])) == expected
+    assert (hits["Distance %"].abs().diff().dropna() >= 0).all()  # closest first
+
+
+def test_nearest_skips_symbols_without_price_or_levels():
+    levels = index()
+    levels.update({"A.NS": 109.8, "EMPTY.NS": 50.0, "GAPPY.NS": 48.0})
+
+    nearest = levels.nearest()
+
+    assert list(nearest.index) == ["A.NS", "GAPPY.NS"]
+    assert nearest.loc["A.NS", "Nearest Level"] == "R1"
+    assert (nearest.loc["A.NS", "Support"], nearest.loc["A.NS", "Resistance"]) == (100.0, 110.0)
+    # The missing pivot is never the nearest level
+    assert nearest.loc["GAPPY.NS", "Nearest Level"] == "S1"
+    assert (nearest.loc["GAPPY.NS", "Support"], nearest.loc["GAPPY.NS", "Resistance"]) == (45.0, 55.0)
+
+
+def test_nearest_outside_the_levels_and_with_no_prices():
+    levels = index()
+    assert levels.nearest().empty
+
+    levels.update({"A.NS": 80.0, "B.NS": 220.0})
+    nearest = levels.nearest()
+    assert list(nearest["Nearest Level"]) == ["S1", "R1"]
+    assert np.isnan(nearest.loc["A.NS", "Support"]) and nearest.loc["A.NS", "Resistance"] == 90.0
+    assert nearest.loc["B.NS", "Support"] == 210.0 and np.isnan(nearest.loc["B.NS", "Resistance"])
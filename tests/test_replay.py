@@ -0,0 +1,89 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from replay import RecordingSource, ReplaySource, load_recording
+
+TIMES = pd.date_range("2026-02-24 09:15", periods=40, freq="5min", tz="Asia/Kolkata")
+
+
+def bars(times):
+    values = range(len(times))
+    return pd.DataFrame({"Open": values, "High": values, "Low": values, "Close": values, "Volume": 1.0},
+                        index=times, dtype=float)
+
+
+def test_concurrent_saves_of_one_symbol_keep_every_bar(tmp_path):
+    recorder = RecordingSource(None, str(tmp_path))
+    windows = [TIMES[i:i + 5] for i in range(0, len(TIMES), 5)]
+    threads = [threading.Thread(target=recorder.save, args=("A.NS", "5m", bars(window))) for window in windows]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert list(load_recording(str(tmp_path), "A.NS", "5m").index) == list(TIMES)
+    assert not list(tmp_path.glob("5m/*.tmp"))
+
+
+def sessions(days):
+    times = [pd.date_range(f"{day} 09:15", periods=75, freq="5min", tz="Asia/Kolkata") for day in days]
+    return bars(times[0].append(times[1:]))
+
+
+def replay(tmp_path):
+    recorder = RecordingSource(None, str(tmp_path))
+    recorder.save("A.NS", "5m", sessions(["2026-02-20", "2026-02-23", "2026-02-24"]))
+    recorder.save("A.NS", "1d", bars(pd.bdate_range("2026-02-16", "2026-02-24")))
+    clock = [pd.Timestamp("2026-02-24 09:19")]
+    return ReplaySource(str(tmp_path), clock=lambda: clock[0].to_pydatetime()), clock
+
+
+def test_first_candle_appears_once_it_has_closed(tmp_path):
+    source, clock = replay(tmp_path)
+    today = pd.Timestamp("2026-02-24").date()
+
+    got = source.download(["A.NS", "MISSING.NS"], interval="5m", period="1d")
+    assert list(got) == ["A.NS"]
+    # At 09:19 the 09:15 candle is still forming: "1d" is still yesterday's session
+    assert set(got["A.NS"].index.date) == {pd.Timestamp("2026-02-23").date()}
+
+    clock[0] = pd.Timestamp("2026-02-24 09:20")
+    got = source.download(["A.NS"], interval="5m", period="1d")["A.NS"]
+    assert list(got.index) == [pd.Timestamp("2026-02-24 09:15", tz="Asia/Kolkata")]
+    assert got.index[0].date() == today
+
+
+@pytest.mark.parametrize("clock_at, kwargs, expected", [
+    # period counts sessions back from the clock, not from the end of the recording
+    ("2026-02-24 09:19", {"period": "2d"}, ("2026-02-20 09:15", "2026-02-23 15:25")),
+    ("2026-02-24 09:20", {"period": "2d"}, ("2026-02-23 09:15", "2026-02-24 09:15")),
+    ("2026-02-24 10:00", {"start": "2026-02-24"}, ("2026-02-24 09:15", "2026-02-24 09:55")),
+    ("2026-02-24 10:00", {"start": "2026-02-23 15:00", "end": "2026-02-24 09:30"},
+     ("2026-02-23 15:00", "2026-02-24 09:25")),
+])
+def test_intraday_slicing_is_relative_to_the_clock(tmp_path, clock_at, kwargs, expected):
+    source, clock = replay(tmp_path)
+    clock[0] = pd.Timestamp(clock_at)
+
+    got = source.download(["A.NS"], interval="5m", **kwargs)["A.NS"]
+
+    first, last = (pd.Timestamp(stamp, tz="Asia/Kolkata") for stamp in expected)
+    assert (got.index[0], got.index[-1]) == (first, last)
+    assert got.index.is_monotonic_increasing and got.index[-1] <= clock[0].tz_localize("Asia/Kolkata")
+
+
+def test_daily_bars_up_to_the_clocks_date(tmp_path):
+    source, clock = replay(tmp_path)
+    clock[0] = pd.Timestamp("2026-02-23 20:00")
+
+    got = source.download(["A.NS"], interval="1d", period="3d")["A.NS"]
+    assert list(got.index.date.astype(str)) == ["2026-02-19", "2026-02-20", "2026-02-23"]
+
+    got = source.download(["A.NS"], interval="1d", start="2026-02-18", end="2026-02-23")["A.NS"]
+    assert list(got.index.date.astype(str)) == ["2026-02-18", "2026-02-19", "2026-02-20"]
+
+    # Today's forming daily bar is there once the day has started
+    clock[0] = pd.Timestamp("2026-02-24 09:20")
+    assert source.download(["A.NS"], interval="1d", period="1d")["A.NS"].index[-1].date().isoformat() == "2026-02-24"
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from bar_store import BarView
+from resample import TimeframeBook, resample_view
+
+TIMES = pd.date_range("2026-02-24 09:15", periods=8, freq="5min", tz="Asia/Kolkata")
+
+
+def view(closes):
+    closes = np.asarray(closes, dtype=float)
+    n = len(closes)
+    values = np.vstack([closes, closes + 1, closes - 1, closes, np.ones(n)])
+    return BarView("A.NS", TIMES[:n], values)
+
+
+def test_update_replaces_a_revised_bar():
+    book = TimeframeBook("A.NS")
+    book.update(view([100.2]))
+    assert book.update(view([101.8])) == 1
+    assert book.view("5m").close.tolist() == [101.8]
+    assert book.view("15m").close.tolist() == [101.8]
+
+
+def test_revision_reaggregates_completed_buckets():
+    book = TimeframeBook("A.NS")
+    book.update(view([100, 101, 102]))  # completes the 09:15 15m bucket with a forming 09:25 bar
+    book.update(view([100, 101, 105, 106]))
+    final = view([100, 101, 105, 106])
+    for interval in ["15m", "30m", "60m"]:
+        got, want = book.view(interval), resample_view(final, interval)
+        assert list(got.times) == list(want.times)
+        assert np.array_equal(got.values, want.values)
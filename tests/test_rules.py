@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rules import RULES, Predicate, Rule, close_above, evaluate, frame_length, prefilter
+
+# One opening frame row per case; yesterday's high 100, R1 104, TC 98, average volume 1000.
+# Each row is built to fire exactly the rules listed for it.
+BASE = {"Yesterday High": 100.0, "R1": 104.0, "TC": 98.0, "CPR Width %": 0.2, "Avg Volume": 1000.0}
+CANDLES = {
+    "breakout": [(99.0, 101.0, 500)],
+    "breakout_volume": [(99.0, 101.0, 1500)],
+    "three": [(99.0, 99.5, 500), (99.5, 99.0, 500), (99.0, 105.0, 1000)],
+    "three_below_r1": [(99.0, 99.5, 500), (99.5, 99.0, 500), (99.0, 103.0, 1000)],
+    "red_breakout": [(102.0, 101.0, 500)],
+    "no_breakout": [(99.0, 99.5, 500)],
+}
+CASES = [
+    # (trend, type, candles, rules that fire)
+    ("Ascending", "Wide", "breakout", {"first_candle"}),
+    ("Ascending", "Wide", "breakout_volume", {"first_candle", "first_candle_volume"}),
+    ("Ascending", "Wide", "three", {"three_candle", "three_candle_volume"}),
+    ("Ascending", "Wide", "three_below_r1", set()),
+    ("Ascending", "Wide", "red_breakout", {"first_candle"}),
+    ("Ascending", "Narrow", "breakout", {"first_candle", "narrow_cpr_breakout"}),
+    ("Descending", "Narrow", "breakout", {"narrow_cpr_breakout"}),
+    ("Descending", "Narrow", "red_breakout", set()),
+    ("Inside", "Wide", "breakout", {"inside_cpr_breakout"}),
+    ("Inside", "Wide", "no_breakout", set()),
+    ("Descending", "Wide", "breakout_volume", set()),
+]
+
+
+def opening_frame():
+    rows = []
+    for trend, cpr_type, candles, _ in CASES:
+        row = dict(BASE, **{"CPR Trend": trend, "CPR-Type": cpr_type})
+        for n, (open_, close, volume) in enumerate(CANDLES[candles], start=1):
+            row.update({f"c{n} Open": open_, f"c{n} High": max(open_, close), f"c{n} Low": min(open_, close),
+                        f"c{n} Close": close, f"c{n} Volume": volume})
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def as_dict(frame):
+    return {name: frame[name].to_numpy() for name in frame.columns}
+
+
+@pytest.mark.parametrize("rule", list(RULES))
+def test_each_registered_rule_on_hand_built_sessions(rule):
+    fired = evaluate(opening_frame(), [rule])[rule]
+    expected = [rule in rules for *_, rules in CASES]
+    assert fired.tolist() == expected
+
+
+def test_evaluate_dataframe_and_dict_frames_agree():
+    frame = opening_frame()
+    from_frame = evaluate(frame)
+    from_dict = evaluate(as_dict(frame))
+    assert list(from_frame) == list(RULES)
+    for name in RULES:
+        np.testing.assert_array_equal(from_frame[name], from_dict[name])
+    assert frame_length(as_dict(frame)) == len(frame)
+
+
+def test_missing_candle_columns_never_fire():
+    # Sessions with only one candle leave c2/c3 as NaN
+    frame = opening_frame()
+    single = frame[frame["c2 Close"].isna()]
+    assert not evaluate(single, ["three_candle"])["three_candle"].any()
+    assert not evaluate(as_dict(frame.drop(columns=["c3 Close"])), ["three_candle"])["three_candle"].any()
+
+
+def test_shared_predicates_are_computed_once_per_frame():
+    calls = []
+
+    def func(frame):
+        calls.append(1)
+        return np.asarray(frame["CPR Trend"]) == "Ascending"
+
+    shared = Predicate("ascending", func)
+    rules = [Rule("a", [shared, close_above(1, "Yesterday High")], 1),
+             Rule("b", [shared, close_above(1, "R1")], 1)]
+    cache = {}
+    fired = evaluate(opening_frame(), rules, cache)
+    assert len(calls) == 1
+    assert set(cache) == {"ascending", "c1 close>Yesterday High", "c1 close>R1"}
+
+    # A cache carried over (prefilter, then evaluate) is reused, not recomputed
+    prefilter(opening_frame(), rules, cache)
+    evaluate(opening_frame(), rules, cache)
+    assert len(calls) == 1
+    assert fired["a"].any() and not fired["b"].any()
+
+
+def test_prefilter_reads_only_the_candle_free_predicates():
+    frame = opening_frame()
+    levels = frame[list(BASE) + ["CPR Trend", "CPR-Type"]]
+    trend, cpr_type = frame["CPR Trend"], frame["CPR-Type"]
+
+    keep = prefilter(levels, ["first_candle", "three_candle"])
+    assert keep.tolist() == (trend == "Ascending").tolist()
+    keep = prefilter(as_dict(levels), ["narrow_cpr_breakout", "inside_cpr_breakout"])
+    assert keep.tolist() == ((cpr_type == "Narrow") | (trend == "Inside")).tolist()
+
+    # The prefilter never drops a row a rule fires on
+    for name, fired in evaluate(frame).items():
+        assert not (fired & ~prefilter(levels, [name])).any()
+
+    assert RULES["three_candle"].candles == 3
+    assert [p.name for p in RULES["three_candle"].level_predicates] == ["trend==Ascending"]
@@ -0,0 +1,24 @@
+import threading
+import time
+
+from scan_executor import ScanExecutor
+
+
+def test_timed_out_item_is_retried_before_new_items():
+    attempts = {}
+    lock = threading.Lock()
+
+    def fn(item):
+        with lock:
+            attempts[item] = attempts.get(item, 0) + 1
+            first = attempts[item] == 1
+        time.sleep(1.0 if item == 0 and first else 0.02)
+        return item
+
+    executor = ScanExecutor(workers=2, timeout=0.3, retries=1, backoff=0)
+    order = [item for item, _ in executor.run(range(60), fn)]
+
+    assert sorted(order) == list(range(60))
+    assert not executor.failures
+    assert executor.retry_count == 1
+    assert order.index(0) < 30
@@ -0,0 +1,70 @@
+import os
+
+import pandas as pd
+import pytest
+
+from data_fetch import MemorySource
+from fixtures import synthetic_bars, synthetic_symbols
+from scan_executor import ScanExecutor
+from scanner import checkpoint_path, load_checkpoint, scan_params, spool_path, stream_scan
+
+TODAY = pd.Timestamp("2026-02-24").date()
+SYMBOLS = synthetic_symbols(200)
+BARS = synthetic_bars(SYMBOLS, session_date=TODAY)
+
+
+class Interrupted(Exception):
+    pass
+
+
+def scan(out, resume=True, stop_after=None):
+    scanned = []
+
+    def on_chunk(chunk, rows):
+        scanned.append(chunk.number)
+        if stop_after is not None and len(scanned) == stop_after:
+            raise Interrupted
+
+    stream_scan(iter(SYMBOLS), MemorySource(BARS), TODAY, out, executor=ScanExecutor(workers=1),
+                on_chunk=on_chunk, resume=resume, key="symbols", chunk_size=20)
+    return scanned
+
+
+def read(out):
+    return pd.read_parquet(out) if out.endswith(".parquet") else pd.read_csv(out)
+
+
+@pytest.mark.parametrize("name", ["hits.csv", "hits.parquet"])
+def test_resumed_scan_matches_an_uninterrupted_one(tmp_path, name):
+    full = str(tmp_path / f"full_{name}")
+    scan(full)
+    expected = read(full)
+    assert len(expected)
+
+    out = str(tmp_path / name)
+    with pytest.raises(Interrupted):
+        scan(out, stop_after=4)
+    assert load_checkpoint(out, scan_params(TODAY, "symbols", chunk_size=20))["done"] == [0, 1, 2, 3]
+    # A row torn by the interruption, after the last checkpointed offset
+    with open(spool_path(out), "a") as f:
+        f.write("SYN9999.NS,1.0,2.")
+
+    rescanned = scan(out)
+
+    assert rescanned == list(range(4, 10))
+    pd.testing.assert_frame_equal(read(out), expected)
+    assert not os.path.exists(checkpoint_path(out))
+    assert not os.path.exists(spool_path(out))
+
+
+def test_restart_ignores_the_checkpoint(tmp_path):
+    out = str(tmp_path / "hits.csv")
+    with pytest.raises(Interrupted):
+        scan(out, stop_after=4)
+
+    rescanned = scan(out, resume=False)
+
+    assert rescanned == list(range(10))
+    full = str(tmp_path / "full.csv")
+    scan(full)
+    pd.testing.assert_frame_equal(read(out), read(full))
@@ -0,0 +1,60 @@
+import pandas as pd
+
+from streaming import StreamingEngine
+
+WHEN = pd.date_range("2026-02-24 09:15", periods=4, freq="5min", tz="Asia/Kolkata")
+
+
+def levels(**overrides):
+    # Yesterday's levels for one symbol: high 100, R1 104, ascending narrow CPR
+    row = {"High": 100.0, "Low": 95.0, "Close": 98.0, "Pivot": 97.5, "BC": 97.0, "TC": 98.0, "R1": 104.0,
+           "S1": 94.0, "CPR Width %": 0.2, "CPR-Type": "Narrow", "CPR Trend": "Ascending", "Avg Volume": 1000.0}
+    row.update(overrides)
+    return pd.DataFrame([row], index=pd.Index(["AAA.NS"], name="Symbol"))
+
+
+def feed(engine, candles):
+    # candles: (open, close, volume); high/low just bracket them
+    return [event for when, (open_, close, volume) in zip(WHEN, candles)
+            for event in engine.on_bar("AAA.NS", when, open_, max(open_, close), min(open_, close), close, volume)]
+
+
+def test_first_candle_fires_on_the_first_close_above_yesterdays_high():
+    events = feed(StreamingEngine(levels(), rules=["first_candle"]), [(99.0, 101.0, 500), (101.0, 103.0, 500)])
+    assert [(event["Rule"], event["Time"], event["Close"]) for event in events] == [("first_candle", WHEN[0], 101.0)]
+    assert events[0]["Yesterday High"] == 100.0 and events[0]["R1"] == 104.0
+
+    assert feed(StreamingEngine(levels(), rules=["first_candle"]), [(99.0, 99.5, 500), (99.5, 101.0, 500)]) == []
+
+
+def test_three_candle_needs_green_red_green_above_r1():
+    engine = StreamingEngine(levels(), rules=["three_candle"])
+    events = feed(engine, [(99.0, 101.0, 500), (101.0, 100.0, 500), (100.0, 105.0, 500), (105.0, 106.0, 500)])
+    assert [(event["Rule"], event["Time"]) for event in events] == [("three_candle", WHEN[2])]
+
+    # Third close above yesterday's high but below R1
+    engine = StreamingEngine(levels(), rules=["three_candle"])
+    assert feed(engine, [(99.0, 101.0, 500), (101.0, 100.0, 500), (100.0, 103.0, 500)]) == []
+
+
+def test_volume_filter_uses_the_rules_volume_variant():
+    candles = [(99.0, 101.0, 1000)]
+    assert feed(StreamingEngine(levels(), rules=["first_candle"]), candles)
+    # first_candle_volume is strictly above the average
+    assert feed(StreamingEngine(levels(), rules=["first_candle"], vol_filter=True), candles) == []
+    assert feed(StreamingEngine(levels(), rules=["first_candle"], vol_filter=True), [(99.0, 101.0, 1001)])
+
+
+def test_level_predicates_drop_symbols_before_any_candle():
+    engine = StreamingEngine(levels(**{"CPR Trend": "Descending"}))
+    assert engine.states == {}
+    assert feed(engine, [(99.0, 101.0, 500)]) == []
+
+    engine = StreamingEngine(levels(**{"CPR Trend": "Descending"}), require_ascending=False)
+    assert [event["Rule"] for event in feed(engine, [(99.0, 101.0, 500)])] == ["first_candle"]
+
+
+def test_any_registered_rule_streams():
+    engine = StreamingEngine(levels(**{"CPR Trend": "Inside"}), rules=["inside_cpr_breakout", "first_candle"])
+    assert list(engine.states["AAA.NS"].rules) == ["inside_cpr_breakout"]
+    assert [event["Rule"] for event in feed(engine, [(99.0, 101.0, 500)])] == ["inside_cpr_breakout"]